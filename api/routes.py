@@ -1,12 +1,23 @@
 """
 API Routes - Endpoints de la aplicación
 """
-from flask import jsonify, request, send_file
+import os
+import threading
+import time
+from flask import Response, g, jsonify, redirect, request, send_file
 from datetime import datetime
+from urllib.parse import urlsplit
 from config import Config
+from services.entity_store import ENTITY_TYPES
+from services.event_stream import parse_last_event_id, wsgi_stream
+from services.projection import Projection, ProjectionCache, encode_cursor, decode_cursor
+from services.search_index import SEARCH_TYPES
+from utils import PrecompressedJSON, TokenBucketLimiter, METRICS, get_logger, logging_stats
 
+logger = get_logger('API')
 
-def create_routes(app, scraper_service, storage_service, scheduler_service):
+
+def create_routes(app, scraper_service, storage_service, scheduler_service, job_service=None):
     """
     Crea y registra todas las rutas de la API
     
@@ -15,7 +26,56 @@ def create_routes(app, scraper_service, storage_service, scheduler_service):
         scraper_service: Servicio de scraping
         storage_service: Servicio de almacenamiento
         scheduler_service: Servicio de programación
+        job_service: Servicio de trabajos asíncronos (opcional)
     """
+    scrape_limiter = TokenBucketLimiter(
+        rate=Config.SCRAPE_RATE_PER_MINUTE / 60,
+        burst=Config.SCRAPE_RATE_BURST
+    )
+    
+    projection_cache = ProjectionCache(Config.PROJECTION_CACHE_SIZE)
+    stream_slots = threading.BoundedSemaphore(Config.STREAM_FALLBACK_CLIENTS)
+    
+    metrics_dir = os.path.join(Config.DATA_DIR, Config.METRICS_DIR)
+    request_seconds = METRICS.histogram(
+        'inegi_http_request_duration_seconds',
+        'Duración de las peticiones a la API por ruta',
+        ('route', 'method')
+    )
+    requests_total = METRICS.counter(
+        'inegi_http_requests_total',
+        'Peticiones a la API por ruta y código de respuesta',
+        ('route', 'method', 'status')
+    )
+    
+    @app.before_request
+    def _first_request():
+        # Tiempo de arranque hasta la primera petición de este proceso (solo se registra una vez)
+        scheduler_service.mark_boot('first_request')
+    
+    if Config.METRICS_ENABLED:
+        @app.before_request
+        def _start_timer():
+            g.request_started = time.perf_counter()
+        
+        @app.after_request
+        def _record_request(response):
+            started = g.pop('request_started', None)
+            if started is not None:
+                # La regla (/api/jobs/<job_id>) y no la ruta concreta: etiquetas acotadas
+                route = request.url_rule.rule if request.url_rule else 'unmatched'
+                request_seconds.observe(time.perf_counter() - started, route=route, method=request.method)
+                requests_total.inc(route=route, method=request.method, status=response.status_code)
+                try:
+                    METRICS.dump_if_due(metrics_dir, Config.METRICS_DUMP_SECONDS)
+                except OSError:
+                    pass
+            return response
+    
+    def _client_id():
+        """IP del cliente (detrás del router de Heroku, la última de X-Forwarded-For)"""
+        route = request.access_route
+        return route[-1] if route else request.remote_addr
     
     @app.route('/')
     def home():
@@ -28,40 +88,63 @@ def create_routes(app, scraper_service, storage_service, scheduler_service):
             'endpoints': {
                 'GET /': 'Información de la API',
                 'GET /api/scrape': 'Ejecutar scraping inmediatamente',
-                'GET /api/data': 'Obtener datos en caché',
+                'POST /api/scrape': 'Encolar scraping (202 con ID de trabajo)',
+                'GET /api/jobs/<id>': 'Estado, tiempos por fase y resultado de un trabajo',
+                'GET /api/data': 'Obtener datos en caché (?at=<timestamp> para un instante pasado; ?fields=&limit=&cursor= y filtros <lista>.<campo>~=)',
+                'GET /api/stream': 'Eventos en vivo (SSE) al publicarse cada snapshot, con reanudación por Last-Event-ID',
+                'GET /api/history': 'Snapshots históricos (?from=&to=&limit=&offset=|cursor=&fields=)',
+                'GET /api/changes': 'Cambios entre snapshots (?since=<versión|timestamp>)',
+                'GET /api/search': 'Búsqueda en noticias, secciones y links sin importar acentos (?q=&from=&to=&type=&limit=)',
+                'GET /api/indicators': 'Indicadores numéricos con serie registrada y su último valor',
+                'GET /api/indicators/<id>/series': 'Serie de un indicador con min/max/mean/last por bucket (?from=&to=&bucket=auto|raw|5m|1h|1d|7d|30d)',
+                'GET /api/entities/<tipo>': 'Noticias, links, secciones o indicadores deduplicados (?since=&until=&active_since=)',
                 'GET /api/data/json': 'Descargar archivo JSON',
                 'GET /api/data/csv': 'Descargar archivo CSV',
                 'GET /api/status': 'Estado del sistema',
+                'GET /api/ready': 'Disponibilidad: 200 con datos en caché, 503 mientras arranca',
+                'GET /api/metrics': 'Métricas en formato Prometheus (latencias por fase y por ruta)',
                 'GET /api/files': 'Listar archivos de datos',
-                'POST /api/schedule': 'Configurar intervalo de scraping'
+                'POST /api/schedule': 'Configurar intervalo de scraping',
+                'GET /api/crawl': 'Último crawl multi-página (?run=true lo encola: 202 con ID de trabajo)',
+                'GET /api/targets': 'Objetivos vigilados con su estado',
+                'POST /api/targets': 'Registrar objetivo (id, url, interval_minutes, priority)',
+                'GET /api/targets/<id>': 'Estado y último snapshot de un objetivo',
+                'PUT /api/targets/<id>': 'Modificar objetivo',
+                'DELETE /api/targets/<id>': 'Eliminar objetivo',
+                'POST /api/targets/<id>/run': 'Ejecutar un objetivo ahora'
             },
             'services': {
                 'scraper': 'Servicio de web scraping',
                 'storage': 'Servicio de almacenamiento',
-                'scheduler': 'Servicio de tareas programadas'
+                'scheduler': 'Servicio de tareas programadas',
+                'crawler': 'Servicio de crawling multi-página'
             }
         }), 200
     
     @app.route('/api/scrape', methods=['GET'])
     def scrape_now():
         """Ejecutar scraping inmediatamente"""
+        allowed, retry_after = scrape_limiter.consume(_client_id())
+        if not allowed:
+            response = jsonify({
+                'status': 'error',
+                'message': 'Demasiadas solicitudes de scraping. Intenta más tarde',
+                'retry_after': round(retry_after, 1)
+            })
+            response.headers['Retry-After'] = str(max(1, round(retry_after)))
+            return response, 429
+        
         try:
-            print(f"[{datetime.now()}] [API] Scraping manual solicitado")
+            logger.info("Scraping manual solicitado")
             
-            # Ejecutar scraping
-            data = scraper_service.scrape_homepage()
+            # Ejecutar scraping (o reutilizar uno reciente/en curso), guardar y actualizar caché
+            data, source = scheduler_service.scrape_now()
             
             if data.get('status') == 'success':
-                # Guardar datos
-                storage_service.save_json(data)
-                storage_service.save_csv(data)
-                
-                # Actualizar caché
-                scheduler_service.set_cached_data(data)
-                
                 return jsonify({
                     'status': 'success',
                     'message': 'Scraping completado exitosamente',
+                    'source': source,
                     'data': data
                 }), 200
             else:
@@ -70,40 +153,435 @@ def create_routes(app, scraper_service, storage_service, scheduler_service):
                     'message': 'Error durante el scraping',
                     'data': data
                 }), 500
-                
+        
         except Exception as e:
             return jsonify({
                 'status': 'error',
                 'message': f'Error interno: {str(e)}'
             }), 500
     
+    @app.route('/api/scrape', methods=['POST'])
+    def enqueue_scrape():
+        """Encolar scraping y responder de inmediato con el ID del trabajo"""
+        if not job_service:
+            return jsonify({
+                'status': 'error',
+                'message': 'Servicio de trabajos no disponible'
+            }), 503
+        
+        allowed, retry_after = scrape_limiter.consume(_client_id())
+        if not allowed:
+            response = jsonify({
+                'status': 'error',
+                'message': 'Demasiadas solicitudes de scraping. Intenta más tarde',
+                'retry_after': round(retry_after, 1)
+            })
+            response.headers['Retry-After'] = str(max(1, round(retry_after)))
+            return response, 429
+        
+        job = job_service.submit_scrape()
+        if not job:
+            return jsonify({
+                'status': 'error',
+                'message': 'Cola de trabajos llena. Intenta más tarde'
+            }), 503
+        
+        response = jsonify({
+            'status': 'accepted',
+            'job_id': job['id'],
+            'job': job
+        })
+        response.headers['Location'] = f"/api/jobs/{job['id']}"
+        return response, 202
+    
+    @app.route('/api/jobs', methods=['GET'])
+    def list_jobs():
+        """Trabajos recientes"""
+        if not job_service:
+            return jsonify({
+                'status': 'error',
+                'message': 'Servicio de trabajos no disponible'
+            }), 503
+        
+        jobs = job_service.recent_jobs()
+        return jsonify({
+            'status': 'success',
+            'count': len(jobs),
+            'jobs': jobs
+        }), 200
+    
+    @app.route('/api/jobs/<job_id>', methods=['GET'])
+    def get_job(job_id):
+        """Estado, tiempos por fase y resultado de un trabajo"""
+        job = job_service.get_job(job_id) if job_service else None
+        if not job:
+            return jsonify({
+                'status': 'error',
+                'message': f'Trabajo {job_id} no encontrado'
+            }), 404
+        
+        return jsonify({
+            'status': 'success',
+            'job': job
+        }), 200
+    
     @app.route('/api/data', methods=['GET'])
     def get_cached_data():
-        """Obtener datos en caché"""
-        cached_data = scheduler_service.get_cached_data()
+        """Obtener datos en caché (o de un instante pasado con ?at=<timestamp>); admite fields=, filtros y limit=/cursor="""
+        try:
+            projection = Projection.from_args(request.args, max_limit=Config.PROJECTION_MAX_LIMIT)
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
         
-        if cached_data:
+        at = request.args.get('at')
+        if at:
+            try:
+                data = storage_service.get_snapshot_at(at)
+            except ValueError:
+                return jsonify({
+                    'status': 'error',
+                    'message': 'at debe ser un timestamp ISO 8601 o epoch en segundos'
+                }), 400
+            
+            if data:
+                error = _apply_cursor(projection, data.get('timestamp'))
+                if error:
+                    return error
+                payload = _projected_payload(data, projection, 'history', data.get('timestamp'))
+                payload['at'] = at
+                return jsonify(payload), 200
+            
             return jsonify({
-                'status': 'success',
-                'source': 'cache',
-                'data': cached_data
-            }), 200
+                'status': 'error',
+                'message': f'No hay snapshots anteriores a {at}'
+            }), 404
+        
+        cached_response = scheduler_service.get_cached_response()
+        
+        if cached_response:
+            if projection.is_identity and 'cursor' not in request.args:
+                return _send_precompressed(cached_response)
+            
+            # Proyecciones: se serializan y comprimen una vez por snapshot y combinación de parámetros
+            version = cached_response.digest[:16]
+            error = _apply_cursor(projection, version)
+            if error:
+                return error
+            prepared = projection_cache.get(cached_response.digest, projection.cache_key, lambda: PrecompressedJSON(
+                _projected_payload(cached_response.payload.get('data') or {}, projection, 'cache', version),
+                gzip_level=Config.RESPONSE_GZIP_LEVEL,
+                brotli_quality=Config.RESPONSE_BROTLI_QUALITY
+            ))
+            return _send_precompressed(prepared)
         
         # Intentar cargar desde archivo
         data = storage_service.load_json(Config.LATEST_JSON)
         if data:
-            scheduler_service.set_cached_data(data)
-            return jsonify({
-                'status': 'success',
-                'source': 'file',
-                'data': data
-            }), 200
+            scheduler_service.load_cached_data(data)
+            error = _apply_cursor(projection, data.get('timestamp'))
+            if error:
+                return error
+            return jsonify(_projected_payload(data, projection, 'file', data.get('timestamp'))), 200
         
         return jsonify({
             'status': 'error',
             'message': 'No hay datos disponibles. Ejecuta /api/scrape primero'
         }), 404
     
+    def _apply_cursor(projection, version):
+        """Toma el offset de ?cursor= (o devuelve la respuesta de error si no corresponde a version)"""
+        cursor = request.args.get('cursor')
+        if not cursor:
+            return None
+        try:
+            projection.offset = decode_cursor(cursor, version)
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+        return None
+    
+    def _projected_payload(data, projection, source, version):
+        """Respuesta de /api/data con la proyección aplicada (y la página si se pidió limit o filtros)"""
+        if projection.is_identity:
+            return {'status': 'success', 'source': source, 'data': data}
+        
+        projected, totals, has_more = projection.apply(data)
+        payload = {'status': 'success', 'source': source, 'data': projected}
+        if projection.filters or projection.limit is not None or projection.offset:
+            payload['page'] = {
+                'limit': projection.limit,
+                'offset': projection.offset,
+                'totals': totals,
+                'next_cursor': encode_cursor(version, projection.offset + projection.limit) if has_more else None
+            }
+        return payload
+    
+    def _send_precompressed(prepared):
+        """Sirve bytes ya serializados: 304 si el cliente tiene la versión, si no la mejor codificación"""
+        encoding = prepared.negotiate(request.accept_encodings)
+        headers = {
+            'ETag': prepared.etag(encoding),
+            'Vary': 'Accept-Encoding',
+            'Cache-Control': 'no-cache'
+        }
+        
+        if prepared.matches(request.headers.get('If-None-Match')):
+            return Response(status=304, headers=headers)
+        
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        
+        # Las variantes pueden ser memoryview sobre la caché compartida: se envían sin copiar
+        body = prepared.variants[encoding]
+        headers['Content-Length'] = str(len(body))
+        return Response(
+            [body],
+            status=200,
+            headers=headers,
+            content_type='application/json; charset=utf-8'
+        )
+    
+    @app.route('/api/stream', methods=['GET'])
+    def stream():
+        """Eventos en vivo (SSE): un evento 'snapshot' por publicación, reanudable con Last-Event-ID"""
+        if Config.STREAM_PORT is not None:
+            # El servidor asíncrono del líder mantiene las conexiones sin ocupar un worker
+            hostname = urlsplit(f'//{request.host}').hostname or ''
+            if ':' in hostname:
+                hostname = f'[{hostname}]'  # IPv6
+            target = Config.STREAM_PUBLIC_URL or (
+                f"{request.scheme}://{hostname}:{Config.STREAM_PORT}/api/stream"
+            )
+            if request.query_string:
+                target += '?' + request.query_string.decode('latin-1')
+            return redirect(target, code=307)
+        
+        # Con StreamThreadWorker la petición no llega aquí: el worker la entrega al StreamServer.
+        # Sin él, un worker sync quedaría bloqueado (y gunicorn lo mata al vencer --timeout)
+        if not request.environ.get('wsgi.multithread'):
+            return jsonify({
+                'status': 'error',
+                'message': 'Stream no disponible en este servidor; consulta /api/data con If-None-Match '
+                           '(o usa --worker-class services.stream_worker.StreamThreadWorker)'
+            }), 503, {'Retry-After': str(Config.STREAM_FALLBACK_SECONDS)}
+        
+        # Servidor con hilos (p. ej. desarrollo): Flask sirve pocas conexiones, cada una ocupa un hilo
+        if not stream_slots.acquire(blocking=False):
+            return jsonify({
+                'status': 'error',
+                'message': 'Demasiadas conexiones de stream; consulta /api/data con If-None-Match'
+            }), 503, {'Retry-After': str(Config.STREAM_HEARTBEAT_SECONDS)}
+        
+        last_id = parse_last_event_id(request.headers.get('Last-Event-ID') or request.args.get('last_event_id'))
+        response = Response(
+            wsgi_stream(
+                scheduler_service.event_broker,
+                last_id,
+                Config.STREAM_FALLBACK_SECONDS,
+                poll=scheduler_service.get_cached_response
+            ),
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+            content_type='text/event-stream; charset=utf-8'
+        )
+        response.call_on_close(stream_slots.release)
+        return response
+    
+    @app.route('/api/history', methods=['GET'])
+    def get_history():
+        """Obtener snapshots históricos en un rango de tiempo (fields= y filtros se aplican a cada snapshot)"""
+        try:
+            projection = Projection.from_args(request.args, paginate=False)
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+        
+        # El cursor queda atado al rango: el log solo crece, así que la posición es estable
+        version = f"{request.args.get('from', '')}|{request.args.get('to', '')}"
+        try:
+            offset = decode_cursor(request.args['cursor'], version) if request.args.get('cursor') else None
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+        
+        try:
+            limit = max(1, min(int(request.args.get('limit', Config.HISTORY_MAX_RESULTS)), Config.HISTORY_MAX_RESULTS))
+            if offset is None:
+                offset = max(int(request.args.get('offset', 0)), 0)
+            history = storage_service.get_snapshot_history(
+                request.args.get('from'),
+                request.args.get('to'),
+                limit,
+                offset
+            )
+        except ValueError:
+            return jsonify({
+                'status': 'error',
+                'message': 'Parámetros inválidos: from/to deben ser ISO 8601 o epoch, limit/offset enteros'
+            }), 400
+        
+        snapshots = history['snapshots']
+        if not projection.is_identity:
+            snapshots = [projection.apply(snapshot)[0] for snapshot in snapshots]
+        
+        next_offset = offset + len(snapshots)
+        return jsonify({
+            'status': 'success',
+            'from': request.args.get('from'),
+            'to': request.args.get('to'),
+            'total': history['total'],
+            'offset': offset,
+            'count': len(snapshots),
+            'next_cursor': encode_cursor(version, next_offset) if snapshots and next_offset < history['total'] else None,
+            'snapshots': snapshots
+        }), 200
+    
+    @app.route('/api/entities/<entity_type>', methods=['GET'])
+    def get_entities(entity_type):
+        """Consultar noticias, links, secciones o indicadores deduplicados"""
+        if entity_type not in ENTITY_TYPES:
+            return jsonify({
+                'status': 'error',
+                'message': f"Tipo no válido. Opciones: {', '.join(ENTITY_TYPES)}"
+            }), 400
+        
+        try:
+            limit = max(1, min(int(request.args.get('limit', 100)), Config.ENTITY_MAX_RESULTS))
+            offset = max(int(request.args.get('offset', 0)), 0)
+            entities = storage_service.query_entities(
+                entity_type,
+                since=request.args.get('since'),
+                until=request.args.get('until'),
+                active_since=request.args.get('active_since'),
+                limit=limit,
+                offset=offset
+            )
+        except ValueError:
+            return jsonify({
+                'status': 'error',
+                'message': 'Parámetros inválidos: since/until/active_since deben ser ISO 8601 o epoch, limit/offset enteros'
+            }), 400
+        
+        return jsonify({
+            'status': 'success',
+            'type': entity_type,
+            'count': len(entities),
+            'offset': offset,
+            'entities': entities
+        }), 200
+    
+    @app.route('/api/search', methods=['GET'])
+    def search():
+        """Búsqueda de texto con rangos de aparición de cada resultado"""
+        types = [t for t in request.args.get('type', '').split(',') if t] or None
+        if types and any(t not in SEARCH_TYPES for t in types):
+            return jsonify({
+                'status': 'error',
+                'message': f"Tipo no válido. Opciones: {', '.join(SEARCH_TYPES)}"
+            }), 400
+        
+        try:
+            limit = min(max(int(request.args.get('limit', 20)), 1), Config.SEARCH_MAX_RESULTS)
+        except ValueError:
+            return jsonify({
+                'status': 'error',
+                'message': 'limit debe ser entero'
+            }), 400
+        
+        try:
+            results = storage_service.search(
+                request.args.get('q', ''),
+                start=request.args.get('from'),
+                end=request.args.get('to'),
+                types=types,
+                limit=limit
+            )
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+        
+        return jsonify({
+            'status': 'success',
+            'query': request.args.get('q', ''),
+            **results
+        }), 200
+    
+    @app.route('/api/indicators', methods=['GET'])
+    def list_indicators():
+        """Indicadores numéricos con serie registrada"""
+        indicators = storage_service.list_indicators()
+        
+        return jsonify({
+            'status': 'success',
+            'count': len(indicators),
+            'buckets': list(Config.INDICATOR_BUCKETS),
+            'indicators': indicators
+        }), 200
+    
+    @app.route('/api/indicators/<indicator_id>/series', methods=['GET'])
+    def get_indicator_series(indicator_id):
+        """Serie de un indicador en un rango, cruda o con rollups precalculados por bucket"""
+        try:
+            series = storage_service.query_indicator_series(
+                indicator_id,
+                start=request.args.get('from'),
+                end=request.args.get('to'),
+                bucket=request.args.get('bucket', 'auto')
+            )
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+        
+        if series is None:
+            return jsonify({
+                'status': 'error',
+                'message': f'Indicador no encontrado: {indicator_id}'
+            }), 404
+        
+        return jsonify({'status': 'success', **series}), 200
+    
+    @app.route('/api/changes', methods=['GET'])
+    def get_changes():
+        """Obtener los cambios posteriores a una versión o timestamp"""
+        diff_service = scheduler_service.diff_service
+        if not diff_service:
+            return jsonify({
+                'status': 'error',
+                'message': 'Servicio de cambios no disponible'
+            }), 503
+        
+        # Cambios registrados por el proceso líder desde la última consulta
+        diff_service.refresh()
+        since = request.args.get('since')
+        try:
+            limit = max(1, min(int(request.args.get('limit', Config.CHANGES_MAX_RESULTS)), Config.CHANGES_MAX_RESULTS))
+            changes = diff_service.changes_since(since, limit)
+        except ValueError:
+            return jsonify({
+                'status': 'error',
+                'message': 'since debe ser una versión (entero) o un timestamp ISO 8601'
+            }), 400
+        
+        return jsonify({
+            'status': 'success',
+            'since': since,
+            'current_version': diff_service.version,
+            'count': len(changes),
+            'changes': changes
+        }), 200
+    
     @app.route('/api/data/json', methods=['GET'])
     def download_json():
         """Descargar archivo JSON"""
@@ -122,7 +600,7 @@ def create_routes(app, scraper_service, storage_service, scheduler_service):
                 'status': 'error',
                 'message': 'Archivo no encontrado'
             }), 404
-            
+        
         except Exception as e:
             return jsonify({
                 'status': 'error',
@@ -147,7 +625,7 @@ def create_routes(app, scraper_service, storage_service, scheduler_service):
                 'status': 'error',
                 'message': 'Archivo no encontrado'
             }), 404
-            
+        
         except Exception as e:
             return jsonify({
                 'status': 'error',
@@ -171,6 +649,8 @@ def create_routes(app, scraper_service, storage_service, scheduler_service):
                 'total_files': len(files),
                 'files': files
             },
+            'logging': logging_stats(),
+            'projections': projection_cache.stats(),
             'config': {
                 'scraping_interval_minutes': Config.SCRAPING_INTERVAL_MINUTES,
                 'inegi_url': Config.INEGI_BASE_URL,
@@ -178,6 +658,29 @@ def create_routes(app, scraper_service, storage_service, scheduler_service):
             }
         }), 200
     
+    @app.route('/api/ready', methods=['GET'])
+    def get_ready():
+        """Disponibilidad del proceso (para balanceadores y verificaciones de despliegue)"""
+        boot = scheduler_service.boot_status()
+        return jsonify({
+            'status': 'ready' if boot['ready'] else 'starting',
+            'timestamp': datetime.now().isoformat(),
+            'last_update': scheduler_service.get_cached_data().get('timestamp', 'N/A'),
+            'boot': boot
+        }), 200 if boot['ready'] else 503
+    
+    @app.route('/api/metrics', methods=['GET'])
+    def get_metrics():
+        """Métricas de todos los procesos en formato de exposición de Prometheus"""
+        if not Config.METRICS_ENABLED:
+            return jsonify({
+                'status': 'error',
+                'message': 'Métricas deshabilitadas (METRICS_ENABLED)'
+            }), 404
+        
+        body = METRICS.render(METRICS.load_others(metrics_dir))
+        return Response(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+    
     @app.route('/api/files', methods=['GET'])
     def list_files():
         """Listar todos los archivos de datos"""
@@ -223,13 +726,198 @@ def create_routes(app, scraper_service, storage_service, scheduler_service):
                     'status': 'error',
                     'message': 'No se pudo actualizar el intervalo'
                 }), 500
-                
+        
         except Exception as e:
             return jsonify({
                 'status': 'error',
                 'message': str(e)
             }), 400
     
+    @app.route('/api/crawl', methods=['GET'])
+    def crawl():
+        """Obtener el último crawl multi-página o encolar uno nuevo (?run=true)"""
+        try:
+            if request.args.get('run', 'false').lower() == 'true':
+                return _enqueue_crawl()
+            
+            crawl_data = scheduler_service.get_crawl_data() or storage_service.load_json(Config.CRAWL_JSON)
+            if crawl_data:
+                return jsonify({
+                    'status': 'success',
+                    'data': crawl_data
+                }), 200
+            
+            return jsonify({
+                'status': 'error',
+                'message': 'No hay datos de crawl. Ejecuta /api/crawl?run=true primero'
+            }), 404
+        
+        except Exception as e:
+            return jsonify({
+                'status': 'error',
+                'message': f'Error interno: {str(e)}'
+            }), 500
+    
+    def _enqueue_crawl():
+        """El crawl tarda más que el timeout del worker: se ejecuta en JobService"""
+        if not job_service or not scheduler_service.crawler_service:
+            return jsonify({
+                'status': 'error',
+                'message': 'Servicio de crawl no disponible'
+            }), 503
+        
+        logger.info("Crawl manual solicitado")
+        job = job_service.submit_crawl()
+        if not job:
+            return jsonify({
+                'status': 'error',
+                'message': 'Cola de trabajos llena. Intenta más tarde'
+            }), 503
+        
+        response = jsonify({
+            'status': 'accepted',
+            'job_id': job['id'],
+            'job': job
+        })
+        response.headers['Location'] = f"/api/jobs/{job['id']}"
+        return response, 202
+    
+    def _target_summary(target):
+        """Objetivo con su estado, sin el snapshot completo"""
+        state = scheduler_service.target_scheduler.get_state(target['id']) or {}
+        summary = {k: v for k, v in state.items() if k not in ('data', 'fingerprint', 'target')}
+        return {**target, 'state': summary}
+    
+    def _targets_unavailable():
+        return jsonify({
+            'status': 'error',
+            'message': 'Programador de objetivos no disponible'
+        }), 503
+    
+    @app.route('/api/targets', methods=['GET'])
+    def list_targets():
+        """Objetivos registrados con su estado"""
+        target_scheduler = scheduler_service.target_scheduler
+        if not target_scheduler:
+            return _targets_unavailable()
+        
+        targets = [_target_summary(target) for target in target_scheduler.registry.list()]
+        return jsonify({
+            'status': 'success',
+            'scheduler': target_scheduler.get_status(),
+            'count': len(targets),
+            'targets': targets
+        }), 200
+    
+    @app.route('/api/targets', methods=['POST'])
+    def add_target():
+        """Registrar un objetivo"""
+        target_scheduler = scheduler_service.target_scheduler
+        if not target_scheduler:
+            return _targets_unavailable()
+        
+        try:
+            target = target_scheduler.registry.add(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+        
+        return jsonify({
+            'status': 'success',
+            'target': target
+        }), 201
+    
+    @app.route('/api/targets/<target_id>', methods=['GET'])
+    def get_target(target_id):
+        """Estado y último snapshot de un objetivo"""
+        target_scheduler = scheduler_service.target_scheduler
+        if not target_scheduler:
+            return _targets_unavailable()
+        
+        target = target_scheduler.registry.get(target_id)
+        if not target:
+            return jsonify({
+                'status': 'error',
+                'message': f'Objetivo {target_id} no encontrado'
+            }), 404
+        
+        state = target_scheduler.get_state(target_id) or {}
+        return jsonify({
+            'status': 'success',
+            'target': _target_summary(target),
+            'data': state.get('data')
+        }), 200
+    
+    @app.route('/api/targets/<target_id>', methods=['PUT', 'PATCH'])
+    def update_target(target_id):
+        """Modificar un objetivo (url, name, interval_minutes, priority, enabled)"""
+        target_scheduler = scheduler_service.target_scheduler
+        if not target_scheduler:
+            return _targets_unavailable()
+        
+        try:
+            target = target_scheduler.registry.update(target_id, request.get_json(silent=True) or {})
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+        
+        if not target:
+            return jsonify({
+                'status': 'error',
+                'message': f'Objetivo {target_id} no encontrado'
+            }), 404
+        
+        return jsonify({
+            'status': 'success',
+            'target': target
+        }), 200
+    
+    @app.route('/api/targets/<target_id>', methods=['DELETE'])
+    def delete_target(target_id):
+        """Eliminar un objetivo"""
+        target_scheduler = scheduler_service.target_scheduler
+        if not target_scheduler:
+            return _targets_unavailable()
+        
+        if not target_scheduler.registry.remove(target_id):
+            return jsonify({
+                'status': 'error',
+                'message': f'Objetivo {target_id} no encontrado'
+            }), 404
+        
+        return jsonify({
+            'status': 'success',
+            'message': f'Objetivo {target_id} eliminado'
+        }), 200
+    
+    @app.route('/api/targets/<target_id>/run', methods=['POST'])
+    def run_target(target_id):
+        """Adelantar la ejecución de un objetivo"""
+        target_scheduler = scheduler_service.target_scheduler
+        if not target_scheduler:
+            return _targets_unavailable()
+        
+        if not target_scheduler.registry.get(target_id):
+            return jsonify({
+                'status': 'error',
+                'message': f'Objetivo {target_id} no encontrado'
+            }), 404
+        
+        if not target_scheduler.run_now(target_id):
+            return jsonify({
+                'status': 'error',
+                'message': 'El objetivo está deshabilitado, ya está en curso o este proceso no ejecuta objetivos'
+            }), 409
+        
+        return jsonify({
+            'status': 'accepted',
+            'target_id': target_id
+        }), 202
+    
     @app.errorhandler(404)
     def not_found(error):
         """Manejo de errores 404"""
@@ -2,59 +2,93 @@
 INEGI Web Scraper - Aplicación Principal
 Arquitectura de Microservicios con Cron Job cada 5 minutos
 """
+import time
+BOOT_STARTED = time.perf_counter()  # Antes de cualquier import pesado: mide el arranque completo
+
+import atexit
 from flask import Flask
 from flask_cors import CORS
 from datetime import datetime
 
 # Importar configuración y servicios
 from config import Config
-from services import ScraperService, StorageService, SchedulerService
+from services import (
+    ScraperService, StorageService, SchedulerService, CrawlerService, DiffService,
+    LeaderLock, SharedSnapshot, JobService, TargetRegistry, TargetScheduler, EventBroker, StreamServer
+)
 from api import create_routes
+from utils import get_logger
+
+logger = get_logger('App')
 
 # Crear aplicación Flask
 app = Flask(__name__)
 CORS(app)
 
 # Inicializar microservicios
-print("="*60)
-print("INEGI WEB SCRAPER - MICROSERVICES ARCHITECTURE")
-print("="*60)
-print(f"[{datetime.now()}] Inicializando microservicios...")
+logger.info("INEGI WEB SCRAPER - Inicializando microservicios...")
 
 scraper_service = ScraperService()
-print(f"✓ ScraperService inicializado - Target: {Config.INEGI_BASE_URL}")
+logger.info("ScraperService inicializado - Target: %s", Config.INEGI_BASE_URL)
 
 storage_service = StorageService()
-print(f"✓ StorageService inicializado - Data Dir: {Config.DATA_DIR}")
+logger.info("StorageService inicializado - Data Dir: %s", Config.DATA_DIR)
 
-scheduler_service = SchedulerService(scraper_service, storage_service)
-print(f"✓ SchedulerService inicializado")
+crawler_service = CrawlerService(scraper_service)
+logger.info("CrawlerService inicializado - Concurrencia: %s", Config.CRAWL_CONCURRENCY)
 
-# Registrar rutas de la API
-create_routes(app, scraper_service, storage_service, scheduler_service)
-print(f"✓ API Routes registradas")
-print("="*60)
+diff_service = DiffService()
+logger.info("DiffService inicializado - Versión actual: %s", diff_service.version)
+
+if Config.SHARED_CACHE_ENABLED:
+    leader_lock = LeaderLock()
+    shared_snapshot = SharedSnapshot()
+    logger.info("Caché compartida entre procesos - Versión actual: %s", shared_snapshot.version)
+else:
+    leader_lock = None
+    shared_snapshot = None
+
+target_registry = TargetRegistry()
+target_scheduler = TargetScheduler(scraper_service, target_registry)
+logger.info("TargetScheduler inicializado - Objetivos: %d", len(target_registry.list()))
 
-# Iniciar scheduler automáticamente (necesario para Heroku con gunicorn)
-print(f"\n[{datetime.now()}] Iniciando scheduler automático...")
-scheduler_service.start(Config.SCRAPING_INTERVAL_MINUTES)
+event_broker = EventBroker()
+stream_server = StreamServer(event_broker) if Config.STREAM_PORT is not None else None
+if stream_server:
+    logger.info("StreamServer configurado - Puerto: %s (solo en el proceso líder)", Config.STREAM_PORT)
+else:
+    # En el puerto principal: el worker de gunicorn le entrega cada conexión de /api/stream
+    app.extensions['stream_server'] = StreamServer(event_broker, listen=False)
 
-# Ejecutar scraping inicial
-print(f"[{datetime.now()}] Ejecutando scraping inicial...")
-scheduler_service.scheduled_scrape()
-print(f"[{datetime.now()}] ⏰ Scheduler activo - Próxima ejecución en {Config.SCRAPING_INTERVAL_MINUTES} minutos")
-print("="*60)
+scheduler_service = SchedulerService(
+    scraper_service, storage_service, crawler_service, diff_service,
+    leader_lock=leader_lock, shared_snapshot=shared_snapshot, target_scheduler=target_scheduler,
+    event_broker=event_broker, stream_server=stream_server
+)
+logger.info("SchedulerService inicializado")
+# La última aparición de un contenido sin cambios se escribe al cambiar o al salir
+atexit.register(scheduler_service.flush_seen)
+if 'stream_server' in app.extensions:
+    app.extensions['stream_server'].poll = scheduler_service.get_cached_response
+
+job_service = JobService(scheduler_service)
+logger.info("JobService inicializado - Hilos: %d", Config.JOB_WORKERS)
+
+# Registrar rutas de la API
+create_routes(app, scraper_service, storage_service, scheduler_service, job_service)
+logger.info("API Routes registradas")
+
+# Iniciar scheduler automáticamente (necesario para Heroku con gunicorn) y el scraping
+# inicial (solo el proceso líder). En caliente, la caché arranca con el último snapshot
+# persistido y el primer scraping corre en segundo plano: no se espera al sitio para atender
+logger.info("Iniciando scheduler automático...")
+scheduler_service.boot(Config.SCRAPING_INTERVAL_MINUTES, started=BOOT_STARTED)
 
 
 if __name__ == '__main__':
     print(f"\n[{datetime.now()}] Iniciando servicios...")
     
-    # Iniciar scheduler configurado para ejecutar cada 5 minutos
-    scheduler_service.start(Config.SCRAPING_INTERVAL_MINUTES)
-    
-    # Ejecutar scraping inicial
-    print(f"\n[{datetime.now()}] Ejecutando scraping inicial...")
-    scheduler_service.scheduled_scrape()
+    # El scheduler y el scraping inicial ya se iniciaron al importar el módulo
     
     print("\n" + "="*60)
     print("🚀 API REST DISPONIBLE - Cron Job cada 5 minutos")
@@ -63,10 +97,17 @@ if __name__ == '__main__':
     print(f"\nEndpoints principales:")
     print(f"  • GET  /                    - Información de la API")
     print(f"  • GET  /api/scrape          - Ejecutar scraping")
+    print(f"  • POST /api/scrape          - Encolar scraping (202 + ID)")
+    print(f"  • GET  /api/jobs/<id>       - Estado de un trabajo")
     print(f"  • GET  /api/data            - Obtener datos")
     print(f"  • GET  /api/status          - Estado del sistema")
+    print(f"  • GET  /api/ready           - Disponibilidad (503 mientras arranca)")
     print(f"  • GET  /api/files           - Listar archivos")
     print(f"  • POST /api/schedule        - Configurar intervalo")
+    print(f"  • GET  /api/crawl           - Crawl multi-página")
+    print(f"  • GET  /api/changes         - Cambios desde una versión")
+    print(f"  • GET  /api/stream          - Eventos en vivo (SSE)")
+    print(f"  • GET  /api/targets         - Objetivos vigilados")
     print("="*60)
     print(f"⏰ Scraping automático cada {Config.SCRAPING_INTERVAL_MINUTES} minutos")
     print("="*60)
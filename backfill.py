@@ -0,0 +1,39 @@
+"""
+Backfill - Re-ejecuta los extractores actuales sobre el HTML archivado
+
+Uso:
+    python backfill.py --from 2024-01-01 --to 2024-02-01 --workers 4 --entities
+"""
+import argparse
+import json
+from config import Config
+from services import StorageService, BackfillService
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-extrae datos del HTML archivado del INEGI')
+    parser.add_argument('--from', dest='start', help='Inicio del rango (ISO 8601 o epoch)')
+    parser.add_argument('--to', dest='end', help='Fin del rango (ISO 8601 o epoch)')
+    parser.add_argument('--url', help='Limitar a una URL descargada')
+    parser.add_argument('--workers', type=int, help='Número de procesos (por defecto, todos los núcleos)')
+    parser.add_argument('--output', help='Archivo JSONL de salida')
+    parser.add_argument('--entities', action='store_true', help='Registrar entidades en la base de datos')
+    args = parser.parse_args()
+    
+    Config.init_app()
+    storage_service = StorageService() if args.entities else None
+    backfill_service = BackfillService(storage_service=storage_service)
+    
+    summary = backfill_service.run(
+        start=args.start,
+        end=args.end,
+        url=args.url,
+        workers=args.workers,
+        output=args.output,
+        save_entities=args.entities
+    )
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
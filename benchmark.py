@@ -0,0 +1,99 @@
+"""
+Benchmark - Mide extracción, persistencia y serialización sin conectarse al sitio
+
+Uso:
+    python benchmark.py                          # 1x, 10x y 100x; compara con el baseline si existe
+    python benchmark.py --save-baseline          # Guarda los resultados como nuevo baseline
+    python benchmark.py --only extraction --factors 1,10 --threshold 0.15
+"""
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from config import Config
+from benchmarks import build_cases, run_suite, compare_results, load_baseline, save_baseline
+from benchmarks.suite import DEFAULT_FACTORS
+
+DEFAULT_BASELINE = os.path.join(Config.BASE_DIR, 'benchmarks', 'baseline.json')
+
+
+def _print_result(case, result):
+    print(f"  {case['name']:<42} {result['ops_per_sec']:>12,.1f} ops/s  "
+          f"±{result['spread_pct']:>5.1f}%  {result['peak_kib']:>10,.1f} KiB pico")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks sin red del scraper del INEGI')
+    parser.add_argument('--factors', default=','.join(str(f) for f in DEFAULT_FACTORS),
+                        help='Tamaños del fixture relativos a la página principal (p. ej. 1,10,100)')
+    parser.add_argument('--only', help='Ejecutar solo casos cuyo nombre contenga este texto')
+    parser.add_argument('--parser', help='Backend de parseo (por defecto Config.HTML_PARSER)')
+    parser.add_argument('--fixture', help='Archivo HTML alternativo')
+    parser.add_argument('--repeats', type=int, default=5, help='Repeticiones por caso (se usa la mediana)')
+    parser.add_argument('--min-time', type=float, default=0.2, help='Segundos mínimos por repetición')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Archivo de baseline')
+    parser.add_argument('--save-baseline', action='store_true', help='Guardar los resultados como baseline')
+    parser.add_argument('--threshold', type=float, default=0.20,
+                        help='Caída máxima de ops/s respecto al baseline (0.20 = 20%%)')
+    parser.add_argument('--memory-threshold', type=float,
+                        help='Aumento máximo de memoria pico respecto al baseline (opcional)')
+    parser.add_argument('--output', help='Guardar resultados y comparación en JSON')
+    args = parser.parse_args()
+    
+    factors = [int(f) for f in args.factors.split(',') if f.strip()]
+    
+    # Servicios sobre un directorio temporal: no tocar data/ ni la red
+    data_dir = tempfile.mkdtemp(prefix='inegi-bench-')
+    Config.DATA_DIR = data_dir
+    Config.ARCHIVE_ENABLED = False
+    if args.parser:
+        Config.HTML_PARSER = args.parser
+    
+    from services import ScraperService, StorageService
+    
+    try:
+        scraper_service = ScraperService()
+        storage_service = StorageService()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            cases = build_cases(scraper_service, storage_service, factors, args.fixture)
+        
+        print(f"Parser: {scraper_service.parser_backend} | Python {sys.version.split()[0]} | "
+              f"{args.repeats} repeticiones x {args.min_time}s mínimo")
+        results = run_suite(cases, args.repeats, args.min_time, args.only, progress=_print_result)
+        scraper_service.http_client.close()
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    
+    comparisons = []
+    baseline = load_baseline(args.baseline)
+    if baseline:
+        comparisons = compare_results(results, baseline, args.threshold, args.memory_threshold)
+        print(f"\nComparación con {args.baseline} (umbral {args.threshold:.0%}):")
+        for comparison in comparisons:
+            memory = comparison['memory_change']
+            memory_text = f"{memory:+7.1%} memoria" if memory is not None else ''
+            flag = '  REGRESIÓN' if comparison['regression'] else ''
+            print(f"  {comparison['name']:<42} {comparison['ops_change']:+7.1%} ops/s  {memory_text}{flag}")
+    elif not args.save_baseline:
+        print(f"\nSin baseline en {args.baseline} (usa --save-baseline para crearlo)")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'results': results, 'comparisons': comparisons}, f, ensure_ascii=False, indent=2)
+    
+    if args.save_baseline:
+        save_baseline(args.baseline, results, parser=scraper_service.parser_backend, factors=factors)
+        print(f"\nBaseline guardado en {args.baseline}")
+    
+    regressions = [c['name'] for c in comparisons if c['regression']]
+    if regressions:
+        print(f"\n{len(regressions)} caso(s) con regresión: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
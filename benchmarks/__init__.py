@@ -0,0 +1,10 @@
+"""
+Benchmarks sin red - Extracción, persistencia y serialización sobre HTML local
+"""
+from .fixtures import load_fixture, scale_html, scale_data
+from .suite import build_cases, run_suite, compare_results, load_baseline, save_baseline
+
+__all__ = [
+    'load_fixture', 'scale_html', 'scale_data',
+    'build_cases', 'run_suite', 'compare_results', 'load_baseline', 'save_baseline'
+]
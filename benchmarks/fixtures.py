@@ -0,0 +1,77 @@
+"""
+Fixtures de benchmark - Página principal incluida en el repositorio y versiones escaladas
+"""
+import os
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+DEFAULT_FIXTURE = 'inegi_home.html'
+
+
+def load_fixture(name=DEFAULT_FIXTURE):
+    """
+    Lee un fixture HTML
+    
+    Args:
+        name (str): Nombre del archivo en benchmarks/fixtures o ruta a otro archivo
+    
+    Returns:
+        bytes: Cuerpo HTML sin decodificar (como llega del sitio)
+    """
+    path = name if os.path.isabs(name) or os.path.exists(name) else os.path.join(FIXTURES_DIR, name)
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def scale_html(content, factor):
+    """
+    Repite el contenido de <body> para obtener un documento factor veces más grande
+    
+    Cada copia conserva la estructura (menús, noticias, indicadores), de modo que
+    el recorrido del DOM y los extractores trabajan proporcionalmente más.
+    
+    Args:
+        content (bytes): Documento original
+        factor (int): Multiplicador de tamaño (1 = sin cambios)
+    
+    Returns:
+        bytes: Documento escalado
+    """
+    if factor <= 1:
+        return content
+    
+    start = content.find(b'>', content.find(b'<body')) + 1
+    end = content.rfind(b'</body>')
+    if start <= 0 or end < start:
+        return content * factor
+    
+    body = content[start:end]
+    return content[:start] + body * factor + content[end:]
+
+
+def scale_data(data, factor):
+    """
+    Multiplica las listas de un resultado extraído (persistencia y serialización)
+    
+    Args:
+        data (dict): Resultado de ScraperService
+        factor (int): Multiplicador de tamaño (1 = sin cambios)
+    
+    Returns:
+        dict: Copia con cada lista repetida factor veces (elementos distinguibles)
+    """
+    if factor <= 1:
+        return dict(data)
+    
+    scaled = dict(data)
+    for field, value in data.items():
+        if not isinstance(value, list):
+            continue
+        items = []
+        for i in range(factor):
+            for item in value:
+                if isinstance(item, dict):
+                    items.append({key: f'{text} #{i}' if isinstance(text, str) else text for key, text in item.items()})
+                else:
+                    items.append(f'{item} #{i}')
+        scaled[field] = items
+    return scaled
@@ -0,0 +1,238 @@
+"""
+Suite de benchmarks - Casos, medición (ops/s y memoria pico) y comparación con un baseline
+"""
+import contextlib
+import json
+import os
+import platform
+import statistics
+import timeit
+import tracemalloc
+from datetime import datetime
+from config import Config
+from services.html_parser import parse_document
+from utils import PrecompressedJSON
+from .fixtures import load_fixture, scale_html, scale_data
+
+DEFAULT_FACTORS = (1, 10, 100)
+
+# Extractores individuales (métodos _extract_* de ScraperService)
+EXTRACTORS = ('title', 'sections', 'news', 'indicators', 'links')
+
+
+def build_cases(scraper_service, storage_service, factors=DEFAULT_FACTORS, fixture=None, backend=None):
+    """
+    Prepara los casos de la suite para cada tamaño de fixture
+    
+    Los documentos y datos se construyen aquí, fuera de la medición.
+    
+    Args:
+        scraper_service: ScraperService (solo se usan parseo y extractores)
+        storage_service: StorageService sobre un directorio temporal
+        factors (iterable): Tamaños relativos a la página principal
+        fixture (str): Fixture HTML (por defecto, la página principal incluida)
+        backend (str): Backend de parseo (por defecto, el del scraper)
+    
+    Returns:
+        list: Casos {'name', 'group', 'factor', 'size', 'func'}
+    """
+    backend = backend or scraper_service.parser_backend
+    encoding = Config.DEFAULT_ENCODING
+    original = load_fixture(fixture) if fixture else load_fixture()
+    base_data = scraper_service.extract_page(original, encoding, backend)
+    cases = []
+    
+    def add(group, name, factor, size, func):
+        cases.append({
+            'name': f'{group}.{name}@{factor}x',
+            'group': group,
+            'factor': factor,
+            'size': size,
+            'func': func
+        })
+    
+    for factor in factors:
+        content = scale_html(original, factor)
+        document = parse_document(content, backend, encoding)
+        size = len(content)
+        
+        add('extraction', 'parse', factor, size,
+            lambda content=content: parse_document(content, backend, encoding))
+        add('extraction', 'extract_page', factor, size,
+            lambda content=content: scraper_service.extract_page(content, encoding, backend))
+        add('extraction', 'extract_all', factor, size,
+            lambda document=document: scraper_service.extraction_engine.run(document))
+        for extractor in EXTRACTORS:
+            method = getattr(scraper_service, f'_extract_{extractor}')
+            add('extraction', f'_extract_{extractor}', factor, size,
+                lambda method=method, document=document: method(document))
+        
+        data = scale_data(base_data, factor)
+        payload = {'status': 'success', 'source': 'cache', 'data': data}
+        json_name = f'bench_{factor}x.json'
+        csv_name = f'bench_{factor}x.csv'
+        storage_service.save_json(data, json_name)
+        size = os.path.getsize(storage_service.get_file_path(json_name))
+        
+        add('storage', 'save_json', factor, size,
+            lambda data=data, name=json_name: storage_service.save_json(data, name))
+        add('storage', 'save_csv', factor, size,
+            lambda data=data, name=csv_name: storage_service.save_csv(data, name))
+        add('storage', 'load_json', factor, size,
+            lambda name=json_name: storage_service.load_json(name))
+        
+        add('serialization', 'json_dumps', factor, size,
+            lambda payload=payload: json.dumps(payload, ensure_ascii=False))
+        add('serialization', 'precompressed', factor, size,
+            lambda payload=payload: PrecompressedJSON(payload, Config.RESPONSE_GZIP_LEVEL, Config.RESPONSE_BROTLI_QUALITY))
+    
+    return cases
+
+
+def measure(func, repeats=5, min_time=0.2):
+    """
+    Mide las operaciones por segundo de una función
+    
+    Args:
+        func (callable): Operación sin argumentos
+        repeats (int): Repeticiones (se reporta la mediana)
+        min_time (float): Duración mínima de cada repetición en segundos
+    
+    Returns:
+        dict: ops_per_sec (mediana), best_ops_per_sec y variación entre repeticiones (%)
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        # Estimar cuántas iteraciones llenan min_time (con margen)
+        number = max(number * 2, int(number * min_time * 1.2 / max(elapsed, 1e-9)))
+    
+    timings = [elapsed] + timer.repeat(repeat=max(repeats - 1, 0), number=number)
+    per_op = [t / number for t in timings]
+    median = statistics.median(per_op)
+    return {
+        'ops_per_sec': round(1 / median, 2),
+        'best_ops_per_sec': round(1 / min(per_op), 2),
+        'spread_pct': round((max(per_op) - min(per_op)) / median * 100, 1),
+        'iterations': number * len(timings)
+    }
+
+
+def peak_memory(func):
+    """
+    Memoria pico asignada por una ejecución
+    
+    Solo cuenta asignaciones de Python (tracemalloc): los árboles internos de
+    libxml2 no aparecen, pero sí los objetos, cadenas y listas resultantes.
+    
+    Returns:
+        int: Bytes pico por encima de la memoria en uso antes de llamar
+    """
+    tracemalloc.start()
+    try:
+        func()  # Calentamiento: cachés e imports perezosos fuera de la medición
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        func()
+        return max(tracemalloc.get_traced_memory()[1] - before, 0)
+    finally:
+        tracemalloc.stop()
+
+
+def run_suite(cases, repeats=5, min_time=0.2, only=None, progress=None):
+    """
+    Ejecuta los casos
+    
+    Args:
+        cases (list): Casos de build_cases()
+        repeats (int): Repeticiones por caso
+        min_time (float): Duración mínima de cada repetición
+        only (str): Ejecutar solo los casos cuyo nombre contenga este texto (opcional)
+        progress (callable): Recibe (caso, resultado) al terminar cada uno (opcional)
+    
+    Returns:
+        dict: {nombre: resultado}
+    """
+    results = {}
+    with open(os.devnull, 'w') as devnull:
+        for case in cases:
+            if only and only not in case['name']:
+                continue
+            
+            # Los servicios registran cada operación: no medir la consola
+            with contextlib.redirect_stdout(devnull):
+                result = measure(case['func'], repeats, min_time)
+                result['peak_kib'] = round(peak_memory(case['func']) / 1024, 1)
+            result['input_bytes'] = case['size']
+            results[case['name']] = result
+            
+            if progress:
+                progress(case, result)
+    return results
+
+
+def compare_results(results, baseline, threshold=0.10, memory_threshold=None):
+    """
+    Compara resultados contra un baseline
+    
+    Args:
+        results (dict): Resultados de run_suite()
+        baseline (dict): Resultados guardados previamente
+        threshold (float): Caída máxima tolerada de ops/s (0.10 = 10 %)
+        memory_threshold (float): Aumento máximo tolerado de memoria pico (opcional)
+    
+    Returns:
+        list: Comparaciones {'name', 'ops_change', 'memory_change', 'regression'}
+    """
+    comparisons = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        
+        ops_change = result['ops_per_sec'] / previous['ops_per_sec'] - 1 if previous.get('ops_per_sec') else 0.0
+        memory_change = None
+        if previous.get('peak_kib'):
+            memory_change = result['peak_kib'] / previous['peak_kib'] - 1
+        
+        regression = ops_change < -threshold
+        if memory_threshold is not None and memory_change is not None:
+            regression = regression or memory_change > memory_threshold
+        
+        comparisons.append({
+            'name': name,
+            'ops_change': round(ops_change, 4),
+            'memory_change': round(memory_change, 4) if memory_change is not None else None,
+            'regression': regression
+        })
+    return comparisons
+
+
+def load_baseline(path):
+    """
+    Lee un baseline guardado con save_baseline()
+    
+    Returns:
+        dict: {nombre: resultado} o None si el archivo no existe
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('results', {})
+
+
+def save_baseline(path, results, **metadata):
+    """Guarda los resultados como baseline junto con datos del entorno (y metadata adicional)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    document = {
+        'created': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        **metadata,
+        'results': results
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False, indent=2)
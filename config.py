@@ -13,9 +13,27 @@ class Config:
     HOST = '0.0.0.0'
     PORT = int(os.environ.get('PORT', 5000))  # Heroku asigna el puerto dinámicamente
     
+    # Logging (JSON por línea a stdout, escrito desde un hilo aparte)
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')  # 'json' o 'text' (legible en desarrollo)
+    LOG_QUEUE_SIZE = 10000  # Registros pendientes antes de descartar (nunca se bloquea)
+    LOG_SAMPLE_BURST = 20  # Mensajes iguales por ventana antes de muestrear (0 = sin muestreo)
+    LOG_SAMPLE_WINDOW_SECONDS = 60
+    LOG_SAMPLE_EVERY = 100  # Tras el burst, 1 de cada N
+    
     # INEGI
-    INEGI_BASE_URL = "https://www.inegi.org.mx"
+    INEGI_BASE_URL = os.environ.get('INEGI_BASE_URL', "https://www.inegi.org.mx")  # O el servidor de reproducción (replay.py)
     REQUEST_TIMEOUT = 30
+    
+    # Cliente HTTP (sesión compartida con keep-alive)
+    HTTP_CONNECT_TIMEOUT = 5  # Segundos para establecer TCP+TLS
+    HTTP_READ_TIMEOUT = REQUEST_TIMEOUT  # Segundos de espera entre bytes recibidos
+    HTTP_POOL_CONNECTIONS = 4  # Hosts distintos con pool propio
+    HTTP_POOL_MAXSIZE = 10  # Conexiones reutilizables por host
+    HTTP_MAX_RETRIES = 3
+    HTTP_BACKOFF_FACTOR = 0.5  # 0.5s, 1s, 2s...
+    HTTP_RETRY_STATUS = (500, 502, 503, 504)
+    CONDITIONAL_REQUESTS = os.environ.get('CONDITIONAL_REQUESTS', 'True') == 'True'
     USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
     
     # Directorios
@@ -26,10 +44,126 @@ class Config:
     JSON_FILENAME = 'inegi_data.json'
     CSV_FILENAME = 'inegi_data.csv'
     LATEST_JSON = 'inegi_latest.json'
+    HTTP_CACHE_DIR = 'http_cache'  # Validadores ETag/Last-Modified, huella y resultado por URL
+    CRAWL_JSON = 'inegi_crawl.json'
+    
+    # Historial de snapshots (log append-only)
+    SNAPSHOT_DIR = 'snapshots'
+    SNAPSHOT_SEGMENT_MAX_BYTES = 64 * 1024 * 1024  # Rotar también al cambiar de día
+    HISTORY_MAX_RESULTS = 100  # Máximo de snapshots por respuesta de /api/history
+    
+    # Cambios entre snapshots (deltas)
+    CHANGES_JSONL = 'inegi_changes.jsonl'
+    CHANGES_MAX_IN_MEMORY = 1000  # Deltas recientes servidos sin leer disco
+    CHANGES_MAX_RESULTS = 200  # Máximo de deltas por respuesta de /api/changes
+    
+    # Respuestas de /api/data precomprimidas
+    RESPONSE_GZIP_LEVEL = 6
+    RESPONSE_BROTLI_QUALITY = 5
+    
+    # Varios procesos (gunicorn): un líder hace scraping, todos leen la caché compartida
+    SHARED_CACHE_ENABLED = os.environ.get('SHARED_CACHE_ENABLED', 'True') == 'True'
+    SHARED_CACHE_DIR = 'shared'
+    SCHEDULER_LOCK_FILENAME = 'scheduler.lock'
+    LEADER_RETRY_SECONDS = 30
+    
+    # Archivo de HTML crudo (comprimido, direccionado por contenido) y backfill
+    ARCHIVE_ENABLED = os.environ.get('ARCHIVE_ENABLED', 'True') == 'True'
+    ARCHIVE_DIR = 'archive'
+    ARCHIVE_COMPRESSION_LEVEL = 6
+    BACKFILL_DIR = 'backfill'
+    BACKFILL_WORKERS = None  # None = todos los núcleos
+    
+    # Grabación de respuestas para reproducirlas sin red (replay.py)
+    CASSETTE_RECORD = os.environ.get('CASSETTE_RECORD', 'False') == 'True'
+    CASSETTE_DIR = 'cassettes'
+    REPLAY_PORT = 8765
+    
+    # Métricas Prometheus (/api/metrics)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True') == 'True'
+    METRICS_DIR = 'metrics'  # Estado de cada proceso, combinado al exponer
+    METRICS_DUMP_SECONDS = 5  # Frecuencia máxima con la que cada proceso publica su estado
+    
+    # Entidades deduplicadas (SQLite)
+    ENTITY_DB = 'inegi_entities.sqlite3'
+    ENTITY_MAX_RESULTS = 500  # Máximo de entidades por respuesta de /api/entities
+    
+    # Series numéricas de indicadores (columnas binarias con rollups precalculados)
+    INDICATOR_DIR = 'indicators'
+    INDICATOR_BUCKETS = {'5m': 300, '1h': 3600, '1d': 86400, '7d': 604800, '30d': 2592000}  # Alineados a UTC
+    INDICATOR_MAX_POINTS = 2000  # Máximo de puntos por respuesta de /api/indicators/<id>/series
+    
+    # Búsqueda de texto (índice invertido de noticias, secciones y links)
+    SEARCH_DIR = 'search'
+    SEARCH_COMPACT_EVERY = 288  # Snapshots en el journal antes de reescribir el índice (un día cada 5 min)
+    SEARCH_MAX_RESULTS = 100  # Máximo de resultados por respuesta de /api/search
+    
+    # Proyecciones de /api/data (fields=, filtros, limit=/cursor=)
+    PROJECTION_CACHE_SIZE = 64  # Combinaciones de parámetros en caché por snapshot
+    PROJECTION_MAX_LIMIT = 500  # Máximo de elementos por lista y página
+    
+    # Eventos en vivo (/api/stream, Server-Sent Events)
+    STREAM_PORT = int(os.environ['STREAM_PORT']) if os.environ.get('STREAM_PORT') else None  # Servidor SSE asíncrono en el líder (None = /api/stream desde Flask)
+    STREAM_PUBLIC_URL = os.environ.get('STREAM_PUBLIC_URL')  # URL del servidor SSE vista por los clientes (p. ej. detrás de un proxy)
+    STREAM_HEARTBEAT_SECONDS = 15  # Comentario SSE de keepalive (los proxies cortan conexiones inactivas)
+    STREAM_RETRY_MS = 5000  # Espera sugerida al navegador antes de reconectar
+    STREAM_BACKLOG = 100  # Eventos en memoria para reanudar con Last-Event-ID
+    STREAM_MAX_CLIENTS = 10000  # Conexiones simultáneas del servidor SSE antes de responder 503
+    STREAM_MAX_BUFFER_BYTES = 256 * 1024  # Pendiente de enviar por cliente antes de desconectarlo
+    STREAM_POLL_SECONDS = 1  # Sondeo por worker de la versión compartida para emitir eventos
+    STREAM_FALLBACK_CLIENTS = 4  # Conexiones servidas desde Flask sin el worker de stream (cada una ocupa un hilo)
+    STREAM_FALLBACK_SECONDS = 60  # Duración de cada respuesta desde Flask (el navegador reconecta); muy por debajo de --timeout
+    
+    # Scraping manual (/api/scrape)
+    SCRAPE_FRESHNESS_SECONDS = int(os.environ.get('SCRAPE_FRESHNESS_SECONDS', 30))  # Reutilizar un scraping más reciente que esto
+    SCRAPE_COALESCE_TIMEOUT = 120  # Máximo de espera por un scraping en curso
+    SCRAPE_RATE_PER_MINUTE = 6  # Tokens recargados por cliente y minuto
+    SCRAPE_RATE_BURST = 3  # Peticiones seguidas permitidas por cliente
+    
+    # Trabajos asíncronos (POST /api/scrape)
+    JOB_WORKERS = 2  # Hilos que ejecutan trabajos
+    JOB_MAX_PENDING = 16  # Trabajos en cola o en ejecución antes de rechazar (503)
+    JOB_HISTORY_SIZE = 100  # Trabajos recientes consultables en /api/jobs
+    JOBS_DIR = 'jobs'
     
     # Scheduler
     SCRAPING_INTERVAL_MINUTES = 5  # Ejecutar cada 5 minutos
     SCHEDULER_TIMEZONE = 'America/Mexico_City'
+    WARM_START_ENABLED = os.environ.get('WARM_START_ENABLED', 'True') == 'True'  # Arrancar con el último snapshot y scrapear en segundo plano
+    
+    # Intervalo adaptativo: backoff sin cambios, se reduce al detectar cambios
+    ADAPTIVE_INTERVAL_ENABLED = os.environ.get('ADAPTIVE_INTERVAL_ENABLED', 'False') == 'True'
+    ADAPTIVE_MIN_MINUTES = 2
+    ADAPTIVE_MAX_MINUTES = 60
+    ADAPTIVE_BACKOFF_FACTOR = 1.5  # Multiplicador por ejecución sin cambios
+    ADAPTIVE_TIGHTEN_FACTOR = 0.5  # Multiplicador al detectar un cambio
+    ADAPTIVE_JITTER_RATIO = 0.1  # Hasta +10% aleatorio para no sincronizarse con el sitio
+    ADAPTIVE_WINDOW_HOURS = 24  # Ventana para medir la frecuencia de cambios
+    
+    # Objetivos adicionales (calendario, comunicados, páginas de indicadores...)
+    TARGETS_FILE = os.path.join(BASE_DIR, 'targets.json')  # Configuración inicial (opcional)
+    TARGETS_JSON = 'inegi_targets.json'  # Registro vigente (incluye cambios hechos por la API)
+    TARGETS_DIR = 'targets'  # Estado y último snapshot por objetivo
+    TARGET_WORKERS = 4  # Descargas simultáneas entre todos los objetivos
+    TARGET_DEFAULT_INTERVAL_MINUTES = 15
+    TARGET_DEFAULT_PRIORITY = 5  # Menor = más urgente
+    TARGET_REGISTRY_CHECK_SECONDS = 5  # Frecuencia para detectar cambios del registro
+    TARGET_START_SPREAD_SECONDS = 60  # Reparto aleatorio de la primera ejecución
+    
+    # Parser HTML: 'html.parser', 'lxml' (BeautifulSoup sobre lxml) o 'lxml.html' (lxml directo)
+    HTML_PARSER = os.environ.get('HTML_PARSER', 'lxml.html')
+    DEFAULT_ENCODING = 'utf-8'  # Si ni el header ni <meta> declaran charset
+    PARSER_PARITY_CHECK = os.environ.get('PARSER_PARITY_CHECK', 'False') == 'True'
+    
+    # Crawler multi-página (sigue secciones, noticias y links extraídos)
+    CRAWL_ENABLED = os.environ.get('CRAWL_ENABLED', 'False') == 'True'
+    CRAWL_CONCURRENCY = 8  # Peticiones simultáneas (<= HTTP_POOL_MAXSIZE)
+    CRAWL_MAX_DEPTH = 1  # 1 = solo las URLs extraídas de la página principal
+    CRAWL_MAX_PAGES_PER_DEPTH = 40
+    CRAWL_TIME_BUDGET_SECONDS = 180  # Debe caber en el intervalo del scheduler
+    CRAWL_COALESCE_TIMEOUT = 240  # Máximo de espera por un crawl en curso (> CRAWL_TIME_BUDGET_SECONDS)
+    CRAWL_SAME_HOST_ONLY = True
+    CRAWL_SKIP_EXTENSIONS = ('.pdf', '.zip', '.xls', '.xlsx', '.csv', '.doc', '.docx', '.jpg', '.png', '.mp4')
     
     # Límites de extracción
     MAX_SECTIONS = 15
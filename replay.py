@@ -0,0 +1,104 @@
+"""
+Replay - Graba respuestas del sitio y las sirve localmente para pruebas de carga sin red
+
+Uso:
+    python replay.py record --crawl                     # Grabar la página principal (y el crawl)
+    python replay.py serve --latency-ms 80 --jitter-ms 40 --error-rate 0.02 --mutation-rate 0.05
+    
+    # En otra terminal, la aplicación completa contra el sustituto local:
+    INEGI_BASE_URL=http://127.0.0.1:8765 gunicorn app:app
+"""
+import argparse
+import json
+import sys
+from config import Config
+
+
+def record(args):
+    Config.CASSETTE_RECORD = True
+    Config.CONDITIONAL_REQUESTS = False  # Un 304 no tiene cuerpo que grabar
+    if args.cassette:
+        Config.CASSETTE_DIR = args.cassette
+    Config.init_app()
+    
+    from services import ScraperService, CrawlerService
+    
+    scraper_service = ScraperService()
+    data = scraper_service.scrape_homepage()
+    if data.get('status') != 'success':
+        print(f"Error grabando la página principal: {data.get('error')}")
+        return 1
+    
+    if args.crawl:
+        CrawlerService(scraper_service).crawl(data, args.depth)
+    
+    interactions = scraper_service.cassette.interactions()
+    print(f"{len(interactions)} respuesta(s) en {scraper_service.cassette.directory}")
+    return 0
+
+
+def serve(args):
+    if args.cassette:
+        Config.CASSETTE_DIR = args.cassette
+    
+    from services import Cassette, ReplayServer
+    
+    server = ReplayServer(
+        Cassette(),
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        latency_scale=args.latency_scale,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        mutation_rate=args.mutation_rate,
+        mode=args.mode,
+        seed=args.seed
+    )
+    if not server.routes:
+        print(f"El cassette {server.cassette.directory} está vacío (usa 'python replay.py record')")
+        return 1
+    
+    print(f"Sirviendo {len(server.routes)} ruta(s) en {server.base_url} "
+          f"(INEGI_BASE_URL={server.base_url}); Ctrl+C para terminar")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(server.stats, indent=2))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Grabación y reproducción de respuestas del INEGI')
+    parser.add_argument('--cassette', help='Directorio del cassette (por defecto data/<CASSETTE_DIR>)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    record_parser = commands.add_parser('record', help='Grabar respuestas del sitio configurado')
+    record_parser.add_argument('--crawl', action='store_true', help='Grabar también las páginas del crawl')
+    record_parser.add_argument('--depth', type=int, help='Profundidad del crawl (por defecto Config.CRAWL_MAX_DEPTH)')
+    record_parser.set_defaults(handler=record)
+    
+    serve_parser = commands.add_parser('serve', help='Servir las respuestas grabadas')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=Config.REPLAY_PORT)
+    serve_parser.add_argument('--latency-ms', type=float, default=0, help='Latencia fija por respuesta')
+    serve_parser.add_argument('--jitter-ms', type=float, default=0, help='Latencia aleatoria adicional')
+    serve_parser.add_argument('--latency-scale', type=float, default=0.0,
+                              help='Fracción del tiempo grabado a reproducir (1.0 = como el sitio)')
+    serve_parser.add_argument('--error-rate', type=float, default=0.0, help='Proporción de respuestas con error (0-1)')
+    serve_parser.add_argument('--error-status', type=int, default=503, help='Código de las respuestas con error')
+    serve_parser.add_argument('--mutation-rate', type=float, default=0.0,
+                              help='Probabilidad por petición de que la página cambie (0-1)')
+    serve_parser.add_argument('--mode', choices=('latest', 'cycle'), default='latest',
+                              help='Servir la última grabación o recorrerlas en orden')
+    serve_parser.add_argument('--seed', type=int, help='Semilla para corridas repetibles')
+    serve_parser.set_defaults(handler=serve)
+    
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,6 +4,7 @@ import json
 import csv
 from datetime import datetime
 import os
+from services.http_client import HttpClient
 
 
 class INEGIScraper:
@@ -14,6 +15,7 @@ class INEGIScraper:
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        self.http_client = HttpClient(user_agent=self.headers['User-Agent'])
         
     def scrape_homepage(self):
         """
@@ -23,7 +25,7 @@ class INEGIScraper:
             print(f"[{datetime.now()}] Iniciando scraping de INEGI...")
             
             # Realizar petición HTTP
-            response = requests.get(self.base_url, headers=self.headers, timeout=30)
+            response = self.http_client.get(self.base_url)
             response.raise_for_status()
             response.encoding = 'utf-8'
             
@@ -1,8 +1,20 @@
 """
 Servicios de la aplicación
 """
+from .http_client import HttpClient
 from .scraper_service import ScraperService
 from .storage_service import StorageService
 from .scheduler_service import SchedulerService
+from .crawler_service import CrawlerService
+from .diff_service import DiffService
+from .html_archive import HtmlArchive
+from .cassette import Cassette
+from .replay_server import ReplayServer
+from .backfill_service import BackfillService
+from .shared_state import LeaderLock, SharedSnapshot
+from .job_service import JobService
+from .target_registry import TargetRegistry
+from .target_scheduler import TargetScheduler
+from .event_stream import EventBroker, StreamServer
 
-__all__ = ['ScraperService', 'StorageService', 'SchedulerService']
+__all__ = ['HttpClient', 'ScraperService', 'StorageService', 'SchedulerService', 'CrawlerService', 'DiffService', 'HtmlArchive', 'Cassette', 'ReplayServer', 'BackfillService', 'LeaderLock', 'SharedSnapshot', 'JobService', 'TargetRegistry', 'TargetScheduler', 'EventBroker', 'StreamServer']
@@ -0,0 +1,139 @@
+"""
+Intervalo adaptativo - Ajusta la frecuencia de scraping según la frecuencia de cambios observada
+"""
+import time
+from collections import deque
+
+
+class AdaptiveInterval:
+    """
+    Backoff exponencial en periodos sin cambios y reducción al detectar cambios
+    
+    Reglas (siempre dentro de [min_minutes, max_minutes]):
+        - Cambio detectado: intervalo * tighten_factor
+        - Sin cambios: intervalo * backoff_factor, sin superar la mitad del
+          tiempo medio entre los últimos cambios mientras ese ritmo se mantenga
+        - Error: se mantiene el intervalo
+    """
+    
+    def __init__(self, initial_minutes, min_minutes, max_minutes, backoff_factor=1.5,
+                 tighten_factor=0.5, jitter_ratio=0.1, window_hours=24):
+        """
+        Inicializa el intervalo adaptativo
+        
+        Args:
+            initial_minutes (float): Intervalo inicial
+            min_minutes (float): Intervalo mínimo
+            max_minutes (float): Intervalo máximo
+            backoff_factor (float): Multiplicador en ejecuciones sin cambios
+            tighten_factor (float): Multiplicador al detectar un cambio
+            jitter_ratio (float): Fracción del intervalo agregada al azar a cada ejecución
+            window_hours (float): Ventana para medir la frecuencia de cambios
+        """
+        self.min_minutes = min_minutes
+        self.max_minutes = max_minutes
+        self.backoff_factor = backoff_factor
+        self.tighten_factor = tighten_factor
+        self.jitter_ratio = jitter_ratio
+        self.window_seconds = window_hours * 3600
+        self.minutes = self._clamp(initial_minutes)
+        self.rationale = f'Intervalo inicial de {self.minutes:g} minuto(s)'
+        self.quiet_runs = 0
+        self.changes = deque(maxlen=1000)
+    
+    @property
+    def jitter_seconds(self):
+        """Máximo de segundos aleatorios agregados a cada ejecución"""
+        return int(self.minutes * 60 * self.jitter_ratio)
+    
+    def reset(self, minutes):
+        """
+        Fija el intervalo (p. ej. cambio manual) y sigue adaptando desde ahí
+        
+        Args:
+            minutes (float): Nuevo intervalo
+        """
+        self.minutes = self._clamp(minutes)
+        self.quiet_runs = 0
+        self.rationale = f'Intervalo fijado manualmente en {self.minutes:g} minuto(s)'
+    
+    def observe(self, changed, success=True, now=None):
+        """
+        Registra el resultado de un scraping y recalcula el intervalo
+        
+        Args:
+            changed (bool): Si el contenido cambió
+            success (bool): Si el scraping fue exitoso
+            now (float): Instante de la observación (epoch, opcional)
+        
+        Returns:
+            float: Nuevo intervalo en minutos
+        """
+        now = time.time() if now is None else now
+        while self.changes and now - self.changes[0] > self.window_seconds:
+            self.changes.popleft()
+        previous = self.minutes
+        
+        if not success:
+            self.rationale = f'Error en el último scraping: se mantiene {previous:g} minuto(s)'
+            return self.minutes
+        
+        if changed:
+            self.changes.append(now)
+            self.quiet_runs = 0
+            self.minutes = self._clamp(previous * self.tighten_factor)
+            self.rationale = (
+                f'Cambio detectado ({len(self.changes)} en las últimas '
+                f'{self.window_seconds / 3600:g} h): {previous:g} → {self.minutes:g} minuto(s)'
+            )
+            return self.minutes
+        
+        self.quiet_runs += 1
+        target = previous * self.backoff_factor
+        ceiling = self._observed_ceiling(now)
+        if ceiling is not None and target > ceiling:
+            target = max(previous, ceiling)
+            reason = f'limitado a la mitad del tiempo medio entre cambios ({ceiling:g} min)'
+        else:
+            reason = f'backoff x{self.backoff_factor:g}'
+        self.minutes = self._clamp(target)
+        self.rationale = (
+            f'{self.quiet_runs} ejecución(es) sin cambios, {reason}: '
+            f'{previous:g} → {self.minutes:g} minuto(s)'
+        )
+        return self.minutes
+    
+    def status(self):
+        """
+        Estado para get_status
+        
+        Returns:
+            dict: Intervalo, límites, motivo y frecuencia de cambios observada
+        """
+        return {
+            'interval_minutes': self.minutes,
+            'min_minutes': self.min_minutes,
+            'max_minutes': self.max_minutes,
+            'jitter_seconds': self.jitter_seconds,
+            'quiet_runs': self.quiet_runs,
+            'changes_in_window': len(self.changes),
+            'window_hours': self.window_seconds / 3600,
+            'rationale': self.rationale
+        }
+    
+    def _observed_ceiling(self, now):
+        """
+        Mitad del tiempo medio entre cambios recientes
+        
+        None si hay menos de dos cambios o si el silencio actual ya duplica ese
+        tiempo medio (el ritmo observado terminó y el backoff sigue libre).
+        """
+        if len(self.changes) < 2:
+            return None
+        mean_gap = (self.changes[-1] - self.changes[0]) / (len(self.changes) - 1)
+        if now - self.changes[-1] > 2 * mean_gap:
+            return None
+        return round(mean_gap / 60 / 2, 2)
+    
+    def _clamp(self, minutes):
+        return round(min(self.max_minutes, max(self.min_minutes, minutes)), 2)
@@ -0,0 +1,150 @@
+"""
+Servicio de Backfill - Re-ejecuta los extractores actuales sobre el HTML archivado
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from config import Config
+from utils import content_fingerprint, get_logger
+from .html_archive import HtmlArchive
+
+logger = get_logger('BackfillService')
+
+
+# Estado por proceso del pool (se crea una vez por worker)
+_worker_scraper = None
+_worker_archive = None
+
+
+def _init_worker(data_dir, archive_dir):
+    """Inicializa extractores y archivo en cada proceso del pool"""
+    global _worker_scraper, _worker_archive
+    from .scraper_service import ScraperService
+    
+    Config.DATA_DIR = data_dir
+    _worker_scraper = ScraperService()
+    _worker_archive = HtmlArchive(archive_dir)
+
+
+def _extract_archived(task):
+    """Descomprime y extrae un objeto archivado (ejecutado en un proceso del pool)"""
+    digest, base_url, encoding = task
+    try:
+        content = _worker_archive.load(digest)
+        _worker_scraper.base_url = base_url
+        return task, {
+            **_worker_scraper.extract_page(content, encoding),
+            'status': 'success',
+            'content_hash': content_fingerprint(content)
+        }
+    except Exception as e:
+        return task, {'status': 'error', 'error': str(e)}
+
+
+def _url_base(url):
+    """Esquema y host de una URL, usados para normalizar links relativos"""
+    parts = url.split('/', 3)
+    return '/'.join(parts[:3]) if len(parts) >= 3 else Config.INEGI_BASE_URL
+
+
+class BackfillService:
+    """Servicio que reprocesa descargas archivadas usando todos los núcleos"""
+    
+    def __init__(self, html_archive=None, storage_service=None):
+        """
+        Inicializa el servicio de backfill
+        
+        Args:
+            html_archive: Instancia de HtmlArchive (opcional)
+            storage_service: Servicio de almacenamiento para registrar entidades (opcional)
+        """
+        self.html_archive = html_archive or HtmlArchive()
+        self.storage_service = storage_service
+    
+    def run(self, start=None, end=None, url=None, workers=None, output=None, save_entities=False):
+        """
+        Re-extrae todas las descargas archivadas de un rango
+        
+        Args:
+            start (str): Inicio del rango (opcional)
+            end (str): Fin del rango (opcional)
+            url (str): Limitar a una URL (opcional)
+            workers (int): Procesos del pool (por defecto, todos los núcleos)
+            output (str): Archivo JSONL de salida (opcional)
+            save_entities (bool): Registrar las entidades en el EntityStore
+        
+        Returns:
+            dict: Resumen del backfill
+        """
+        started = time.monotonic()
+        workers = workers or Config.BACKFILL_WORKERS or os.cpu_count() or 1
+        entries = self.html_archive.entries(start, end, url)
+        
+        # El mismo contenido se extrae una sola vez aunque se haya descargado muchas veces
+        tasks = {self._task_for(entry) for entry in entries}
+        
+        logger.info("%s descarga(s), %s contenido(s) distinto(s), %s proceso(s)", len(entries), len(tasks), workers)
+        
+        extracted = {}
+        if tasks:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(Config.DATA_DIR, self.html_archive.directory)
+            ) as executor:
+                for task, fields in executor.map(_extract_archived, tasks, chunksize=chunksize):
+                    extracted[task] = fields
+        
+        results = [self._result_for(entry, extracted[self._task_for(entry)]) for entry in entries]
+        output = output or self._default_output()
+        self._write_results(output, results)
+        
+        if save_entities and self.storage_service:
+            self.storage_service.entity_store.upsert_snapshots(
+                [r for r in results if r['status'] == 'success']
+            )
+        
+        summary = {
+            'fetches': len(entries),
+            'distinct_pages': len(tasks),
+            'errors': sum(1 for r in results if r['status'] != 'success'),
+            'workers': workers,
+            'output': output,
+            'elapsed_seconds': round(time.monotonic() - started, 3)
+        }
+        logger.info("Backfill completado: %s", summary)
+        return summary
+    
+    def _task_for(self, entry):
+        """Unidad de trabajo: contenido, base para links relativos y codificación"""
+        return (entry['sha256'], _url_base(entry['url']), entry.get('encoding'))
+    
+    def _result_for(self, entry, fields):
+        """Resultado con el mismo formato que ScraperService.scrape_homepage()"""
+        if fields['status'] != 'success':
+            return {
+                'timestamp': entry['timestamp'],
+                'url': entry['url'],
+                'status': 'error',
+                'error': fields['error']
+            }
+        return {
+            'timestamp': entry['timestamp'],
+            'url': entry['url'],
+            **fields
+        }
+    
+    def _default_output(self):
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        directory = os.path.join(Config.DATA_DIR, Config.BACKFILL_DIR)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f'backfill_{stamp}.jsonl')
+    
+    def _write_results(self, output, results):
+        """Escribe todos los resultados de una vez (un solo archivo JSONL)"""
+        lines = [json.dumps(r, ensure_ascii=False, separators=(',', ':')) for r in results]
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + ('\n' if lines else ''))
@@ -0,0 +1,136 @@
+"""
+Cassette - Respuestas HTTP grabadas del sitio para reproducirlas sin red
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit
+from config import Config
+
+
+def replay_key(url):
+    """
+    Clave de reproducción de una URL: ruta y query, sin esquema ni host
+    
+    Así una grabación de https://www.inegi.org.mx/temas/ se sirve en
+    http://127.0.0.1:8765/temas/ sin reescribir nada.
+    """
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    return f'{path}?{parts.query}' if parts.query else path
+
+
+class Cassette:
+    """
+    Directorio con las respuestas grabadas por ScraperService
+    
+    Estructura:
+        interactions.jsonl   - una línea por respuesta (url, status, headers, sha256, tiempo)
+        bodies/ab/<sha>.html - cuerpo ya descomprimido, una vez por contenido distinto
+    """
+    
+    INDEX_FILENAME = 'interactions.jsonl'
+    # Headers que dependen de la conexión o de la codificación de transporte original,
+    # y validadores que ReplayServer recalcula para cada versión del cuerpo
+    SKIP_HEADERS = frozenset([
+        'connection', 'keep-alive', 'transfer-encoding', 'content-encoding',
+        'content-length', 'date', 'set-cookie', 'strict-transport-security',
+        'etag', 'last-modified'
+    ])
+    
+    def __init__(self, directory=None):
+        """
+        Inicializa el cassette
+        
+        Args:
+            directory (str): Directorio del cassette (opcional)
+        """
+        self.directory = directory or os.path.join(Config.DATA_DIR, Config.CASSETTE_DIR)
+        self.bodies_dir = os.path.join(self.directory, 'bodies')
+        self.index_path = os.path.join(self.directory, self.INDEX_FILENAME)
+        self._lock = threading.Lock()
+        os.makedirs(self.bodies_dir, exist_ok=True)
+    
+    def record(self, url, response, elapsed=None):
+        """
+        Graba una respuesta (su cuerpo ya debe estar descargado)
+        
+        Args:
+            url (str): URL solicitada
+            response (Response): Respuesta HTTP
+            elapsed (float): Segundos totales hasta recibir el cuerpo (opcional)
+        
+        Returns:
+            dict: Interacción registrada
+        """
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        path = self.body_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        
+        if elapsed is None:
+            elapsed = response.elapsed.total_seconds()
+        interaction = {
+            'recorded_at': datetime.now().isoformat(),
+            'url': url,
+            'key': replay_key(url),
+            'status': response.status_code,
+            'headers': {
+                name: value for name, value in response.headers.items()
+                if name.lower() not in self.SKIP_HEADERS
+            },
+            'sha256': digest,
+            'size': len(body),
+            'elapsed': round(elapsed, 4)
+        }
+        with self._lock:
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(interaction, ensure_ascii=False, separators=(',', ':')) + '\n')
+        return interaction
+    
+    def interactions(self):
+        """
+        Respuestas grabadas
+        
+        Returns:
+            list: Interacciones en orden de grabación
+        """
+        interactions = []
+        if not os.path.exists(self.index_path):
+            return interactions
+        
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    interactions.append(json.loads(line))
+                except ValueError:
+                    continue  # Línea incompleta por escritura interrumpida
+        return interactions
+    
+    def by_key(self):
+        """
+        Respuestas agrupadas por clave de reproducción
+        
+        Returns:
+            dict: {ruta?query: [interacciones en orden de grabación]}
+        """
+        grouped = {}
+        for interaction in self.interactions():
+            grouped.setdefault(interaction['key'], []).append(interaction)
+        return grouped
+    
+    def load_body(self, digest):
+        """Cuerpo grabado para un hash"""
+        with open(self.body_path(digest), 'rb') as f:
+            return f.read()
+    
+    def body_path(self, digest):
+        """Ruta del cuerpo para un hash"""
+        return os.path.join(self.bodies_dir, digest[:2], f'{digest}.html')
@@ -0,0 +1,228 @@
+"""
+Servicio de Crawling - Microservicio para recorrer las páginas enlazadas desde el INEGI
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlparse, urldefrag
+import requests
+from config import Config
+from utils import get_logger
+
+logger = get_logger('CrawlerService')
+
+
+class CrawlerService:
+    """Servicio que visita concurrentemente las URLs extraídas de la página principal"""
+    
+    # Campos de un resultado de ScraperService que contienen URLs a seguir
+    FRONTIER_FIELDS = ('main_sections', 'latest_news', 'important_links')
+    
+    def __init__(self, scraper_service):
+        """
+        Inicializa el servicio de crawling
+        
+        Args:
+            scraper_service: Instancia del servicio de scraping (cliente HTTP y extractores)
+        """
+        self.scraper_service = scraper_service
+        self.concurrency = Config.CRAWL_CONCURRENCY
+        self.max_depth = Config.CRAWL_MAX_DEPTH
+        self.max_pages_per_depth = Config.CRAWL_MAX_PAGES_PER_DEPTH
+        self.time_budget = Config.CRAWL_TIME_BUDGET_SECONDS
+        self.allowed_host = urlparse(Config.INEGI_BASE_URL).hostname
+    
+    def crawl(self, seed_data, max_depth=None):
+        """
+        Recorre las URLs de un resultado de scraping y agrega lo extraído
+        
+        Args:
+            seed_data (dict): Resultado de ScraperService.scrape_homepage()
+            max_depth (int): Profundidad máxima (opcional)
+        
+        Returns:
+            dict: Resultado agregado del crawl
+        """
+        if max_depth is None:
+            max_depth = self.max_depth
+        
+        started = time.monotonic()
+        logger.info("Iniciando crawl (profundidad %s, concurrencia %s)...", max_depth, self.concurrency)
+        
+        try:
+            pages = asyncio.run(self._crawl(seed_data, max_depth, started))
+        except Exception as e:
+            logger.error("Error: %s", e)
+            return {
+                'timestamp': datetime.now().isoformat(),
+                'url': seed_data.get('url', Config.INEGI_BASE_URL),
+                'status': 'error',
+                'error': str(e),
+                'pages': []
+            }
+        
+        result = self._aggregate(seed_data, pages, time.monotonic() - started)
+        
+        logger.info("Crawl completado en %ss - Páginas visitadas: %s, con error: %s",
+                    result['elapsed_seconds'], result['pages_crawled'], result['pages_failed'])
+        
+        return result
+    
+    async def _crawl(self, seed_data, max_depth, started):
+        """Recorre la frontera nivel por nivel con concurrencia acotada"""
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        visited = {self._canonical(seed_data.get('url', Config.INEGI_BASE_URL))}
+        frontier = self._frontier_from(seed_data, visited)
+        pages = []
+        stopped = threading.Event()
+        futures = []
+        
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='crawler')
+        try:
+            for depth in range(1, max_depth + 1):
+                remaining = self.time_budget - (time.monotonic() - started)
+                if not frontier or remaining <= 0:
+                    break
+                
+                # Solo se marcan como visitadas las URLs que entran al nivel; las que
+                # exceden el límite pasan al siguiente
+                batch, overflow = frontier[:self.max_pages_per_depth], frontier[self.max_pages_per_depth:]
+                visited.update(batch)
+                tasks = [
+                    asyncio.ensure_future(self._visit(executor, futures, semaphore, url, depth, stopped))
+                    for url in batch
+                ]
+                done, pending = await asyncio.wait(tasks, timeout=remaining)
+                
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    logger.warning("Presupuesto de tiempo agotado, %s página(s) descartada(s)", len(pending))
+                
+                level = [task.result() for task in tasks if task in done]
+                pages.extend(level)
+                
+                discovered = [
+                    url for page in level if page['status'] == 'success'
+                    for url in self._frontier_from(page, visited)
+                ]
+                frontier = list(dict.fromkeys(overflow + discovered))
+                
+                if pending:
+                    break
+        finally:
+            # Las peticiones que no empezaron se cancelan; las que están en curso ya no
+            # se extraen y se esperan a lo sumo un read timeout
+            stopped.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            in_flight = [future for future in futures if not future.done()]
+            if in_flight:
+                await asyncio.wait([asyncio.wrap_future(future) for future in in_flight],
+                                   timeout=Config.HTTP_READ_TIMEOUT)
+        
+        return pages
+    
+    async def _visit(self, executor, futures, semaphore, url, depth, stopped):
+        """Descarga y extrae una página en un hilo del pool"""
+        async with semaphore:
+            future = executor.submit(self._fetch_and_extract, url, depth, stopped)
+            futures.append(future)
+            return await asyncio.wrap_future(future)
+    
+    def _fetch_and_extract(self, url, depth, stopped=None):
+        """Petición bloqueante + extracción, ejecutada fuera del event loop"""
+        try:
+            response = self.scraper_service.http_client.get(url)
+            self.scraper_service.record_response(url, response)
+            # Crawl terminado mientras llegaba la respuesta: no extraer
+            if stopped is not None and stopped.is_set():
+                return self._page_error(url, depth, 'Crawl terminado')
+            response.raise_for_status()
+            
+            content_type = response.headers.get('Content-Type', '')
+            if 'html' not in content_type:
+                return self._page_error(url, depth, f'Contenido no HTML: {content_type}')
+            
+            encoding = self.scraper_service.detect_encoding(response)
+            self.scraper_service.archive_response(response, url, encoding)
+            return {
+                'url': url,
+                'depth': depth,
+                **self.scraper_service.extract_page(response.content, encoding),
+                'status': 'success'
+            }
+        except requests.RequestException as e:
+            return self._page_error(url, depth, f'Error de conexión: {e}')
+        except Exception as e:
+            return self._page_error(url, depth, str(e))
+    
+    def _frontier_from(self, data, visited):
+        """Obtiene las URLs no visitadas de un resultado, sin repetir (no las marca como visitadas)"""
+        frontier = {}
+        for field in self.FRONTIER_FIELDS:
+            for item in data.get(field, []):
+                url = self._canonical(item.get('url', ''))
+                if url and url not in visited and self._should_follow(url):
+                    frontier[url] = None
+        return list(frontier)
+    
+    def _should_follow(self, url):
+        """Filtra URLs externas o que apuntan a archivos no HTML"""
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https'):
+            return False
+        if Config.CRAWL_SAME_HOST_ONLY and parsed.hostname != self.allowed_host:
+            return False
+        return not parsed.path.lower().endswith(Config.CRAWL_SKIP_EXTENSIONS)
+    
+    def _canonical(self, url):
+        """Normaliza una URL para detectar duplicados"""
+        if not url or url == 'N/A':
+            return ''
+        return urldefrag(url)[0]
+    
+    def _aggregate(self, seed_data, pages, elapsed):
+        """Combina los resultados de todas las páginas en uno solo"""
+        aggregated = {
+            'main_sections': {},
+            'latest_news': {},
+            'featured_indicators': {},
+            'important_links': {}
+        }
+        keys = {
+            'main_sections': lambda s: s['name'],
+            'latest_news': lambda n: (n['title'], n['url']),
+            'featured_indicators': lambda i: i,
+            'important_links': lambda l: l['text']
+        }
+        
+        for page in pages:
+            if page['status'] != 'success':
+                continue
+            for field, key in keys.items():
+                for item in page.get(field, []):
+                    aggregated[field].setdefault(key(item), item)
+        
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'url': seed_data.get('url', Config.INEGI_BASE_URL),
+            'status': 'success',
+            'elapsed_seconds': round(elapsed, 3),
+            'pages_crawled': sum(1 for p in pages if p['status'] == 'success'),
+            'pages_failed': sum(1 for p in pages if p['status'] != 'success'),
+            'depth_reached': max((p['depth'] for p in pages), default=0),
+            'aggregated': {field: list(items.values()) for field, items in aggregated.items()},
+            'pages': pages
+        }
+    
+    def _page_error(self, url, depth, error_message):
+        """Genera resultado de error para una página"""
+        return {
+            'url': url,
+            'depth': depth,
+            'status': 'error',
+            'error': error_message
+        }
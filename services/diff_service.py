@@ -0,0 +1,214 @@
+"""
+Servicio de Cambios - Calcula y sirve las diferencias entre snapshots consecutivos
+"""
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from config import Config
+from utils import get_logger
+from .snapshot_log import parse_timestamp
+
+logger = get_logger('DiffService')
+
+
+# Campo de lista → función que obtiene la clave de identidad de cada elemento
+LIST_FIELDS = {
+    'main_sections': lambda item: item.get('name'),
+    'latest_news': lambda item: item.get('title'),
+    'featured_indicators': lambda item: item,
+    'important_links': lambda item: item.get('text')
+}
+SCALAR_FIELDS = ('title',)
+
+
+def diff_snapshots(previous, current):
+    """
+    Compara dos resultados de scraping campo por campo
+    
+    Args:
+        previous (dict): Snapshot anterior
+        current (dict): Snapshot nuevo
+    
+    Returns:
+        dict: Cambios por campo (vacío si no hay diferencias)
+    """
+    changes = {}
+    
+    for field in SCALAR_FIELDS:
+        if previous.get(field) != current.get(field):
+            changes[field] = {'from': previous.get(field), 'to': current.get(field)}
+    
+    for field, key in LIST_FIELDS.items():
+        before = {key(item): item for item in previous.get(field, [])}
+        after = {key(item): item for item in current.get(field, [])}
+        
+        added = [item for k, item in after.items() if k not in before]
+        removed = [item for k, item in before.items() if k not in after]
+        modified = [
+            {'from': before[k], 'to': item}
+            for k, item in after.items()
+            if k in before and before[k] != item
+        ]
+        
+        if added or removed or modified:
+            changes[field] = {}
+            if added:
+                changes[field]['added'] = added
+            if removed:
+                changes[field]['removed'] = removed
+            if modified:
+                changes[field]['modified'] = modified
+    
+    return changes
+
+
+class DiffService:
+    """Servicio que guarda solo los deltas entre snapshots, con número de versión"""
+    
+    def __init__(self, changes_path=None):
+        """
+        Inicializa el servicio y recupera la última versión del log de cambios
+        
+        Args:
+            changes_path (str): Archivo JSONL de cambios (opcional)
+        """
+        self.changes_path = changes_path or os.path.join(Config.DATA_DIR, Config.CHANGES_JSONL)
+        self.recent = deque(maxlen=Config.CHANGES_MAX_IN_MEMORY)
+        self.version = 0
+        self._lock = threading.Lock()
+        self._offset = 0  # Bytes del log ya incorporados (solo líneas completas)
+        self._load()
+    
+    def record(self, previous, current):
+        """
+        Calcula y guarda el delta entre dos snapshots
+        
+        Args:
+            previous (dict): Snapshot anterior (puede estar vacío)
+            current (dict): Snapshot nuevo
+        
+        Returns:
+            dict: Entrada de cambios registrada o None si no hubo diferencias
+        """
+        if not previous or previous.get('status') != 'success':
+            return None
+        
+        changes = diff_snapshots(previous, current)
+        if not changes:
+            return None
+        
+        with self._lock:
+            self.version += 1
+            entry = {
+                'version': self.version,
+                'timestamp': current.get('timestamp', datetime.now().isoformat()),
+                'previous_timestamp': previous.get('timestamp'),
+                'changes': changes
+            }
+            try:
+                Config.init_app()
+                with open(self.changes_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+                self._offset = self._file_size()
+            except Exception as e:
+                logger.error("Error guardando cambios: %s", e)
+            self.recent.append(entry)
+        
+        logger.info("Versión %s: cambios en %s", self.version, ', '.join(changes))
+        return entry
+    
+    def changes_since(self, since=None, limit=None):
+        """
+        Cambios posteriores a una versión o a un instante
+        
+        Args:
+            since (str): Número de versión (solo dígitos) o timestamp ISO 8601/epoch con decimales
+            limit (int): Máximo de entradas (opcional)
+        
+        Returns:
+            list: Entradas de cambios en orden cronológico
+        
+        Raises:
+            ValueError: Si since no es una versión ni un timestamp válido
+        """
+        if since is None or str(since).strip() == '':
+            predicate = lambda entry: True
+        elif str(since).strip().isdigit():
+            version = int(since)
+            predicate = lambda entry: entry['version'] > version
+        else:
+            ts = parse_timestamp(since)
+            predicate = lambda entry: parse_timestamp(entry['timestamp']) > ts
+        
+        with self._lock:
+            recent = list(self.recent)
+        
+        # Si la caché en memoria no cubre el rango solicitado, leer el log completo
+        if (recent and not predicate(recent[0])) or len(recent) == self.version:
+            entries = [entry for entry in recent if predicate(entry)]
+        else:
+            entries = [entry for entry in self._read_all() if predicate(entry)]
+        
+        return entries[:limit] if limit is not None else entries
+    
+    def refresh(self):
+        """Incorpora los cambios que otro proceso agregó al log (solo lee lo nuevo)"""
+        with self._lock:
+            size = self._file_size()
+            if size == self._offset:
+                return
+            if size < self._offset:
+                # Log truncado o reemplazado: volver a leerlo completo
+                self.version = 0
+                self.recent.clear()
+                self._offset = 0
+            self._read_tail()
+    
+    def _load(self):
+        """Recupera la versión actual y los cambios recientes desde disco"""
+        self._offset = 0
+        self._read_tail()
+    
+    def _read_tail(self):
+        """Lee las líneas completas posteriores a self._offset (con el lock tomado)"""
+        try:
+            with open(self.changes_path, 'rb') as f:
+                f.seek(self._offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # Línea aún en escritura: se lee en el próximo refresh
+                    self._offset += len(line)
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Línea incompleta por escritura interrumpida
+                    self.version = max(self.version, entry['version'])
+                    self.recent.append(entry)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error("Error leyendo cambios: %s", e)
+    
+    def _file_size(self):
+        try:
+            return os.path.getsize(self.changes_path)
+        except OSError:
+            return 0
+    
+    def _read_all(self):
+        entries = []
+        try:
+            if os.path.exists(self.changes_path):
+                with open(self.changes_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        line = line.strip()
+                        if line:
+                            try:
+                                entries.append(json.loads(line))
+                            except ValueError:
+                                continue  # Línea incompleta por escritura interrumpida
+        except Exception as e:
+            logger.error("Error leyendo cambios: %s", e)
+        return entries
@@ -0,0 +1,313 @@
+"""
+Almacén de entidades - Noticias, links, secciones e indicadores deduplicados en SQLite
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit
+from config import Config
+from .snapshot_log import parse_timestamp
+
+
+# Tipo de entidad → (tabla, campo del snapshot, columnas de contenido)
+ENTITY_TYPES = {
+    'news': ('news', 'latest_news', ('title', 'url', 'date')),
+    'links': ('links', 'important_links', ('text', 'url')),
+    'sections': ('sections', 'main_sections', ('name', 'url')),
+    'indicators': ('indicators', 'featured_indicators', ('text',))
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    url TEXT,
+    date TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    seen_count INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS links (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    text TEXT NOT NULL,
+    url TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    seen_count INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    url TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    seen_count INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS indicators (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    text TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    seen_count INTEGER NOT NULL DEFAULT 1
+);
+DROP TABLE IF EXISTS snapshots;
+CREATE INDEX IF NOT EXISTS idx_news_first_seen ON news (first_seen);
+CREATE INDEX IF NOT EXISTS idx_news_last_seen ON news (last_seen);
+CREATE INDEX IF NOT EXISTS idx_links_first_seen ON links (first_seen);
+CREATE INDEX IF NOT EXISTS idx_links_last_seen ON links (last_seen);
+CREATE INDEX IF NOT EXISTS idx_links_url ON links (url);
+CREATE INDEX IF NOT EXISTS idx_sections_first_seen ON sections (first_seen);
+CREATE INDEX IF NOT EXISTS idx_sections_last_seen ON sections (last_seen);
+CREATE INDEX IF NOT EXISTS idx_indicators_first_seen ON indicators (first_seen);
+CREATE INDEX IF NOT EXISTS idx_indicators_last_seen ON indicators (last_seen);
+"""
+
+
+def canonical_url(url):
+    """
+    Normaliza una URL para usarla como clave (esquema/host en minúsculas, sin fragmento ni / final)
+    
+    Args:
+        url (str): URL extraída
+    
+    Returns:
+        str: URL canónica o '' si no hay URL
+    """
+    if not url or url == 'N/A':
+        return ''
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ''))
+
+
+def _normalize_text(text):
+    return ' '.join(str(text).split()).lower()
+
+
+def entity_key(entity_type, item):
+    """
+    Clave estable de una entidad: hash de URL canónica y texto normalizado
+    
+    Args:
+        entity_type (str): Uno de ENTITY_TYPES
+        item (dict | str): Elemento del snapshot
+    
+    Returns:
+        str: SHA-1 hexadecimal
+    """
+    if entity_type == 'indicators':
+        parts = (_normalize_text(item),)
+    elif entity_type == 'news':
+        parts = (canonical_url(item.get('url')), _normalize_text(item.get('title', '')))
+    elif entity_type == 'links':
+        parts = (canonical_url(item.get('url')), _normalize_text(item.get('text', '')))
+    else:
+        parts = (canonical_url(item.get('url')), _normalize_text(item.get('name', '')))
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+class EntityStore:
+    """Entidades deduplicadas entre snapshots con first_seen/last_seen"""
+    
+    def __init__(self, db_path=None):
+        """
+        Abre (o crea) la base de datos SQLite en modo WAL
+        
+        Args:
+            db_path (str): Ruta del archivo SQLite (opcional)
+        """
+        self.db_path = db_path or os.path.join(Config.DATA_DIR, Config.ENTITY_DB)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+    
+    def upsert_snapshot(self, data):
+        """
+        Registra todas las entidades de un snapshot en una sola transacción
+        
+        Args:
+            data (dict): Resultado de ScraperService
+        
+        Returns:
+            dict: Entidades procesadas por tipo
+        """
+        return self.upsert_snapshots([data])
+    
+    def upsert_snapshots(self, snapshots):
+        """
+        Registra las entidades de varios snapshots en una sola transacción
+        
+        Los snapshots se aplican en orden de timestamp y se omite cualquiera que no
+        sea posterior al último last_seen registrado: repetir un backfill no vuelve
+        a sumar seen_count. Por lo mismo, un backfill de un periodo anterior debe
+        hacerse sobre una base vacía.
+        
+        Args:
+            snapshots (list): Resultados de ScraperService
+        
+        Returns:
+            dict: Entidades procesadas por tipo
+        """
+        counts = {entity_type: 0 for entity_type in ENTITY_TYPES}
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                watermark = self._watermark()
+                for seen, data in sorted(self._timestamped(snapshots), key=lambda pair: pair[0]):
+                    if watermark is not None and seen <= watermark:
+                        continue
+                    watermark = seen
+                    
+                    for entity_type, (table, field, columns) in ENTITY_TYPES.items():
+                        rows = self._rows(entity_type, columns, data.get(field, []), seen)
+                        if rows:
+                            self._conn.executemany(self._upsert_sql(table, columns), rows)
+                        counts[entity_type] += len(rows)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        
+        return counts
+    
+    def _timestamped(self, snapshots):
+        """Pares (timestamp, snapshot); sin timestamp válido se usa la hora actual"""
+        for data in snapshots:
+            try:
+                seen = parse_timestamp(data.get('timestamp'))
+            except (TypeError, ValueError):
+                seen = datetime.now().timestamp()
+            yield seen, data
+    
+    def _watermark(self):
+        """Último last_seen registrado en cualquier tabla (None si la base está vacía)"""
+        sql = ' UNION ALL '.join(f'SELECT MAX(last_seen) FROM {table}' for table, _, _ in ENTITY_TYPES.values())
+        return max((row[0] for row in self._conn.execute(sql) if row[0] is not None), default=None)
+    
+    def touch_snapshot(self, data):
+        """
+        Extiende last_seen de las entidades de un snapshot ya registrado (sin sumar seen_count)
+        
+        Para un contenido que siguió publicado sin cambios: una sola escritura al
+        final del tramo, en lugar de una por ejecución.
+        
+        Args:
+            data (dict): Resultado de ScraperService
+        
+        Returns:
+            int: Entidades actualizadas
+        """
+        seen = parse_timestamp(data['timestamp'])
+        updated = 0
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                for entity_type, (table, field, _) in ENTITY_TYPES.items():
+                    keys = {(seen, entity_key(entity_type, item)) for item in data.get(field, [])}
+                    if keys:
+                        self._conn.executemany(
+                            f'UPDATE {table} SET last_seen = MAX(last_seen, ?) WHERE key = ?', keys
+                        )
+                        updated += len(keys)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return updated
+    
+    def query(self, entity_type, since=None, until=None, active_since=None, limit=100, offset=0):
+        """
+        Consulta entidades por ventana de aparición usando los índices
+        
+        Args:
+            entity_type (str): Uno de ENTITY_TYPES
+            since (str | float): first_seen mínimo (opcional)
+            until (str | float): first_seen máximo (opcional)
+            active_since (str | float): last_seen mínimo (opcional)
+            limit (int): Máximo de resultados
+            offset (int): Resultados a saltar
+        
+        Returns:
+            list: Entidades más recientes primero
+        """
+        table, _, columns = ENTITY_TYPES[entity_type]
+        limit, offset = max(1, limit), max(0, offset)  # LIMIT -1 en SQLite no tiene tope
+        conditions, params = [], []
+        
+        if since is not None:
+            conditions.append('first_seen >= ?')
+            params.append(parse_timestamp(since))
+        if until is not None:
+            conditions.append('first_seen <= ?')
+            params.append(parse_timestamp(until))
+        if active_since is not None:
+            conditions.append('last_seen >= ?')
+            params.append(parse_timestamp(active_since))
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        sql = (
+            f"SELECT {', '.join(columns)}, first_seen, last_seen, seen_count FROM {table} "
+            f"{where} ORDER BY first_seen DESC LIMIT ? OFFSET ?"
+        )
+        
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit, offset]).fetchall()
+        
+        return [self._to_dict(row) for row in rows]
+    
+    def counts(self):
+        """
+        Número de entidades distintas por tipo
+        
+        Returns:
+            dict: {tipo: total}
+        """
+        with self._lock:
+            return {
+                entity_type: self._conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                for entity_type, (table, _, _) in ENTITY_TYPES.items()
+            }
+    
+    def close(self):
+        """Cierra la conexión"""
+        with self._lock:
+            self._conn.close()
+    
+    def _rows(self, entity_type, columns, items, seen):
+        """Filas únicas (por clave) listas para executemany"""
+        rows = {}
+        for item in items:
+            if entity_type == 'indicators':
+                values = (item,)
+            else:
+                values = tuple(item.get(column) for column in columns)
+            rows[entity_key(entity_type, item)] = values
+        return [(key, *values, seen, seen) for key, values in rows.items()]
+    
+    def _upsert_sql(self, table, columns):
+        column_list = ', '.join(columns)
+        placeholders = ', '.join('?' for _ in columns)
+        updates = ', '.join(f'{column} = excluded.{column}' for column in columns)
+        return (
+            f"INSERT INTO {table} (key, {column_list}, first_seen, last_seen) "
+            f"VALUES (?, {placeholders}, ?, ?) "
+            f"ON CONFLICT(key) DO UPDATE SET {updates}, "
+            f"first_seen = MIN(first_seen, excluded.first_seen), "
+            f"last_seen = MAX(last_seen, excluded.last_seen), "
+            f"seen_count = seen_count + 1"
+        )
+    
+    def _to_dict(self, row):
+        item = dict(row)
+        item['first_seen'] = datetime.fromtimestamp(item['first_seen']).isoformat()
+        item['last_seen'] = datetime.fromtimestamp(item['last_seen']).isoformat()
+        return item
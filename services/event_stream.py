@@ -0,0 +1,425 @@
+"""
+Eventos en vivo - Server-Sent Events de snapshots publicados, con reanudación por Last-Event-ID
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from urllib.parse import parse_qs
+from config import Config
+from utils import METRICS, get_logger
+
+logger = get_logger('EventStream')
+
+STREAM_CONNECTIONS = METRICS.counter(
+    'inegi_stream_connections_total',
+    'Conexiones a /api/stream por resultado',
+    ('outcome',)
+)
+STREAM_EVENTS = METRICS.counter(
+    'inegi_stream_events_sent_total',
+    'Eventos SSE escritos a clientes (sin contar heartbeats)'
+)
+
+HEARTBEAT = b': ping\n\n'
+
+
+def format_event(entry):
+    """
+    Serializa un evento en formato SSE
+    
+    Args:
+        entry (dict): Evento con id, event y data
+    
+    Returns:
+        bytes: Bloque id/event/data terminado en línea vacía
+    """
+    data = json.dumps(entry['data'], ensure_ascii=False, separators=(',', ':'))
+    return f"id: {entry['id']}\nevent: {entry['event']}\ndata: {data}\n\n".encode('utf-8')
+
+
+def parse_last_event_id(value):
+    """Last-Event-ID como entero (None si falta o no es válido: se trata como cliente nuevo)"""
+    try:
+        return int(value) if value not in (None, '') else None
+    except ValueError:
+        return None
+
+
+class EventBroker:
+    """
+    Últimos eventos publicados en este proceso, en orden de id creciente
+    
+    Un cliente que se reconecta recibe los eventos posteriores a su
+    Last-Event-ID si siguen en memoria. Si su id es más antiguo que lo que se
+    conserva, recibe solo el último evento marcado con resync (debe volver a
+    pedir /api/data): cada evento describe el snapshot completo por su ETag,
+    así que el último basta para ponerse al día.
+    """
+    
+    def __init__(self, backlog=None):
+        """
+        Args:
+            backlog (int): Eventos a conservar para reanudar (opcional)
+        """
+        self.backlog = deque(maxlen=backlog or Config.STREAM_BACKLOG)
+        self.last_id = 0
+        self._floor = None  # Ids <= floor ya no están completos en memoria
+        self._condition = threading.Condition()
+        self._listeners = []
+    
+    def publish(self, event, data, event_id=None):
+        """
+        Publica un evento y avisa a los suscriptores
+        
+        Args:
+            event (str): Tipo de evento
+            data (dict): Contenido (se serializa como JSON)
+            event_id (int): Id propuesto (la versión compartida); si no avanza se usa el siguiente
+        
+        Returns:
+            dict: Evento publicado
+        """
+        with self._condition:
+            if event_id is None or event_id <= self.last_id:
+                event_id = self.last_id + 1
+            if self._floor is None:
+                self._floor = event_id - 1
+            elif len(self.backlog) == self.backlog.maxlen:
+                self._floor = self.backlog[0]['id']
+            entry = {'id': event_id, 'event': event, 'data': data}
+            self.backlog.append(entry)
+            self.last_id = event_id
+            self._condition.notify_all()
+            listeners = list(self._listeners)
+        
+        for listener in listeners:
+            try:
+                listener(entry)
+            except Exception as e:
+                logger.error("Error notificando evento %s: %s", event_id, e)
+        return entry
+    
+    def replay(self, last_id):
+        """
+        Eventos a enviar al conectarse
+        
+        Args:
+            last_id (int): Last-Event-ID del cliente (None si es nuevo)
+        
+        Returns:
+            tuple: (eventos en orden, último id publicado); si el cliente es nuevo o se
+                quedó atrás, solo el último evento
+        """
+        with self._condition:
+            if not self.backlog or (last_id is not None and last_id >= self.last_id):
+                return [], self.last_id
+            latest = self.backlog[-1]
+            if last_id is None:
+                return [latest], self.last_id
+            if last_id >= self._floor:
+                return [entry for entry in self.backlog if entry['id'] > last_id], self.last_id
+            return [dict(latest, data=dict(latest['data'], resync=True))], self.last_id
+    
+    def wait(self, last_id, timeout):
+        """
+        Espera eventos posteriores a last_id (bloquea el hilo: solo para el modo WSGI)
+        
+        Returns:
+            list: Eventos nuevos (vacío si venció el timeout)
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.last_id > last_id, timeout)
+            return [entry for entry in self.backlog if entry['id'] > last_id]
+    
+    def subscribe(self, listener):
+        """Registra listener(evento), llamado desde el hilo que publica"""
+        with self._condition:
+            self._listeners.append(listener)
+    
+    def unsubscribe(self, listener):
+        with self._condition:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+
+class StreamServer:
+    """
+    Servidor SSE de un solo hilo (asyncio) para /api/stream
+    
+    Una conexión inactiva cuesta un socket y una corrutina suspendida en la
+    lectura, no un hilo: miles de dashboards conectados no ocupan workers de
+    gunicorn. Los eventos se serializan una vez y se escriben en el buffer de
+    cada cliente; un heartbeat común mantiene vivas las conexiones a través de
+    proxies y detecta clientes caídos. Los clientes lentos cuyo buffer supera
+    STREAM_MAX_BUFFER_BYTES se desconectan (el navegador reconecta y reanuda).
+    """
+    
+    PATH = '/api/stream'
+    
+    def __init__(self, broker, host=None, port=None, heartbeat_seconds=None, max_clients=None,
+                 listen=True, poll=None):
+        """
+        Args:
+            broker (EventBroker): Origen de los eventos
+            host (str): Interfaz de escucha (opcional)
+            port (int): Puerto (opcional; 0 = cualquiera libre)
+            heartbeat_seconds (float): Intervalo de keepalive (opcional)
+            max_clients (int): Conexiones simultáneas antes de responder 503 (opcional)
+            listen (bool): Abrir un puerto propio; con False solo atiende conexiones entregadas con adopt()
+            poll (callable): Llamado cada STREAM_POLL_SECONDS para adoptar snapshots de otros procesos (opcional)
+        """
+        self.broker = broker
+        self.host = host or Config.HOST
+        self.port = Config.STREAM_PORT if port is None else port
+        self.listen = listen
+        self.poll = poll
+        self.heartbeat_seconds = heartbeat_seconds or Config.STREAM_HEARTBEAT_SECONDS
+        self.max_clients = max_clients or Config.STREAM_MAX_CLIENTS
+        self.stats_counts = {'connected': 0, 'peak': 0, 'accepted': 0, 'rejected': 0, 'dropped_slow': 0, 'events_sent': 0}
+        self._clients = {}  # writer → id del último evento enviado
+        self._loop = None
+        self._stopping = None
+        self._thread = None
+        self._started = threading.Event()
+        self._start_lock = threading.Lock()
+    
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self):
+        """
+        Inicia el servidor en un hilo propio
+        
+        Returns:
+            int: Puerto en que escucha
+        """
+        with self._start_lock:
+            if self.is_running:
+                return self.port
+            self._started.clear()
+            self._thread = threading.Thread(target=self._run, name='event-stream', daemon=True)
+            self._thread.start()
+            self._started.wait(10)
+        if self.listen:
+            logger.info("Stream SSE escuchando en %s:%s%s", self.host, self.port, self.PATH)
+        else:
+            logger.info("Stream SSE iniciado en el proceso %s (conexiones entregadas por el worker)", os.getpid())
+        return self.port
+    
+    def adopt(self, sock, last_id=None):
+        """
+        Atiende una conexión cuya petición GET /api/stream ya leyó otro servidor
+        
+        El worker de gunicorn entrega el socket (un duplicado del descriptor) y
+        vuelve a atender peticiones: la conexión queda en el loop de este
+        servidor, sin ocupar un hilo. Inicia el servidor si hace falta.
+        
+        Args:
+            sock (socket.socket): Conexión del cliente, sin respuesta enviada
+            last_id (int): Last-Event-ID del cliente (None si es nuevo)
+        """
+        self.start()
+        asyncio.run_coroutine_threadsafe(self._adopt(sock, last_id), self._loop)
+    
+    def stop(self):
+        """Cierra el servidor y todas las conexiones"""
+        if self.is_running and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+            self._thread.join(5)
+        self._thread = None
+    
+    def stats(self):
+        """Conexiones y eventos enviados"""
+        return dict(self.stats_counts, running=self.is_running, port=self.port if self.listen else None)
+    
+    def _run(self):
+        try:
+            asyncio.run(self._serve())
+        except Exception as e:
+            logger.error("Stream SSE detenido: %s", e)
+        finally:
+            self._started.set()
+    
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        server = None
+        if self.listen:
+            server = await asyncio.start_server(self._handle, self.host, self.port, backlog=1024, reuse_address=True)
+            self.port = server.sockets[0].getsockname()[1]
+        self.broker.subscribe(self._on_event)
+        background = [asyncio.ensure_future(self._heartbeat())]
+        if self.poll:
+            background.append(asyncio.ensure_future(self._poll()))
+        self._started.set()
+        try:
+            await self._stopping.wait()
+        finally:
+            self.broker.unsubscribe(self._on_event)
+            for task in background:
+                task.cancel()
+            if server:
+                server.close()
+            for writer in list(self._clients):
+                writer.close()
+            # Los handlers terminan al ver el fin de datos (sin cancelarlos a la mitad)
+            handlers = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            if handlers:
+                await asyncio.wait(handlers, timeout=1)
+            if server:
+                await server.wait_closed()
+    
+    def _on_event(self, entry):
+        """Llamado desde el hilo que publica: la escritura se hace en el loop"""
+        self._loop.call_soon_threadsafe(self._fanout, entry, format_event(entry))
+    
+    def _fanout(self, entry, payload):
+        for writer, last_id in list(self._clients.items()):
+            if entry['id'] <= last_id:
+                continue  # Ya enviado al conectarse (replay)
+            if self._send(writer, payload):
+                self._clients[writer] = entry['id']
+                self.stats_counts['events_sent'] += 1
+                STREAM_EVENTS.inc()
+    
+    def _send(self, writer, payload):
+        if writer.transport.get_write_buffer_size() > Config.STREAM_MAX_BUFFER_BYTES:
+            self.stats_counts['dropped_slow'] += 1
+            STREAM_CONNECTIONS.inc(outcome='dropped_slow')
+            self._clients.pop(writer, None)
+            writer.transport.abort()
+            return False
+        writer.write(payload)
+        return True
+    
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            for writer in list(self._clients):
+                self._send(writer, HEARTBEAT)
+    
+    async def _poll(self):
+        """Un solo sondeo por proceso (no por cliente) de la versión compartida"""
+        while True:
+            await asyncio.sleep(Config.STREAM_POLL_SECONDS)
+            try:
+                await self._loop.run_in_executor(None, self.poll)
+            except Exception as e:
+                logger.error("Error consultando la versión compartida: %s", e)
+    
+    async def _adopt(self, sock, last_id):
+        try:
+            reader, writer = await asyncio.open_connection(sock=sock)
+        except OSError:
+            sock.close()
+            return
+        await self._serve_client(reader, writer, last_id)
+    
+    async def _handle(self, reader, writer):
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout=10)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        
+        lines = head.decode('latin-1').split('\r\n')
+        method, target = (lines[0].split(' ') + ['', ''])[:2]
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        path, _, query = target.partition('?')
+        
+        if method != 'GET' or path != self.PATH:
+            self._reply(writer, '404 Not Found', b'{"status":"error","message":"Solo GET /api/stream"}')
+            return
+        
+        # EventSource envía Last-Event-ID al reconectar; ?last_event_id= sirve para la primera conexión
+        last_id = parse_last_event_id(headers.get('last-event-id') or (parse_qs(query).get('last_event_id') or [None])[0])
+        await self._serve_client(reader, writer, last_id)
+    
+    async def _serve_client(self, reader, writer, last_id):
+        if len(self._clients) >= self.max_clients:
+            self.stats_counts['rejected'] += 1
+            STREAM_CONNECTIONS.inc(outcome='rejected')
+            self._reply(writer, '503 Service Unavailable', b'{"status":"error","message":"Demasiados clientes"}',
+                        extra=f'Retry-After: {int(self.heartbeat_seconds)}\r\n')
+            return
+        
+        writer.write(
+            b'HTTP/1.1 200 OK\r\n'
+            b'Content-Type: text/event-stream; charset=utf-8\r\n'
+            b'Cache-Control: no-cache\r\n'
+            b'Access-Control-Allow-Origin: *\r\n'
+            b'X-Accel-Buffering: no\r\n'
+            b'Connection: keep-alive\r\n\r\n'
+            + f'retry: {Config.STREAM_RETRY_MS}\n\n'.encode('ascii')
+        )
+        events, current_id = self.broker.replay(last_id)
+        for entry in events:
+            writer.write(format_event(entry))
+            self.stats_counts['events_sent'] += 1
+            STREAM_EVENTS.inc()
+        self._clients[writer] = current_id  # Lo publicado hasta aquí ya se envió o no aplica
+        
+        self.stats_counts['accepted'] += 1
+        self.stats_counts['connected'] = len(self._clients)
+        self.stats_counts['peak'] = max(self.stats_counts['peak'], len(self._clients))
+        STREAM_CONNECTIONS.inc(outcome='accepted')
+        try:
+            while await reader.read(1024):
+                pass  # El cliente no envía nada más: fin de datos = desconexión
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            self.stats_counts['connected'] = len(self._clients)
+            writer.close()
+    
+    def _reply(self, writer, status, body, extra=''):
+        writer.write(
+            f'HTTP/1.1 {status}\r\nContent-Type: application/json\r\n{extra}'
+            f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode('latin-1') + body
+        )
+        writer.close()
+
+
+def wsgi_stream(broker, last_id, duration, poll=None):
+    """
+    Generador SSE para servir /api/stream desde Flask (un hilo por cliente)
+    
+    Se usa cuando no hay StreamServer; la respuesta se cierra tras duration
+    segundos y el navegador reconecta con Last-Event-ID, de modo que un worker
+    no queda tomado indefinidamente.
+    
+    Args:
+        broker (EventBroker): Origen de los eventos
+        last_id (int): Last-Event-ID del cliente (None si es nuevo)
+        duration (float): Segundos antes de cerrar la respuesta
+        poll (callable): Llamado en cada espera para adoptar snapshots de otros procesos (opcional)
+    
+    Yields:
+        bytes: Bloques SSE
+    """
+    yield f'retry: {Config.STREAM_RETRY_MS}\n\n'.encode('ascii')
+    events, last_id = broker.replay(last_id)
+    for entry in events:
+        STREAM_EVENTS.inc()
+        yield format_event(entry)
+    
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        if poll:
+            poll()
+        events = broker.wait(last_id, min(Config.STREAM_HEARTBEAT_SECONDS, max(deadline - time.monotonic(), 0)))
+        if not events:
+            yield HEARTBEAT
+            continue
+        for entry in events:
+            last_id = entry['id']
+            STREAM_EVENTS.inc()
+            yield format_event(entry)
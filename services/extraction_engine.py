@@ -0,0 +1,446 @@
+"""
+Motor de extracción - Recorre el DOM una sola vez y despacha a todos los extractores
+"""
+import copy
+import time
+from config import Config
+from utils import record_phase, get_logger
+from .html_parser import is_lxml_tree
+
+logger = get_logger('ExtractionEngine')
+
+
+class Extractor:
+    """
+    Extractor base registrado en el motor
+    
+    Cada extractor declara los nombres de tag que le interesan; el motor solo
+    le notifica esos nodos. Si enter() devuelve True, el motor llamará a
+    exit() con el mismo tag al terminar de recorrer su subárbol.
+    """
+    
+    field = None
+    tag_names = ()
+    
+    def start(self):
+        """Reinicia el estado antes de un recorrido"""
+    
+    def enter(self, tag, class_text):
+        """
+        Procesa un nodo relevante
+        
+        Args:
+            tag (Tag): Nodo visitado
+            class_text (str): Clases del nodo unidas y en minúsculas
+        
+        Returns:
+            bool: True si se debe notificar la salida del nodo
+        """
+        return False
+    
+    def exit(self, tag):
+        """Notifica que se terminó de recorrer el subárbol de tag"""
+    
+    def result(self):
+        """Construye el valor final del campo"""
+        raise NotImplementedError
+
+
+class LxmlTag:
+    """
+    Adaptador mínimo de un elemento lxml con la interfaz de Tag que usan los extractores
+    
+    Reproduce get_text() de BeautifulSoup: ignora comentarios y el texto de
+    script/style/template/rt/rp.
+    """
+    
+    __slots__ = ('element', 'name')
+    
+    _SKIP_TEXT = frozenset(('script', 'style', 'template', 'rt', 'rp'))
+    
+    def __init__(self, element):
+        self.element = element
+        self.name = element.tag
+    
+    def get(self, key, default=None):
+        return self.element.get(key, default)
+    
+    def __getitem__(self, key):
+        return self.element.attrib[key]
+    
+    def __bool__(self):
+        return True
+    
+    @property
+    def text(self):
+        return self.get_text()
+    
+    def get_text(self, strip=False):
+        strings = []
+        self._collect(self.element, strings, True)
+        if strip:
+            return ''.join(s for s in (string.strip() for string in strings) if s)
+        return ''.join(strings)
+    
+    @classmethod
+    def _collect(cls, element, strings, include_text):
+        if include_text and element.text:
+            strings.append(element.text)
+        for child in element:
+            tag = child.tag
+            if isinstance(tag, str):
+                cls._collect(child, strings, include_text and tag not in cls._SKIP_TEXT)
+            if include_text and child.tail:
+                strings.append(child.tail)
+
+
+class _Exit:
+    """Marcador de salida de un subárbol en la pila del recorrido"""
+    
+    __slots__ = ('extractor', 'tag')
+    
+    def __init__(self, extractor, tag):
+        self.extractor = extractor
+        self.tag = tag
+
+
+def _has_keyword(class_text, keywords):
+    """Equivale al class_=lambda x: x and (kw in x.lower() ...) de BeautifulSoup"""
+    return bool(class_text) and any(keyword in class_text for keyword in keywords)
+
+
+def _has_href(tag):
+    """Equivale a find_all('a', href=True)"""
+    return tag.get('href') is not None
+
+
+class TitleExtractor(Extractor):
+    """Título de la página (primer <title> del documento)"""
+    
+    field = 'title'
+    tag_names = ('title',)
+    
+    def start(self):
+        self.title = None
+    
+    def enter(self, tag, class_text):
+        if self.title is None:
+            self.title = tag
+        return False
+    
+    def result(self):
+        return self.title.text.strip() if self.title else "Sin título"
+
+
+class SectionsExtractor(Extractor):
+    """Links de los primeros contenedores de navegación (menu/nav)"""
+    
+    field = 'main_sections'
+    container_names = ('nav', 'ul', 'div')
+    keywords = ('menu', 'nav')
+    max_containers = 3
+    max_links_per_container = 10
+    
+    def __init__(self, normalize_url):
+        self.normalize_url = normalize_url
+        self.tag_names = self.container_names + ('a',)
+    
+    def start(self):
+        self.containers = []
+        self.active = []
+    
+    def enter(self, tag, class_text):
+        if tag.name == 'a':
+            if self.active and _has_href(tag):
+                for links in self.active:
+                    if len(links) < self.max_links_per_container:
+                        links.append(tag)
+            return False
+        
+        if len(self.containers) < self.max_containers and _has_keyword(class_text, self.keywords):
+            links = []
+            self.containers.append(links)
+            self.active.append(links)
+            return True
+        return False
+    
+    def exit(self, tag):
+        self.active.pop()
+    
+    def result(self):
+        sections = []
+        for links in self.containers:
+            for link in links:
+                text = link.get_text(strip=True)
+                if text and len(text) > 3:
+                    sections.append({
+                        'name': text,
+                        'url': self.normalize_url(link['href'])
+                    })
+        
+        # Eliminar duplicados
+        sections = list({s['name']: s for s in sections}.values())
+        return sections[:Config.MAX_SECTIONS]
+
+
+class NewsExtractor(Extractor):
+    """Noticias y comunicados: título, link y fecha de cada bloque"""
+    
+    field = 'latest_news'
+    container_names = ('article', 'div', 'section')
+    heading_names = ('h1', 'h2', 'h3', 'h4')
+    date_names = ('time', 'span')
+    keywords = ('noticia', 'comunicado', 'news')
+    date_keywords = ('fecha',)
+    max_items = 10
+    
+    def __init__(self, normalize_url):
+        self.normalize_url = normalize_url
+        self.tag_names = tuple(set(self.container_names + self.heading_names + self.date_names + ('a',)))
+    
+    def start(self):
+        self.items = []
+        self.active = []
+    
+    def enter(self, tag, class_text):
+        name = tag.name
+        if self.active:
+            if name in self.heading_names:
+                slot = 'heading'
+            elif name == 'a' and _has_href(tag):
+                slot = 'link'
+            elif name in self.date_names and _has_keyword(class_text, self.date_keywords):
+                slot = 'date'
+            else:
+                slot = None
+            
+            if slot:
+                for item in self.active:
+                    if item[slot] is None:
+                        item[slot] = tag
+        
+        if (name in self.container_names and len(self.items) < self.max_items
+                and _has_keyword(class_text, self.keywords)):
+            item = {'heading': None, 'link': None, 'date': None}
+            self.items.append(item)
+            self.active.append(item)
+            return True
+        return False
+    
+    def exit(self, tag):
+        self.active.pop()
+    
+    def result(self):
+        news = []
+        for item in self.items:
+            if item['heading']:
+                link = item['link']
+                news.append({
+                    'title': item['heading'].get_text(strip=True),
+                    'url': self.normalize_url(link['href'] if link else ''),
+                    'date': item['date'].get_text(strip=True) if item['date'] else "N/A"
+                })
+        return news[:Config.MAX_NEWS]
+
+
+class IndicatorsExtractor(Extractor):
+    """Texto de los bloques de indicadores/estadísticas"""
+    
+    field = 'featured_indicators'
+    tag_names = ('div', 'section')
+    keywords = ('indicador', 'indicator', 'estadistica')
+    max_items = 10
+    
+    def start(self):
+        self.items = []
+    
+    def enter(self, tag, class_text):
+        if len(self.items) < self.max_items and _has_keyword(class_text, self.keywords):
+            self.items.append(tag)
+        return False
+    
+    def result(self):
+        indicators = []
+        for item in self.items:
+            text = item.get_text(strip=True)
+            if text and len(text) < 500:
+                indicators.append(text)
+        return indicators[:Config.MAX_INDICATORS]
+
+
+class LinksExtractor(Extractor):
+    """Links cuyo texto contiene palabras clave de datos/estadística"""
+    
+    field = 'important_links'
+    tag_names = ('a',)
+    keywords = ('banco', 'datos', 'estadistica', 'censo', 'informacion', 'consulta')
+    
+    def __init__(self, normalize_url):
+        self.normalize_url = normalize_url
+    
+    def start(self):
+        self.links = []
+    
+    def enter(self, tag, class_text):
+        if _has_href(tag):
+            self.links.append(tag)
+        return False
+    
+    def result(self):
+        links = []
+        for link in self.links:
+            text = link.get_text(strip=True)
+            if text and any(keyword in text.lower() for keyword in self.keywords):
+                links.append({
+                    'text': text,
+                    'url': self.normalize_url(link['href'])
+                })
+        
+        # Eliminar duplicados
+        links = list({l['text']: l for l in links}.values())
+        return links[:Config.MAX_LINKS]
+
+
+class _TimedExtractor:
+    """Envoltura que acumula el tiempo de CPU de un extractor dentro del recorrido compartido"""
+    
+    def __init__(self, extractor):
+        self.extractor = extractor
+        self.field = extractor.field
+        self.tag_names = extractor.tag_names
+        self.seconds = 0.0
+    
+    def start(self):
+        start = time.perf_counter()
+        self.extractor.start()
+        self.seconds += time.perf_counter() - start
+    
+    def enter(self, tag, class_text):
+        start = time.perf_counter()
+        try:
+            return self.extractor.enter(tag, class_text)
+        finally:
+            self.seconds += time.perf_counter() - start
+    
+    def exit(self, tag):
+        start = time.perf_counter()
+        self.extractor.exit(tag)
+        self.seconds += time.perf_counter() - start
+    
+    def result(self):
+        start = time.perf_counter()
+        try:
+            return self.extractor.result()
+        finally:
+            self.seconds += time.perf_counter() - start
+
+
+class ExtractionEngine:
+    """Ejecuta todos los extractores registrados en un único recorrido del DOM"""
+    
+    def __init__(self, extractors):
+        """
+        Args:
+            extractors (list): Instancias de Extractor, en el orden de los campos de salida
+        """
+        self.extractors = list(extractors)
+    
+    def run(self, soup, fields=None, timed=False):
+        """
+        Recorre el documento una vez y devuelve los campos extraídos
+        
+        Args:
+            soup (BeautifulSoup | lxml.html.HtmlElement): Documento parseado
+            fields (iterable): Limitar a estos campos (opcional)
+            timed (bool): Registrar el tiempo de cada extractor como fase extract_<campo>
+        
+        Returns:
+            dict: {campo: valor} en el orden de registro
+        """
+        # Copias por recorrido: el estado no se comparte entre hilos (crawler)
+        extractors = [
+            copy.copy(e) for e in self.extractors
+            if fields is None or e.field in fields
+        ]
+        if timed:
+            extractors = [_TimedExtractor(e) for e in extractors]
+        dispatch = {}
+        for extractor in extractors:
+            extractor.start()
+            for name in extractor.tag_names:
+                dispatch.setdefault(name, []).append(extractor)
+        
+        # Árbol lxml o de BeautifulSoup, sin importar bs4 solo para distinguirlos
+        if is_lxml_tree(soup):
+            self._walk_lxml(soup, dispatch)
+        else:
+            self._walk(soup, dispatch)
+        
+        data = {}
+        for extractor in extractors:
+            try:
+                data[extractor.field] = extractor.result()
+            except Exception as e:
+                logger.error("Error extrayendo %s: %s", extractor.field, e)
+                data[extractor.field] = [] if extractor.field != 'title' else "Error al extraer título"
+        
+        if timed:
+            for extractor in extractors:
+                record_phase(f'extract_{extractor.field}', extractor.seconds)
+        return data
+    
+    def _walk(self, soup, dispatch):
+        """Recorrido en profundidad, en orden de documento, visitando cada nodo una vez"""
+        from bs4 import Tag
+        
+        stack = [child for child in reversed(soup.contents) if isinstance(child, Tag)]
+        
+        while stack:
+            node = stack.pop()
+            
+            if node.__class__ is _Exit:
+                node.extractor.exit(node.tag)
+                continue
+            
+            handlers = dispatch.get(node.name)
+            if handlers:
+                # Las clases se calculan una sola vez por nodo para todos los extractores
+                classes = node.get('class')
+                if isinstance(classes, list):
+                    class_text = ' '.join(classes).lower()
+                else:
+                    class_text = classes.lower() if classes else ''
+                
+                for extractor in handlers:
+                    if extractor.enter(node, class_text):
+                        stack.append(_Exit(extractor, node))
+            
+            contents = node.contents
+            if contents:
+                stack.extend(child for child in reversed(contents) if isinstance(child, Tag))
+    
+    def _walk_lxml(self, root, dispatch):
+        """Mismo recorrido sobre un árbol lxml, usando los eventos start/end de iterwalk"""
+        from lxml import etree
+        
+        exits = []
+        for event, element in etree.iterwalk(root, events=('start', 'end')):
+            tag = element.tag
+            if not isinstance(tag, str):
+                continue  # Comentarios e instrucciones de procesamiento
+            
+            if event == 'end':
+                while exits and exits[-1][1] is element:
+                    extractor, _, node = exits.pop()
+                    extractor.exit(node)
+                continue
+            
+            handlers = dispatch.get(tag)
+            if handlers:
+                classes = element.get('class')
+                class_text = classes.lower() if classes else ''
+                node = LxmlTag(element)
+                
+                for extractor in handlers:
+                    if extractor.enter(node, class_text):
+                        exits.append((extractor, element, node))
@@ -0,0 +1,152 @@
+"""
+Archivo de HTML - Cuerpos descargados comprimidos y direccionados por contenido
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from config import Config
+from .snapshot_log import parse_timestamp
+
+
+class HtmlArchive:
+    """
+    Guarda cada cuerpo HTML una sola vez (clave SHA-256) y registra cada descarga
+    
+    Estructura:
+        objects/ab/abcdef....html.gz  - cuerpo comprimido, uno por contenido distinto
+        manifest.jsonl                - una línea por descarga (timestamp, url, sha256, encoding)
+    """
+    
+    MANIFEST_FILENAME = 'manifest.jsonl'
+    
+    def __init__(self, directory=None):
+        """
+        Inicializa el archivo
+        
+        Args:
+            directory (str): Directorio del archivo (opcional)
+        """
+        self.directory = directory or os.path.join(Config.DATA_DIR, Config.ARCHIVE_DIR)
+        self.objects_dir = os.path.join(self.directory, 'objects')
+        self.manifest_path = os.path.join(self.directory, self.MANIFEST_FILENAME)
+        self._lock = threading.Lock()
+        os.makedirs(self.objects_dir, exist_ok=True)
+    
+    def store(self, content, url, timestamp=None, encoding=None):
+        """
+        Archiva un cuerpo descargado
+        
+        Args:
+            content (bytes): Cuerpo HTTP sin decodificar
+            url (str): URL descargada
+            timestamp (str): Momento de la descarga (ISO 8601, opcional)
+            encoding (str): Codificación detectada (opcional)
+        
+        Returns:
+            str: SHA-256 del contenido
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.object_path(digest)
+        
+        # Contenido ya archivado: solo se registra la descarga
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, 'wb', compresslevel=Config.ARCHIVE_COMPRESSION_LEVEL) as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        
+        entry = {
+            'timestamp': timestamp or datetime.now().isoformat(),
+            'url': url,
+            'sha256': digest,
+            'encoding': encoding,
+            'size': len(content)
+        }
+        with self._lock:
+            with open(self.manifest_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+        
+        return digest
+    
+    def load(self, digest):
+        """
+        Recupera un cuerpo archivado
+        
+        Args:
+            digest (str): SHA-256 del contenido
+        
+        Returns:
+            bytes: Cuerpo original
+        """
+        with gzip.open(self.object_path(digest), 'rb') as f:
+            return f.read()
+    
+    def object_path(self, digest):
+        """Ruta del objeto comprimido para un hash"""
+        return os.path.join(self.objects_dir, digest[:2], f'{digest}.html.gz')
+    
+    def entries(self, start=None, end=None, url=None):
+        """
+        Descargas registradas en un rango de tiempo (inclusive)
+        
+        Args:
+            start (str): Inicio del rango (opcional)
+            end (str): Fin del rango (opcional)
+            url (str): Filtrar por URL (opcional)
+        
+        Returns:
+            list: Entradas del manifiesto en orden cronológico
+        """
+        start_ts = parse_timestamp(start) if start is not None else None
+        end_ts = parse_timestamp(end) if end is not None else None
+        entries = []
+        
+        if not os.path.exists(self.manifest_path):
+            return entries
+        
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    ts = parse_timestamp(entry['timestamp'])
+                except (ValueError, KeyError):
+                    continue  # Línea incompleta por escritura interrumpida
+                if start_ts is not None and ts < start_ts:
+                    continue
+                if end_ts is not None and ts > end_ts:
+                    continue
+                if url is not None and entry['url'] != url:
+                    continue
+                entries.append(entry)
+        
+        return entries
+    
+    def stats(self):
+        """
+        Resumen del archivo
+        
+        Returns:
+            dict: Número de descargas, objetos distintos y bytes comprimidos
+        """
+        objects = 0
+        compressed_bytes = 0
+        for root, _, files in os.walk(self.objects_dir):
+            for name in files:
+                if name.endswith('.html.gz'):
+                    objects += 1
+                    compressed_bytes += os.path.getsize(os.path.join(root, name))
+        
+        fetches = 0
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'rb') as f:
+                fetches = sum(1 for _ in f)
+        
+        return {
+            'fetches': fetches,
+            'objects': objects,
+            'compressed_bytes': compressed_bytes
+        }
@@ -0,0 +1,112 @@
+"""
+Backends de parseo HTML - Convierte los bytes descargados en un documento para el motor de extracción
+"""
+import codecs
+import re
+from utils import get_logger
+
+try:
+    import lxml.html
+    _LXML_AVAILABLE = True
+except ImportError:
+    _LXML_AVAILABLE = False
+
+logger = get_logger('HtmlParser')
+
+
+# Backends soportados: 'html.parser' y 'lxml' construyen un árbol de
+# BeautifulSoup; 'lxml.html' usa el árbol de lxml directamente
+PARSER_BACKENDS = ('html.parser', 'lxml', 'lxml.html')
+
+_CHARSET_HEADER = re.compile(r'charset=["\']?([\w.:-]+)', re.I)
+_CHARSET_META = re.compile(rb'<meta[^>]+charset=["\']?([\w.:-]+)', re.I)
+# Las declaraciones de charset deben aparecer al inicio del documento
+_META_SNIFF_BYTES = 4096
+
+
+def resolve_backend(backend):
+    """
+    Valida el backend solicitado y cae a html.parser si lxml no está instalado
+    
+    Args:
+        backend (str): Nombre del backend
+    
+    Returns:
+        str: Backend utilizable
+    """
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Parser no soportado: {backend}. Opciones: {', '.join(PARSER_BACKENDS)}")
+    if backend != 'html.parser' and not _LXML_AVAILABLE:
+        logger.warning("lxml no disponible, usando html.parser")
+        return 'html.parser'
+    return backend
+
+
+def detect_encoding(content, content_type=None, default='utf-8'):
+    """
+    Determina la codificación una sola vez: header HTTP, luego <meta charset>, luego default
+    
+    Args:
+        content (bytes): Cuerpo de la respuesta
+        content_type (str): Header Content-Type (opcional)
+        default (str): Codificación si no hay declaración
+    
+    Returns:
+        str: Nombre de la codificación
+    """
+    if content_type:
+        match = _CHARSET_HEADER.search(content_type)
+        if match and _is_known_encoding(match.group(1)):
+            return match.group(1).lower()
+    
+    match = _CHARSET_META.search(content[:_META_SNIFF_BYTES])
+    if match and _is_known_encoding(match.group(1).decode('ascii')):
+        return match.group(1).decode('ascii').lower()
+    
+    return default
+
+
+def _is_known_encoding(name):
+    """Verifica que Python reconozca la codificación declarada"""
+    try:
+        codecs.lookup(name)
+        return True
+    except LookupError:
+        return False
+
+
+def is_lxml_tree(document):
+    """
+    Indica si el documento es un árbol de lxml (y no de BeautifulSoup)
+    
+    BeautifulSoup convierte cualquier atributo desconocido en find(), así que
+    hasattr() no sirve para distinguirlos: se compara el tipo.
+    """
+    return _LXML_AVAILABLE and isinstance(document, lxml.etree._Element)
+
+
+def parse_document(content, backend, encoding='utf-8'):
+    """
+    Parsea el documento con el backend indicado
+    
+    Args:
+        content (bytes): Cuerpo HTML sin decodificar
+        backend (str): Uno de PARSER_BACKENDS
+        encoding (str): Codificación detectada con detect_encoding()
+    
+    Returns:
+        BeautifulSoup | lxml.html.HtmlElement: Documento para ExtractionEngine.run()
+    """
+    if isinstance(content, str):
+        content = content.encode(encoding, errors='replace')
+    
+    if backend == 'lxml.html' and content.strip():
+        parser = lxml.html.HTMLParser(encoding=encoding)
+        return lxml.html.document_fromstring(content, parser=parser)
+    
+    # bs4 se importa al primer uso: con 'lxml.html' (el predeterminado) normalmente no se carga
+    from bs4 import BeautifulSoup
+    
+    if backend == 'lxml.html':
+        return BeautifulSoup('', 'html.parser')  # lxml no acepta documentos vacíos
+    return BeautifulSoup(content, backend, from_encoding=encoding)
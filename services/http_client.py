@@ -0,0 +1,127 @@
+"""
+Cliente HTTP compartido - Sesión con keep-alive, reintentos y compresión
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ReadTimeoutError
+from urllib3.util.retry import Retry
+from config import Config
+from utils import phase
+
+try:
+    import brotli  # noqa: F401
+    _BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _BROTLI_AVAILABLE = True
+    except ImportError:
+        _BROTLI_AVAILABLE = False
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    """Conexión que mide DNS + TCP en la fase 'connect'"""
+    
+    def connect(self):
+        with phase('connect'):
+            super().connect()
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    """Conexión que mide DNS + TCP + TLS en la fase 'connect'"""
+    
+    def connect(self):
+        with phase('connect'):
+            super().connect()
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """Adaptador cuyos pools crean conexiones instrumentadas (solo al abrir, no al reutilizar)"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool
+        }
+
+
+class _Retry(Retry):
+    """Reintenta errores de conexión, conexiones cortadas y 5xx, pero no un read timeout"""
+    
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        # Un read timeout ya esperó HTTP_READ_TIMEOUT: reintentarlo multiplica la espera
+        if isinstance(error, ReadTimeoutError):
+            raise error.with_traceback(_stacktrace)
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+class HttpClient:
+    """Sesión HTTP reutilizable para todas las peticiones al sitio"""
+    
+    def __init__(self, user_agent=None):
+        """
+        Inicializa la sesión con pool de conexiones y política de reintentos
+        
+        Args:
+            user_agent (str): User-Agent a enviar (opcional)
+        """
+        self.timeout = (Config.HTTP_CONNECT_TIMEOUT, Config.HTTP_READ_TIMEOUT)
+        self.session = self._build_session(user_agent or Config.USER_AGENT)
+    
+    def get(self, url, headers=None, **kwargs):
+        """
+        Realiza una petición GET reutilizando las conexiones abiertas
+        
+        Args:
+            url (str): URL a consultar
+            headers (dict): Headers adicionales para esta petición
+        
+        Returns:
+            Response: Respuesta HTTP
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.get(url, headers=headers, **kwargs)
+    
+    def close(self):
+        """Cierra las conexiones del pool"""
+        self.session.close()
+    
+    def _build_session(self, user_agent):
+        """Construye la sesión con adaptador, reintentos y headers base"""
+        retry = _Retry(
+            total=Config.HTTP_MAX_RETRIES,
+            connect=Config.HTTP_MAX_RETRIES,
+            read=Config.HTTP_MAX_RETRIES,
+            status=Config.HTTP_MAX_RETRIES,
+            backoff_factor=Config.HTTP_BACKOFF_FACTOR,
+            status_forcelist=Config.HTTP_RETRY_STATUS,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False
+        )
+        adapter = _TimedHTTPAdapter(
+            pool_connections=Config.HTTP_POOL_CONNECTIONS,
+            pool_maxsize=Config.HTTP_POOL_MAXSIZE,
+            max_retries=retry
+        )
+        
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
+            'User-Agent': user_agent,
+            # Solo anunciar brotli si urllib3 puede decodificarlo
+            'Accept-Encoding': 'gzip, deflate, br' if _BROTLI_AVAILABLE else 'gzip, deflate',
+            'Connection': 'keep-alive'
+        })
+        return session
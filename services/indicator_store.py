@@ -0,0 +1,537 @@
+"""
+Series de indicadores - Valores numéricos en columnas binarias memory-mapped con rollups precalculados
+"""
+import json
+import mmap
+import os
+import re
+import threading
+import unicodedata
+from array import array
+from datetime import datetime
+from config import Config
+from utils import get_logger
+from .snapshot_log import parse_timestamp
+
+logger = get_logger('IndicatorStore')
+
+_MONTHS = 'enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|setiembre|octubre|noviembre|diciembre'
+# "PIB trimestral2.1% anualII trim 2026", "Exportaciones52,310millones de dólaresagosto 2026",
+# "Población total: 126,014,024 habitantes (Censo 2020)": nombre, valor, unidad y periodo
+_INDICATOR = re.compile(
+    r'^(?P<name>[^\d]*?[^\d\s:=+\-−])\s*[:=]?\s*'
+    r'(?P<value>[-+−]?(?:\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:[.,]\d+)?))\s*'
+    r'(?P<unit>[^\d()]*?)\s*'
+    r'(?:\((?P<note>[^()]*)\)|(?P<period>'
+    rf'(?:{_MONTHS})(?:\s+(?:de\s+)?\d{{4}})?'
+    r'|(?:I|II|III|IV)\s*trim(?:estre)?\.?(?:\s+\d{4})?'
+    r'|\d{4}))?\s*$',
+    re.IGNORECASE
+)
+
+# Filas de rollup: un registro de doubles por bucket
+ROLLUP_FIELDS = ('start', 'count', 'min', 'max', 'sum', 'last')
+_WIDTH = len(ROLLUP_FIELDS)
+_START, _COUNT, _MIN, _MAX, _SUM, _LAST = range(_WIDTH)
+
+
+def indicator_id(name):
+    """
+    ID estable de un indicador a partir de su nombre (sin acentos, en minúsculas)
+    
+    Args:
+        name (str): Nombre del indicador ("Tasa de desocupación")
+    
+    Returns:
+        str: ID ("tasa-de-desocupacion")
+    """
+    text = unicodedata.normalize('NFKD', name)
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    return re.sub(r'[^a-z0-9]+', '-', text).strip('-')
+
+
+def parse_indicator(text):
+    """
+    Convierte el texto de un bloque de indicador en un registro numérico
+    
+    Los bloques que agrupan varios indicadores (más de un número) no se
+    reconocen; sus indicadores individuales se extraen por separado.
+    
+    Args:
+        text (str): Texto extraído ("Tasa de desocupación2.7%agosto 2026")
+    
+    Returns:
+        dict: {id, name, value, unit, period} o None si no es un indicador numérico
+    """
+    match = _INDICATOR.match(text.strip())
+    if not match:
+        return None
+    
+    name = match.group('name').strip()
+    key = indicator_id(name)
+    if not key:
+        return None
+    
+    raw = match.group('value').replace('−', '-')
+    if re.fullmatch(r'[-+]?\d+,\d{1,2}', raw):
+        raw = raw.replace(',', '.')  # Coma decimal ("2,7")
+    value = float(raw.replace(',', ''))
+    
+    period = match.group('period') or match.group('note')
+    return {
+        'id': key,
+        'name': name,
+        'value': value,
+        'unit': match.group('unit').strip() or None,
+        'period': period.strip() if period else None
+    }
+
+
+class _Column:
+    """Archivo binario de valores de un solo tipo, leído como memoryview sobre mmap (sin copias)"""
+    
+    def __init__(self, path, typecode):
+        self.path = path
+        self.typecode = typecode
+        self.itemsize = array(typecode).itemsize
+        self._mmap = None
+        self._view = None
+        self._mapped = (None, 0)  # (inodo, bytes) del mapeo actual
+    
+    def size(self):
+        return self._stat()[1]
+    
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None, 0
+        return stat.st_ino, stat.st_size
+    
+    def __len__(self):
+        view = self.view()
+        return len(view) if view is not None else 0
+    
+    def view(self):
+        """Valores del archivo (memoryview tipado) o None si está vacío; se remapea si creció o se reemplazó"""
+        inode, size = self._stat()
+        size -= size % self.itemsize
+        if (inode, size) != self._mapped or (size and self._view is None):
+            self.release()
+            if size:
+                with open(self.path, 'rb') as f:
+                    self._mmap = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+                self._view = memoryview(self._mmap).cast(self.typecode)
+                self._mapped = (inode, size)
+        return self._view
+    
+    def append(self, values):
+        with open(self.path, 'ab') as f:
+            f.write(array(self.typecode, values).tobytes())
+    
+    def write_at(self, index, values):
+        """Sobrescribe valores a partir de una posición (la última fila de un rollup)"""
+        with open(self.path, 'r+b') as f:
+            f.seek(index * self.itemsize)
+            f.write(array(self.typecode, values).tobytes())
+    
+    def truncate(self, count):
+        self.release()
+        with open(self.path, 'ab') as f:
+            f.truncate(count * self.itemsize)
+    
+    def replace(self, values):
+        """Reescribe el archivo completo (archivo nuevo: quien lo tenga mapeado conserva el anterior)"""
+        self.release()
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(array(self.typecode, values).tobytes())
+        os.replace(tmp_path, self.path)
+    
+    def release(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._mapped = (None, 0)
+
+
+class _Series:
+    """Columnas (timestamp, valor, periodo) y rollups de un indicador"""
+    
+    def __init__(self, directory, buckets):
+        self.directory = directory
+        self.meta_path = os.path.join(directory, 'meta.json')
+        self.ts = _Column(os.path.join(directory, 'ts.f64'), 'd')
+        self.value = _Column(os.path.join(directory, 'value.f64'), 'd')
+        self.period = _Column(os.path.join(directory, 'period.u32'), 'I')
+        self.rollups = {
+            name: _Column(os.path.join(directory, f'rollup_{name}.f64'), 'd')
+            for name in buckets
+        }
+        self.buckets = buckets
+        self.meta = {}
+        self._meta_mtime = None
+        self._repaired = False
+        self.refresh_meta()
+    
+    def refresh_meta(self):
+        """Relee meta.json si otro proceso (el líder) lo actualizó"""
+        try:
+            mtime = os.path.getmtime(self.meta_path)
+        except OSError:
+            mtime = None
+        if mtime is not None and mtime != self._meta_mtime:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                self.meta = json.load(f)
+            self._meta_mtime = mtime
+        self.meta.setdefault('periods', [])
+        self._period_codes = {period: code for code, period in enumerate(self.meta['periods'])}
+    
+    def count(self):
+        """Muestras completas (una escritura en curso puede haber alargado solo alguna columna)"""
+        return min(len(self.ts), len(self.value), len(self.period))
+    
+    def last_ts(self):
+        count = self.count()
+        return self.ts.view()[count - 1] if count else None
+    
+    def append(self, record, ts):
+        """Agrega una muestra y actualiza el último bucket de cada rollup"""
+        if not self._repaired:
+            # Solo quien escribe repara: un lector podría truncar una escritura en curso
+            self._repair()
+            self._repaired = True
+        
+        meta_changed = self.meta.get('name') != record['name'] or self.meta.get('unit') != record['unit']
+        self.meta.update({'id': record['id'], 'name': record['name'], 'unit': record['unit']})
+        period = record['period'] or ''
+        code = self._period_codes.get(period)
+        if code is None:
+            code = self._period_codes[period] = len(self.meta['periods'])
+            self.meta['periods'].append(period)
+            meta_changed = True
+        if meta_changed:
+            self._save_meta()
+        
+        value = record['value']
+        self.ts.append((ts,))
+        self.value.append((value,))
+        self.period.append((code,))
+        
+        for name, seconds in self.buckets.items():
+            column = self.rollups[name]
+            start = ts - ts % seconds
+            view = column.view()
+            rows = len(view) // _WIDTH if view is not None else 0
+            if rows and view[(rows - 1) * _WIDTH + _START] == start:
+                base = (rows - 1) * _WIDTH
+                row = (start, view[base + _COUNT] + 1, min(view[base + _MIN], value),
+                       max(view[base + _MAX], value), view[base + _SUM] + value, value)
+                column.write_at(base, row)
+            else:
+                column.append((start, 1, value, value, value, value))
+    
+    def release(self):
+        for column in (self.ts, self.value, self.period, *self.rollups.values()):
+            column.release()
+    
+    def _save_meta(self):
+        tmp_path = f'{self.meta_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, ensure_ascii=False)
+        os.replace(tmp_path, self.meta_path)
+        self._meta_mtime = os.path.getmtime(self.meta_path)
+    
+    def _repair(self):
+        """Iguala las columnas tras una escritura interrumpida y recalcula rollups incompletos"""
+        counts = [column.size() // column.itemsize for column in (self.ts, self.value, self.period)]
+        count = min(counts)
+        if any(c != count for c in counts):
+            logger.warning("Serie %s reparada: %s muestra(s) incompleta(s) descartada(s)",
+                           os.path.basename(self.directory), max(counts) - count)
+            for column in (self.ts, self.value, self.period):
+                column.truncate(count)
+        
+        for name, column in self.rollups.items():
+            view = column.view()
+            rows = len(view) // _WIDTH if view is not None else 0
+            total = sum(view[_COUNT:rows * _WIDTH:_WIDTH]) if rows else 0
+            if total != count:
+                self._rebuild_rollup(name, column)
+    
+    def _rebuild_rollup(self, name, column):
+        """Recalcula un rollup a partir de las muestras (bucket nuevo o rollup dañado)"""
+        seconds = self.buckets[name]
+        rows = []
+        ts_view, value_view = self.ts.view(), self.value.view()
+        for i in range(len(ts_view) if ts_view is not None else 0):
+            ts, value = ts_view[i], value_view[i]
+            start = ts - ts % seconds
+            if rows and rows[-1][_START] == start:
+                row = rows[-1]
+                row[_COUNT] += 1
+                row[_MIN] = min(row[_MIN], value)
+                row[_MAX] = max(row[_MAX], value)
+                row[_SUM] += value
+                row[_LAST] = value
+            else:
+                rows.append([start, 1, value, value, value, value])
+        column.replace([field for row in rows for field in row])
+
+
+class IndicatorStore:
+    """
+    Series de tiempo numéricas por indicador
+    
+    Estructura (por indicador, en data/indicators/<id>/):
+        ts.f64, value.f64, period.u32 - columnas de muestras (float64/uint32)
+        rollup_<bucket>.f64           - una fila por bucket: start, count, min, max, sum, last
+        meta.json                     - nombre, unidad y diccionario de periodos
+    
+    Los archivos se leen como memoryview sobre mmap: las consultas buscan el
+    rango por bisección y agregan con min()/max()/sum() sobre vistas con paso,
+    que iteran en C sin copiar. Los rollups se actualizan al agregar cada muestra,
+    así que una consulta por bucket solo lee las filas del rango.
+    """
+    
+    def __init__(self, directory=None, buckets=None, max_points=None):
+        """
+        Inicializa el almacén
+        
+        Args:
+            directory (str): Directorio de las series (opcional)
+            buckets (dict): {nombre: segundos} de los rollups, de menor a mayor (opcional)
+            max_points (int): Máximo de puntos por respuesta (opcional)
+        """
+        self.directory = directory or os.path.join(Config.DATA_DIR, Config.INDICATOR_DIR)
+        self.buckets = dict(sorted((buckets or Config.INDICATOR_BUCKETS).items(), key=lambda item: item[1]))
+        self.max_points = max_points or Config.INDICATOR_MAX_POINTS
+        self._series = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+    
+    def append_snapshot(self, data):
+        """
+        Agrega una muestra por indicador numérico del snapshot
+        
+        Args:
+            data (dict): Resultado de ScraperService
+        
+        Returns:
+            int: Muestras agregadas
+        """
+        ts = parse_timestamp(data['timestamp'])
+        records = {}
+        for text in data.get('featured_indicators') or []:
+            record = parse_indicator(text) if isinstance(text, str) else None
+            if record and record['id'] not in records:
+                records[record['id']] = record
+        
+        added = 0
+        with self._lock:
+            for key, record in records.items():
+                series = self._get(key, create=True)
+                last = series.last_ts()
+                if last is not None and ts <= last:
+                    continue  # Ya registrada (o más antigua que la serie): las columnas van en orden
+                series.append(record, ts)
+                added += 1
+        return added
+    
+    def list(self):
+        """
+        Indicadores registrados con su último valor
+        
+        Returns:
+            list: [{id, name, unit, samples, first, last, last_value, last_period}]
+        """
+        with self._lock:
+            keys = sorted(
+                name for name in os.listdir(self.directory)
+                if os.path.isfile(os.path.join(self.directory, name, 'meta.json'))
+            )
+            return [self._describe(self._get(key)) for key in keys]
+    
+    def series(self, key, start=None, end=None, bucket='auto'):
+        """
+        Serie de un indicador en un rango, cruda o agregada por bucket
+        
+        Args:
+            key (str): ID del indicador
+            start (str | float): Inicio del rango (opcional)
+            end (str | float): Fin del rango (opcional)
+            bucket (str): 'raw', un nombre de INDICATOR_BUCKETS o 'auto' (el menor que
+                quepa en max_points)
+        
+        Returns:
+            dict: Indicador, bucket usado, resumen (min/max/mean/last) y puntos, o None si no existe
+        
+        Raises:
+            ValueError: Si el bucket no existe, el rango no es válido o excede max_points
+        """
+        if bucket not in ('auto', 'raw') and bucket not in self.buckets:
+            raise ValueError(f"Bucket no válido. Opciones: auto, raw, {', '.join(self.buckets)}")
+        try:
+            low_ts = parse_timestamp(start) if start is not None else float('-inf')
+            high_ts = parse_timestamp(end) if end is not None else float('inf')
+        except ValueError:
+            raise ValueError('from/to deben ser ISO 8601 o epoch')
+        
+        with self._lock:
+            if not os.path.isfile(os.path.join(self.directory, key, 'meta.json')):
+                return None
+            series = self._get(key)
+            
+            if bucket == 'auto':
+                bucket = self._choose_bucket(series, low_ts, high_ts)
+            if bucket == 'raw':
+                result = self._raw(series, low_ts, high_ts)
+            else:
+                result = self._rollup(series, bucket, low_ts, high_ts)
+            result['indicator'] = self._describe(series)
+            result['bucket'] = bucket
+        return result
+    
+    def close(self):
+        """Libera los mapeos de todas las series"""
+        with self._lock:
+            for series in self._series.values():
+                series.release()
+            self._series.clear()
+    
+    def _get(self, key, create=False):
+        series = self._series.get(key)
+        if series is None:
+            directory = os.path.join(self.directory, key)
+            if create:
+                os.makedirs(directory, exist_ok=True)
+            series = self._series[key] = _Series(directory, self.buckets)
+        else:
+            series.refresh_meta()
+        return series
+    
+    def _describe(self, series):
+        count = series.count()
+        ts, value, period = series.ts.view(), series.value.view(), series.period.view()
+        return {
+            'id': series.meta.get('id'),
+            'name': series.meta.get('name'),
+            'unit': series.meta.get('unit'),
+            'samples': count,
+            'first': _isoformat(ts[0]) if count else None,
+            'last': _isoformat(ts[count - 1]) if count else None,
+            'last_value': value[count - 1] if count else None,
+            'last_period': series.meta['periods'][period[count - 1]] or None if count else None
+        }
+    
+    def _choose_bucket(self, series, low_ts, high_ts):
+        """Bucket más fino cuyo número de puntos en el rango cabe en max_points"""
+        low, high = _bisect(series.ts.view(), 1, 0, low_ts, high_ts)
+        if high - low <= self.max_points:
+            return 'raw'
+        for name in self.buckets:
+            low, high = _bisect(series.rollups[name].view(), _WIDTH, _START, low_ts, high_ts)
+            if high - low <= self.max_points:
+                return name
+        return next(reversed(self.buckets))
+    
+    def _raw(self, series, low_ts, high_ts):
+        ts, values, periods = series.ts.view(), series.value.view(), series.period.view()
+        low, high = _bisect(ts, 1, 0, low_ts, high_ts)
+        high = min(high, series.count())
+        self._check_size(high - low, 'raw')
+        
+        names = series.meta['periods']
+        points = [
+            {'t': _isoformat(ts[i]), 'value': values[i], 'period': names[periods[i]] or None}
+            for i in range(low, high)
+        ]
+        if not points:
+            return {'count': 0, 'summary': None, 'points': points}
+        
+        window = values[low:high]
+        return {
+            'count': high - low,
+            'summary': {
+                'min': min(window),
+                'max': max(window),
+                'mean': sum(window) / (high - low),
+                'last': values[high - 1],
+                'samples': high - low
+            },
+            'points': points
+        }
+    
+    def _rollup(self, series, bucket, low_ts, high_ts):
+        """Filas precalculadas del rango (los extremos se alinean al inicio de su bucket)"""
+        seconds = self.buckets[bucket]
+        rows = series.rollups[bucket].view()
+        low_ts = low_ts - low_ts % seconds if low_ts != float('-inf') else low_ts
+        low, high = _bisect(rows, _WIDTH, _START, low_ts, high_ts)
+        self._check_size(high - low, bucket)
+        
+        points = []
+        for i in range(low, high):
+            start, count, low_value, high_value, total, last = rows[i * _WIDTH:(i + 1) * _WIDTH]
+            points.append({
+                't': _isoformat(start),
+                'count': int(count),
+                'min': low_value,
+                'max': high_value,
+                'mean': total / count,
+                'last': last
+            })
+        if not points:
+            return {'count': 0, 'summary': None, 'points': points}
+        
+        # Resumen del rango sobre las filas: vistas con paso, agregadas en C
+        first, stop = low * _WIDTH, high * _WIDTH
+        samples = sum(rows[first + _COUNT:stop:_WIDTH])
+        return {
+            'count': high - low,
+            'summary': {
+                'min': min(rows[first + _MIN:stop:_WIDTH]),
+                'max': max(rows[first + _MAX:stop:_WIDTH]),
+                'mean': sum(rows[first + _SUM:stop:_WIDTH]) / samples,
+                'last': rows[stop - _WIDTH + _LAST],
+                'samples': int(samples)
+            },
+            'points': points
+        }
+    
+    def _check_size(self, count, bucket):
+        if count > self.max_points:
+            raise ValueError(
+                f"El rango tiene {count} puntos con bucket '{bucket}' (máximo {self.max_points}); "
+                "usa un bucket mayor, bucket=auto o un rango más corto"
+            )
+
+
+def _bisect(view, width, field, low_ts, high_ts):
+    """Posiciones [low, high) de las filas con low_ts <= view[fila * width + field] <= high_ts"""
+    rows = len(view) // width if view is not None else 0
+    
+    low, high = 0, rows
+    while low < high:
+        mid = (low + high) // 2
+        if view[mid * width + field] < low_ts:
+            low = mid + 1
+        else:
+            high = mid
+    first = low
+    
+    high = rows
+    while low < high:
+        mid = (low + high) // 2
+        if view[mid * width + field] <= high_ts:
+            low = mid + 1
+        else:
+            high = mid
+    return first, low
+
+
+def _isoformat(ts):
+    return datetime.fromtimestamp(ts).isoformat()
@@ -0,0 +1,218 @@
+"""
+Servicio de Trabajos - Scraping y crawl asíncronos con ID de trabajo y ejecutor acotado
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from config import Config
+from utils import collect_phases, get_logger, run_context
+
+logger = get_logger('JobService')
+
+
+class JobService:
+    """
+    Encola scraping y crawl en un pool de hilos acotado y guarda los trabajos recientes
+    
+    Cada trabajo se escribe también en data/jobs/<id>.json para que cualquier
+    proceso (worker de gunicorn) pueda consultarlo.
+    """
+    
+    def __init__(self, scheduler_service, max_workers=None, max_pending=None, history_size=None, jobs_dir=None):
+        """
+        Inicializa el servicio de trabajos
+        
+        Args:
+            scheduler_service: Servicio de programación (ejecuta y publica el scraping)
+            max_workers (int): Hilos del pool (opcional)
+            max_pending (int): Trabajos en cola o en ejecución permitidos (opcional)
+            history_size (int): Trabajos recientes conservados (opcional)
+            jobs_dir (str): Directorio de trabajos (opcional)
+        """
+        self.scheduler_service = scheduler_service
+        self.max_pending = max_pending or Config.JOB_MAX_PENDING
+        self.history_size = history_size or Config.JOB_HISTORY_SIZE
+        self.jobs_dir = jobs_dir or os.path.join(Config.DATA_DIR, Config.JOBS_DIR)
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or Config.JOB_WORKERS,
+            thread_name_prefix='scrape-job'
+        )
+        self.jobs = OrderedDict()
+        self._pending = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.jobs_dir, exist_ok=True)
+    
+    def submit_scrape(self):
+        """
+        Encola un scraping
+        
+        Returns:
+            dict: Trabajo creado o None si la cola está llena
+        """
+        return self._submit('scrape', self.scheduler_service.scrape_now)
+    
+    def submit_crawl(self):
+        """
+        Encola un crawl multi-página (se une al crawl programado si hay uno en curso)
+        
+        Returns:
+            dict: Trabajo creado o None si la cola está llena
+        """
+        return self._submit('crawl', self._crawl)
+    
+    def _crawl(self):
+        data = self.scheduler_service.crawl_now()
+        if data is None:
+            raise RuntimeError('Crawler no disponible')
+        return data, 'crawl'
+    
+    def _submit(self, job_type, task):
+        """
+        Registra un trabajo y lo encola en el pool
+        
+        Args:
+            job_type (str): Tipo de trabajo ('scrape' o 'crawl')
+            task (callable): Devuelve (resultado, origen)
+        
+        Returns:
+            dict: Trabajo creado o None si la cola está llena
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                return None
+            self._pending += 1
+            
+            job = {
+                'id': uuid.uuid4().hex,
+                'type': job_type,
+                'status': 'queued',
+                'created_at': datetime.now().isoformat(),
+                'started_at': None,
+                'finished_at': None,
+                'phases': {},
+                'source': None,
+                'result': None,
+                'error': None
+            }
+            self.jobs[job['id']] = job
+            evicted = self._evict()
+        
+        self._save(job)
+        for job_id in evicted:
+            self._delete(job_id)
+        
+        self.executor.submit(self._run, job['id'], task)
+        logger.info("Trabajo %s (%s) encolado", job['id'], job_type)
+        return dict(job)
+    
+    def get_job(self, job_id):
+        """
+        Estado de un trabajo
+        
+        Args:
+            job_id (str): ID del trabajo
+        
+        Returns:
+            dict: Trabajo o None si no existe (o ya fue descartado)
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job:
+                return dict(job)
+        return self._load(job_id)
+    
+    def recent_jobs(self, limit=None):
+        """
+        Trabajos recientes de este proceso, más nuevos primero
+        
+        Args:
+            limit (int): Máximo de trabajos (opcional)
+        
+        Returns:
+            list: Trabajos sin el resultado completo
+        """
+        with self._lock:
+            jobs = [
+                {k: v for k, v in job.items() if k != 'result'}
+                for job in reversed(self.jobs.values())
+            ]
+        return jobs[:limit] if limit else jobs
+    
+    def shutdown(self, wait=False):
+        """Detiene el pool de hilos"""
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+    
+    def _run(self, job_id, task):
+        """Ejecuta un trabajo en un hilo del pool"""
+        self._update(job_id, status='running', started_at=datetime.now().isoformat())
+        started = time.perf_counter()
+        
+        try:
+            with run_context(job_id), collect_phases() as phases:
+                data, source = task()
+            succeeded = data.get('status') == 'success'
+            fields = {
+                'status': 'succeeded' if succeeded else 'failed',
+                'phases': phases,
+                'source': source,
+                'result': data,
+                'error': None if succeeded else data.get('error')
+            }
+        except Exception as e:
+            logger.error("Error en trabajo %s: %s", job_id, e)
+            fields = {'status': 'failed', 'phases': {}, 'error': str(e)}
+        
+        fields['phases']['total'] = round(time.perf_counter() - started, 6)
+        with self._lock:
+            self._pending -= 1
+        self._update(job_id, finished_at=datetime.now().isoformat(), **fields)
+    
+    def _update(self, job_id, **fields):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            job = dict(job)
+        self._save(job)
+    
+    def _evict(self):
+        """Descarta los trabajos más antiguos que excedan el historial (con el lock tomado)"""
+        evicted = []
+        while len(self.jobs) > self.history_size:
+            job_id, _ = self.jobs.popitem(last=False)
+            evicted.append(job_id)
+        return evicted
+    
+    def _job_path(self, job_id):
+        return os.path.join(self.jobs_dir, f'{job_id}.json')
+    
+    def _save(self, job):
+        try:
+            path = self._job_path(job['id'])
+            tmp_path = f'{path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(job, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error("Error guardando trabajo %s: %s", job['id'], e)
+    
+    def _load(self, job_id):
+        if not job_id.isalnum():
+            return None
+        try:
+            with open(self._job_path(job_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _delete(self, job_id):
+        try:
+            os.remove(self._job_path(job_id))
+        except OSError:
+            pass
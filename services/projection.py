@@ -0,0 +1,249 @@
+"""
+Proyección - Campos, filtros y paginación de un snapshot (fields=, news.title~=, limit=, cursor=)
+"""
+import base64
+import binascii
+import threading
+from collections import OrderedDict
+from .entity_store import ENTITY_TYPES
+from .search_index import normalize
+
+# Alias cortos de las listas del snapshot ('news' → 'latest_news'); el nombre completo también vale
+LIST_ALIASES = {alias: list_key for alias, (_, list_key, _) in ENTITY_TYPES.items()}
+
+# Parámetros que no son filtros
+RESERVED_PARAMS = frozenset(('fields', 'limit', 'cursor', 'offset', 'at', 'from', 'to'))
+
+
+def _list_key(name):
+    return LIST_ALIASES.get(name, name)
+
+
+def encode_cursor(version, offset):
+    """Cursor opaco: posición siguiente atada a la versión que se paginaba"""
+    return base64.urlsafe_b64encode(f'{version}:{offset}'.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, version):
+    """
+    Posición de un cursor de encode_cursor()
+    
+    Args:
+        cursor (str): Cursor recibido
+        version (str): Versión actual (snapshot o rango consultado)
+    
+    Returns:
+        int: Posición donde continuar
+    
+    Raises:
+        ValueError: Si el cursor no es válido o es de otra versión
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        cursor_version, offset = raw.rsplit(':', 1)
+        offset = int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError('cursor no válido')
+    if cursor_version != str(version) or offset < 0:
+        raise ValueError('El cursor es de otra versión de los datos; vuelve a pedir la primera página')
+    return offset
+
+
+class Projection:
+    """
+    Subconjunto de un snapshot pedido por query string
+    
+    - fields: claves del snapshot y/o campos de los elementos de una lista
+      (fields=news.title,news.url,timestamp). Sin fields se conservan todas.
+    - filtros: <lista>.<campo>~=<texto> (contiene, sin acentos ni mayúsculas) y
+      <lista>.<campo>=<valor> (igual). Se combinan con AND; los demás parámetros
+      se ignoran.
+    - limit/offset: se aplican a cada lista después de filtrar.
+    """
+    
+    def __init__(self, fields=None, filters=None, limit=None, offset=0):
+        """
+        Args:
+            fields (list): 'clave' o 'lista.campo' (opcional)
+            filters (list): Tuplas (lista, campo, operador, valor) con operador '~=' o '=' (opcional)
+            limit (int): Máximo de elementos por lista (opcional)
+            offset (int): Elementos a saltar en cada lista
+        """
+        self.keys = {}  # clave → None (completa) o tupla de campos
+        for field in fields or ():
+            key, _, subfield = field.partition('.')
+            key = _list_key(key)
+            if not subfield:
+                self.keys[key] = None
+            elif key not in self.keys or self.keys[key] is not None:
+                self.keys[key] = (self.keys.get(key) or ()) + (subfield,)
+        
+        self.filters = {}
+        for list_key, field, operator, value in filters or ():
+            if operator == '~=':
+                value = normalize(value)
+            self.filters.setdefault(_list_key(list_key), []).append((field, operator, value))
+        
+        self.limit = limit
+        self.offset = offset
+    
+    @classmethod
+    def from_args(cls, args, max_limit=None, paginate=True):
+        """
+        Construye la proyección a partir de request.args
+        
+        Args:
+            args: MultiDict de Werkzeug
+            max_limit (int): Tope de limit (opcional)
+            paginate (bool): Si limit/offset aplican a las listas (en /api/history paginan snapshots)
+        
+        Returns:
+            Projection: Proyección pedida (identity si no hay parámetros)
+        
+        Raises:
+            ValueError: Si algún parámetro no es válido
+        """
+        fields = [field.strip() for value in args.getlist('fields') for field in value.split(',') if field.strip()]
+        
+        filters = []
+        for name, values in args.lists():
+            if name in RESERVED_PARAMS:
+                continue
+            operator = '~=' if name.endswith('~') else '='
+            list_key, _, field = name.rstrip('~').partition('.')
+            if not list_key or not field:
+                continue  # No es un filtro (p. ej. ?_= contra cachés o ?callback=)
+            filters.extend((list_key, field, operator, value) for value in values)
+        
+        limit = None
+        if paginate and args.get('limit'):
+            try:
+                limit = int(args['limit'])
+            except ValueError:
+                raise ValueError('limit debe ser entero')
+            limit = max(1, min(limit, max_limit) if max_limit else limit)
+        
+        return cls(fields, filters, limit)
+    
+    @property
+    def is_identity(self):
+        """True si la proyección devuelve el snapshot sin cambios"""
+        return not self.keys and not self.filters and self.limit is None and not self.offset
+    
+    @property
+    def cache_key(self):
+        """Forma canónica de la proyección: misma clave, misma respuesta"""
+        return (
+            tuple(sorted((key, fields) for key, fields in self.keys.items())),
+            tuple(sorted((key, tuple(filters)) for key, filters in self.filters.items())),
+            self.limit,
+            self.offset
+        )
+    
+    def apply(self, data):
+        """
+        Aplica campos, filtros y paginación a un snapshot
+        
+        Args:
+            data (dict): Snapshot completo
+        
+        Returns:
+            tuple: (snapshot proyectado, totales por lista tras filtrar, hay_más)
+        """
+        projected, totals, has_more = {}, {}, False
+        for key, value in data.items():
+            if self.keys and key not in self.keys:
+                continue
+            if not isinstance(value, list):
+                projected[key] = value
+                continue
+            
+            items = value
+            if key in self.filters:
+                items = [item for item in items if self._matches(item, self.filters[key])]
+            totals[key] = len(items)
+            if self.limit is not None or self.offset:
+                end = None if self.limit is None else self.offset + self.limit
+                has_more = has_more or (end is not None and end < len(items))
+                items = items[self.offset:end]
+            subfields = self.keys.get(key)
+            if subfields:
+                items = [
+                    {field: item.get(field) for field in subfields} if isinstance(item, dict) else item
+                    for item in items
+                ]
+            projected[key] = items
+        return projected, totals, has_more
+    
+    @staticmethod
+    def _matches(item, filters):
+        for field, operator, value in filters:
+            if isinstance(item, dict):
+                actual = item.get(field)
+            else:
+                actual = item if field == 'text' else None  # Indicadores: texto plano
+            if actual is None:
+                return False
+            if operator == '~=':
+                if value not in normalize(actual):
+                    return False
+            elif str(actual) != value:
+                return False
+        return True
+
+
+class ProjectionCache:
+    """
+    Respuestas proyectadas de la versión actual del snapshot (LRU acotado)
+    
+    Se indexan por digest del snapshot y Projection.cache_key: al publicarse un
+    snapshot nuevo su digest cambia y las entradas anteriores se descartan.
+    """
+    
+    def __init__(self, max_entries=64):
+        """
+        Args:
+            max_entries (int): Combinaciones de parámetros a conservar
+        """
+        self.max_entries = max_entries
+        self._digest = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, digest, key, build):
+        """
+        Respuesta en caché o construida con build() (fuera del lock)
+        
+        Args:
+            digest (str): Versión del snapshot
+            key (tuple): Clave de la proyección
+            build (callable): Construye la respuesta si falta
+        
+        Returns:
+            object: Respuesta preparada
+        """
+        with self._lock:
+            if digest != self._digest:
+                self._digest = digest
+                self._entries.clear()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        
+        entry = build()
+        with self._lock:
+            if digest == self._digest:
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+    
+    def stats(self):
+        """Uso de la caché"""
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,220 @@
+"""
+Servidor de reproducción - Sustituto local del sitio del INEGI a partir de un cassette
+"""
+import hashlib
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .cassette import Cassette
+
+# Primer bloque de noticias: ahí se insertan los comunicados simulados
+_NEWS_BLOCK = re.compile(rb'<(?:article|div|section)\b[^>]*class="[^"]*(?:noticia|comunicado|news)', re.IGNORECASE)
+
+
+class ReplayServer:
+    """
+    Sirve las respuestas grabadas con latencia, errores y cambios configurables
+    
+    - Latencia: fija + aleatoria + una fracción del tiempo grabado.
+    - Errores: una proporción de peticiones responde error_status (el cliente reintenta).
+    - Mutaciones: con probabilidad mutation_rate por petición la página cambia
+      (se agrega un comunicado simulado) y queda así hasta la siguiente mutación,
+      de modo que ETag/304, deduplicación y deltas se ejercitan como con el sitio real.
+    - mode='latest' sirve la última grabación de cada ruta; 'cycle' las recorre en orden.
+    """
+    
+    def __init__(self, cassette=None, host='127.0.0.1', port=8765, latency_ms=0, jitter_ms=0,
+                 latency_scale=0.0, error_rate=0.0, error_status=503, mutation_rate=0.0,
+                 mode='latest', seed=None):
+        """
+        Inicializa el servidor (los cuerpos se cargan en memoria una sola vez)
+        
+        Args:
+            cassette (Cassette): Respuestas grabadas (por defecto, el directorio configurado)
+            host (str): Interfaz de escucha
+            port (int): Puerto (0 = cualquiera libre)
+            latency_ms (float): Latencia fija por respuesta
+            jitter_ms (float): Latencia aleatoria adicional (uniforme)
+            latency_scale (float): Fracción del tiempo grabado a reproducir (1.0 = igual que el sitio)
+            error_rate (float): Proporción de respuestas con error (0-1)
+            error_status (int): Código de las respuestas con error
+            mutation_rate (float): Probabilidad por petición de que la página cambie (0-1)
+            mode (str): 'latest' o 'cycle'
+            seed (int): Semilla para repetir exactamente una corrida (opcional)
+        """
+        if mode not in ('latest', 'cycle'):
+            raise ValueError("mode debe ser 'latest' o 'cycle'")
+        
+        self.cassette = cassette or Cassette()
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.mutation_rate = mutation_rate
+        self.mode = mode
+        self.random = random.Random(seed)
+        self.routes = self.cassette.by_key()
+        self.bodies = {
+            interaction['sha256']: self.cassette.load_body(interaction['sha256'])
+            for interactions in self.routes.values()
+            for interaction in interactions
+        }
+        self.stats = {'requests': 0, 'ok': 0, 'not_modified': 0, 'errors': 0, 'not_found': 0, 'mutations': 0}
+        self._version = 0
+        self._cursors = {}
+        self._rendered = {}  # (sha256, versión) → (cuerpo, etag)
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+    
+    @property
+    def base_url(self):
+        """URL a usar como Config.INEGI_BASE_URL"""
+        port = self._httpd.server_address[1] if self._httpd else self.port
+        return f'http://{self.host}:{port}'
+    
+    def start(self):
+        """
+        Inicia el servidor en un hilo (para pruebas dentro del mismo proceso)
+        
+        Returns:
+            str: URL base del servidor
+        """
+        self._httpd = self._build_httpd()
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='replay-server', daemon=True)
+        self._thread.start()
+        return self.base_url
+    
+    def serve_forever(self):
+        """Atiende peticiones en el hilo actual hasta Ctrl+C"""
+        self._httpd = self._build_httpd()
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+    
+    def stop(self):
+        """Detiene el servidor"""
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+    
+    def respond(self, key, if_none_match=None):
+        """
+        Decide la respuesta para una ruta
+        
+        Args:
+            key (str): Ruta y query solicitadas
+            if_none_match (str): Header If-None-Match del cliente (opcional)
+        
+        Returns:
+            tuple: (status, headers, cuerpo, segundos de espera)
+        """
+        with self._lock:
+            self.stats['requests'] += 1
+            interactions = self.routes.get(key)
+            if not interactions:
+                self.stats['not_found'] += 1
+                return 404, {'Content-Type': 'text/plain; charset=utf-8'}, b'sin grabacion para esta ruta', 0.0
+            
+            if self.mode == 'cycle':
+                index = self._cursors.get(key, 0)
+                self._cursors[key] = index + 1
+                interaction = interactions[index % len(interactions)]
+            else:
+                interaction = interactions[-1]
+            
+            delay = self._delay(interaction)
+            if self.error_rate and self.random.random() < self.error_rate:
+                self.stats['errors'] += 1
+                return self.error_status, {'Content-Type': 'text/plain; charset=utf-8'}, b'error simulado', delay
+            
+            if self.mutation_rate and self.random.random() < self.mutation_rate:
+                self._version += 1
+                self.stats['mutations'] += 1
+            body, etag = self._render(interaction, self._version)
+            
+            # Cassettes anteriores guardan los validadores con la capitalización del sitio;
+            # las mutaciones invalidan la fecha grabada y el ETag se recalcula
+            headers = {
+                name: value for name, value in interaction['headers'].items()
+                if name.lower() not in ('etag', 'last-modified')
+            }
+            headers['ETag'] = etag
+            if if_none_match and etag in [tag.strip() for tag in if_none_match.split(',')]:
+                self.stats['not_modified'] += 1
+                return 304, {'ETag': etag}, b'', delay
+            
+            self.stats['ok'] += 1
+            return interaction['status'], headers, body, delay
+    
+    def _delay(self, interaction):
+        delay = self.latency_ms / 1000 + interaction.get('elapsed', 0.0) * self.latency_scale
+        if self.jitter_ms:
+            delay += self.random.uniform(0, self.jitter_ms) / 1000
+        return delay
+    
+    def _render(self, interaction, version):
+        """Cuerpo con las mutaciones acumuladas hasta version (y su ETag), calculado una vez"""
+        cache_key = (interaction['sha256'], version)
+        rendered = self._rendered.get(cache_key)
+        if rendered is None:
+            body = self.bodies[interaction['sha256']]
+            if version:
+                body = self._mutate(body, version)
+            rendered = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+            if len(self._rendered) > 4 * len(self.bodies):
+                self._rendered.clear()
+            self._rendered[cache_key] = rendered
+        return rendered
+    
+    def _mutate(self, body, version):
+        """Inserta un comunicado simulado antes del primer bloque de noticias"""
+        article = (
+            f'<article class="noticia"><h3>Comunicado simulado {version}</h3>'
+            f'<a href="/contenidos/saladeprensa/simulado-{version}.pdf">Ver</a>'
+            f'<span class="fecha">{datetime.now():%d/%m/%Y}</span></article>'
+        ).encode('ascii')
+        match = _NEWS_BLOCK.search(body)
+        position = match.start() if match else body.rfind(b'</body>')
+        if position < 0:
+            return body + article
+        return body[:position] + article + body[position:]
+    
+    def _build_httpd(self):
+        server = self
+        
+        class ReplayHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, como el sitio real
+            
+            def do_GET(self):
+                self._reply(send_body=True)
+            
+            def do_HEAD(self):
+                self._reply(send_body=False)
+            
+            def _reply(self, send_body):
+                status, headers, body, delay = server.respond(self.path, self.headers.get('If-None-Match'))
+                if delay > 0:
+                    time.sleep(delay)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if send_body and body:
+                    self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass  # Miles de peticiones por prueba de carga: sin log por petición
+        
+        httpd = ThreadingHTTPServer((self.host, self.port), ReplayHandler)
+        httpd.daemon_threads = True
+        return httpd
@@ -1,27 +1,195 @@
 """
 Servicio de Programación - Microservicio para tareas programadas
 """
-from apscheduler.schedulers.background import BackgroundScheduler
+import os
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import nullcontext
 from datetime import datetime
 from config import Config
+from utils import data_fingerprint, phase, PrecompressedJSON, METRICS, get_logger, run_context, current_run_id
+from .adaptive_interval import AdaptiveInterval
+from .diff_service import LIST_FIELDS
+from .snapshot_log import parse_timestamp
+
+logger = get_logger('SchedulerService')
+SCRAPE_RUNS = METRICS.counter(
+    'inegi_scrape_runs_total',
+    'Ejecuciones de scraping de la página principal por resultado',
+    ('result', 'changed')
+)
+BOOT_SECONDS = METRICS.histogram(
+    'inegi_boot_seconds',
+    'Segundos desde el inicio del proceso hasta cada etapa del arranque',
+    ('stage',),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
 
 
 class SchedulerService:
     """Servicio especializado en programación de tareas automáticas"""
     
-    def __init__(self, scraper_service, storage_service):
+    def __init__(self, scraper_service, storage_service, crawler_service=None, diff_service=None,
+                 leader_lock=None, shared_snapshot=None, target_scheduler=None, event_broker=None,
+                 stream_server=None):
         """
         Inicializa el servicio de programación
         
         Args:
             scraper_service: Instancia del servicio de scraping
             storage_service: Instancia del servicio de almacenamiento
+            crawler_service: Instancia del servicio de crawling (opcional)
+            diff_service: Instancia del servicio de cambios (opcional)
+            leader_lock: LeaderLock para que un solo proceso haga scraping (opcional)
+            shared_snapshot: SharedSnapshot para compartir la caché entre procesos (opcional)
+            target_scheduler: TargetScheduler de objetivos adicionales (opcional, solo en el líder)
+            event_broker: EventBroker que recibe un evento por snapshot publicado (opcional)
+            stream_server: StreamServer SSE (opcional, solo en el líder)
         """
         self.scraper_service = scraper_service
         self.storage_service = storage_service
-        self.scheduler = BackgroundScheduler()
+        self.crawler_service = crawler_service
+        self.diff_service = diff_service
+        self.leader_lock = leader_lock
+        self.shared_snapshot = shared_snapshot
+        self.target_scheduler = target_scheduler
+        self.event_broker = event_broker
+        self.stream_server = stream_server
+        self.scheduler = None  # BackgroundScheduler, creado en start()
         self.cached_data = {}
+        self.cached_response = None
+        self.last_success_data = None  # Base de los deltas aunque la caché tenga un error
+        self._unflushed = None  # Último snapshot sin cambios: su aparición se persiste en flush_seen()
+        self.crawl_data = {}
         self.is_running = False
+        self.interval_minutes = Config.SCRAPING_INTERVAL_MINUTES
+        self.adaptive = None
+        
+        # Detección de cambios
+        self.last_data_hash = None
+        self.last_checked = None
+        self.runs_total = 0
+        self.runs_unchanged = 0
+        
+        # Scraping en curso (compartido por las peticiones concurrentes)
+        self._scrape_lock = threading.Lock()
+        self._inflight = None
+        self.last_scrape_data = None
+        self.last_scrape_at = None
+        self.runs_coalesced = 0
+        
+        # Crawl en curso (programado o manual): uno a la vez
+        self._crawl_lock = threading.Lock()
+        self._crawl_inflight = None
+        
+        # Arranque: modo, snapshot inicial y segundos hasta cada etapa
+        self.boot_started = None
+        self.boot_mode = None
+        self.boot_seconds = {}
+        self.warm_snapshot = None
+        self.initial_scrape = 'pending'
+    
+    def boot(self, interval_minutes=None, warm=None, started=None):
+        """
+        Arranque de la aplicación: caché inicial, scheduler y primer scraping
+        
+        En caliente, la caché se llena con el último snapshot persistido (sin red)
+        y el primer scraping se ejecuta en segundo plano, de modo que el proceso
+        atiende peticiones de inmediato. En frío, el primer scraping bloquea el
+        arranque hasta terminar.
+        
+        Args:
+            interval_minutes (int): Intervalo en minutos entre scraping
+            warm (bool): Arranque en caliente (por defecto Config.WARM_START_ENABLED)
+            started (float): time.perf_counter() al iniciar el proceso (para medir el arranque)
+        """
+        if warm is None:
+            warm = Config.WARM_START_ENABLED
+        self.boot_started = started if started is not None else time.perf_counter()
+        self.boot_mode = 'warm' if warm else 'cold'
+        
+        if warm:
+            self.warm_start()
+        self.start(interval_minutes)
+        
+        if not self.is_leader:
+            # El líder hace el primer scraping; este proceso usará su caché compartida
+            self.initial_scrape = 'skipped'
+        elif warm:
+            self.scheduler.add_job(self._initial_scrape, id='initial_scrape', name='INEGI Initial Scraping')
+        else:
+            self._initial_scrape()
+        
+        self.mark_boot('serving')
+        if self.is_ready:
+            self.mark_boot('ready')
+    
+    def warm_start(self):
+        """
+        Llena la caché con el último snapshot persistido, sin red
+        
+        Returns:
+            bool: True si la caché quedó con datos (del disco o publicados por otro proceso)
+        """
+        with self.shared_snapshot.write_lock() if self.shared_snapshot else nullcontext():
+            self._sync_shared()
+            if not self.cached_data:
+                data = self.storage_service.load_json(Config.LATEST_JSON)
+                if data and data.get('status') == 'success':
+                    self.set_cached_data(data)
+                    self.last_data_hash = data_fingerprint(data)
+        
+        if not self.cached_data:
+            logger.info("Sin snapshot persistido: la caché se llenará con el primer scraping")
+            return False
+        
+        self.warm_snapshot = self.cached_data.get('timestamp')
+        logger.info("Caché inicial cargada del snapshot de %s", self.warm_snapshot)
+        return True
+    
+    def _initial_scrape(self):
+        """Primer scraping del proceso líder (en segundo plano si el arranque es en caliente)"""
+        self.initial_scrape = 'running'
+        logger.info("Ejecutando scraping inicial...")
+        self.scheduled_scrape()
+        self.initial_scrape = 'done'
+        self.mark_boot('ready')
+        self.mark_boot('initial_scrape')
+    
+    @property
+    def is_ready(self):
+        """True si hay datos que servir o el primer scraping ya terminó (aunque haya fallado)"""
+        return bool(self.cached_data) or self.initial_scrape in ('done', 'skipped')
+    
+    def mark_boot(self, stage):
+        """
+        Registra (una sola vez) los segundos desde el inicio del proceso hasta una etapa
+        
+        Args:
+            stage (str): 'serving', 'ready', 'initial_scrape' o 'first_request'
+        """
+        if self.boot_started is None or stage in self.boot_seconds:
+            return
+        seconds = time.perf_counter() - self.boot_started
+        self.boot_seconds[stage] = round(seconds, 4)
+        BOOT_SECONDS.observe(seconds, stage=stage)
+        logger.info("Arranque (%s): etapa '%s' a los %.3f s", self.boot_mode, stage, seconds)
+    
+    def boot_status(self):
+        """
+        Estado del arranque para /api/ready y /api/status
+        
+        Returns:
+            dict: Modo, snapshot inicial, primer scraping y segundos por etapa
+        """
+        return {
+            'ready': self.is_ready,
+            'mode': self.boot_mode,
+            'warm_snapshot': self.warm_snapshot,
+            'initial_scrape': self.initial_scrape,
+            'seconds': dict(self.boot_seconds)
+        }
     
     def start(self, interval_minutes=None):
         """
@@ -31,54 +199,408 @@ class SchedulerService:
             interval_minutes (int): Intervalo en minutos entre scraping
         """
         if self.is_running:
-            print(f"[{datetime.now()}] [SchedulerService] Scheduler ya está ejecutándose")
+            logger.warning("Scheduler ya está ejecutándose")
             return
         
         if interval_minutes is None:
             interval_minutes = Config.SCRAPING_INTERVAL_MINUTES
         
-        # Agregar tarea programada
+        if self.scheduler is None:
+            # apscheduler se importa al primer uso (los scripts que solo usan servicios no lo cargan)
+            from apscheduler.schedulers.background import BackgroundScheduler
+            self.scheduler = BackgroundScheduler()
+        
+        if Config.ADAPTIVE_INTERVAL_ENABLED:
+            self.adaptive = AdaptiveInterval(
+                interval_minutes,
+                min_minutes=Config.ADAPTIVE_MIN_MINUTES,
+                max_minutes=Config.ADAPTIVE_MAX_MINUTES,
+                backoff_factor=Config.ADAPTIVE_BACKOFF_FACTOR,
+                tighten_factor=Config.ADAPTIVE_TIGHTEN_FACTOR,
+                jitter_ratio=Config.ADAPTIVE_JITTER_RATIO,
+                window_hours=Config.ADAPTIVE_WINDOW_HOURS
+            )
+            interval_minutes = self.adaptive.minutes
+        self.interval_minutes = interval_minutes
+        
+        if not self.leader_lock or self.leader_lock.acquire():
+            # Agregar tarea programada
+            self._schedule_scrape_job(interval_minutes)
+            if self.target_scheduler:
+                self.target_scheduler.start()
+            self._start_stream_server()
+        else:
+            # Otro proceso hace el scraping; reintentar por si el líder termina
+            self.scheduler.add_job(
+                self._try_become_leader,
+                'interval',
+                seconds=Config.LEADER_RETRY_SECONDS,
+                id='leader_job',
+                name='INEGI Leader Election'
+            )
+        
+        self.scheduler.start()
+        self.is_running = True
+        
+        logger.info("Scheduler iniciado (%s) - Intervalo: cada %s minuto(s)%s",
+                    'líder' if self.is_leader else 'seguidor', interval_minutes,
+                    ' (adaptativo)' if self.adaptive else '')
+    
+    def _schedule_scrape_job(self, interval_minutes):
+        """Agrega (o reemplaza) la tarea periódica de scraping; con el mismo intervalo conserva la próxima ejecución"""
+        jitter = self.adaptive.jitter_seconds if self.adaptive else None
+        job = self.scheduler.get_job('scrape_job')
+        if job and job.trigger.interval_length == interval_minutes * 60 and job.trigger.jitter == jitter:
+            return
+        
         self.scheduler.add_job(
             self.scheduled_scrape,
             'interval',
             minutes=interval_minutes,
+            jitter=jitter,
             id='scrape_job',
-            name='INEGI Scheduled Scraping'
+            name='INEGI Scheduled Scraping',
+            replace_existing=True
         )
-        
-        self.scheduler.start()
-        self.is_running = True
-        
-        print(f"[{datetime.now()}] [SchedulerService] Scheduler iniciado")
-        print(f"  - Intervalo: cada {interval_minutes} minuto(s)")
     
     def stop(self):
-        """Detiene el scheduler"""
+        """Detiene el scheduler y persiste la última aparición pendiente"""
         if self.is_running:
             self.scheduler.shutdown()
+            if self.target_scheduler:
+                self.target_scheduler.stop()
+            if self.stream_server:
+                self.stream_server.stop()
             self.is_running = False
-            print(f"[{datetime.now()}] [SchedulerService] Scheduler detenido")
+            logger.info("Scheduler detenido")
+        self.flush_seen()
     
     def scheduled_scrape(self):
-        """Tarea programada para ejecutar scraping"""
-        print(f"[{datetime.now()}] [SchedulerService] Ejecutando scraping programado...")
+        """Tarea programada para ejecutar scraping (scraping y crawl comparten ID de ejecución)"""
+        with run_context():
+            self._scheduled_scrape()
+    
+    def _scheduled_scrape(self):
+        logger.info("Ejecutando scraping programado...")
         
         try:
-            # Ejecutar scraping
-            data = self.scraper_service.scrape_homepage()
+            # Ejecutar scraping (o unirse a uno manual en curso)
+            data, _ = self.run_scrape(scheduled=True)
             
-            # Guardar en caché
-            self.cached_data = data
+            # Recorrer las páginas enlazadas (modo crawl)
+            if Config.CRAWL_ENABLED and self.crawler_service and data.get('status') == 'success':
+                self.run_crawl(data)
             
-            # Persistir datos
-            self.storage_service.save_json(data, Config.LATEST_JSON)
-            self.storage_service.save_json(data, Config.JSON_FILENAME)
-            self.storage_service.save_csv(data, Config.CSV_FILENAME)
+            logger.info("Scraping programado completado")
+        
+        except Exception as e:
+            logger.error("Error en scraping programado: %s", e)
+    
+    def scrape_now(self, max_age=None):
+        """
+        Scraping bajo demanda: reutiliza un resultado reciente o uno en curso
+        
+        Args:
+            max_age (float): Segundos en que un resultado sigue fresco (por defecto, configuración)
+        
+        Returns:
+            tuple: (datos, origen) con origen 'fresh', 'coalesced' o 'scrape'
+        """
+        if max_age is None:
+            max_age = Config.SCRAPE_FRESHNESS_SECONDS
+        
+        fresh = self.get_fresh_data(max_age)
+        if fresh:
+            return fresh, 'fresh'
+        
+        data, coalesced = self.run_scrape()
+        return data, 'coalesced' if coalesced else 'scrape'
+    
+    def run_scrape(self, scheduled=False):
+        """
+        Ejecuta scraping y publica; las llamadas concurrentes comparten una sola ejecución
+        
+        Args:
+            scheduled (bool): Ejecución de la tarea periódica (solo estas ajustan el intervalo adaptativo)
+        
+        Returns:
+            tuple: (datos, True si se reutilizó una ejecución en curso)
+        """
+        with self._scrape_lock:
+            future = self._inflight
+            owner = future is None
+            if owner:
+                future = self._inflight = Future()
+        
+        if not owner:
+            self.runs_coalesced += 1
+            return future.result(timeout=Config.SCRAPE_COALESCE_TIMEOUT), True
+        
+        try:
+            with run_context(current_run_id()):
+                data = self.scraper_service.scrape_homepage()
+            with phase('persist'):
+                changed = self.publish(data)
+            if data.get('status') == 'success':
+                self.last_scrape_data = data
+                self.last_scrape_at = time.monotonic()
+            if scheduled:
+                self._adapt_interval(changed, data.get('status') == 'success')
+            SCRAPE_RUNS.inc(result=data.get('status', 'error'), changed=str(bool(changed)).lower())
+            self._dump_metrics()
+            future.set_result(data)
+            return data, False
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._scrape_lock:
+                self._inflight = None
+    
+    def _dump_metrics(self):
+        """Publica las métricas de este proceso para /api/metrics en los demás workers"""
+        if not Config.METRICS_ENABLED:
+            return
+        try:
+            METRICS.dump_if_due(os.path.join(Config.DATA_DIR, Config.METRICS_DIR), Config.METRICS_DUMP_SECONDS)
+        except OSError as e:
+            logger.error("Error guardando métricas: %s", e)
+    
+    def _adapt_interval(self, changed, success):
+        """Recalcula el intervalo adaptativo y reprograma la tarea si cambió"""
+        if not self.adaptive:
+            return
+        
+        minutes = self.adaptive.observe(changed, success)
+        logger.info("Intervalo adaptativo: %s", self.adaptive.rationale)
+        if minutes == self.interval_minutes or not (self.is_running and self.is_leader):
+            return
+        
+        self.interval_minutes = minutes
+        try:
+            self._schedule_scrape_job(minutes)
+        except Exception as e:
+            logger.error("Error reprogramando scraping: %s", e)
+    
+    def get_fresh_data(self, max_age):
+        """
+        Último resultado exitoso si terminó hace menos de max_age segundos
+        
+        Args:
+            max_age (float): Antigüedad máxima en segundos
+        
+        Returns:
+            dict: Datos o None si no hay ninguno suficientemente reciente
+        """
+        if max_age <= 0:
+            return None
+        
+        if self.last_scrape_at is not None and time.monotonic() - self.last_scrape_at <= max_age:
+            return self.last_scrape_data
+        
+        # Publicado por otro proceso
+        cached = self.get_cached_data()
+        if cached and cached.get('status') == 'success':
+            try:
+                age = time.time() - parse_timestamp(cached.get('timestamp'))
+            except (TypeError, ValueError):
+                return None
+            if 0 <= age <= max_age:
+                return cached
+        return None
+    
+    @property
+    def is_leader(self):
+        """True si este proceso ejecuta el scraping programado"""
+        if not self.leader_lock:
+            return True
+        return self.leader_lock.is_leader
+    
+    def _try_become_leader(self):
+        """Toma el scraping programado si el proceso líder terminó"""
+        if not self.leader_lock.acquire():
+            return
+        
+        self.scheduler.remove_job('leader_job')
+        self._schedule_scrape_job(self.interval_minutes)
+        if self.target_scheduler:
+            self.target_scheduler.start()
+        self._start_stream_server()
+        logger.info("Proceso %s es ahora el líder", os.getpid())
+    
+    def _start_stream_server(self):
+        """El servidor SSE vive en el líder: es el proceso que publica los snapshots"""
+        if not self.stream_server:
+            return
+        try:
+            self.stream_server.start()
+        except OSError as e:
+            logger.error("No se pudo iniciar el stream SSE en el puerto %s: %s", self.stream_server.port, e)
+    
+    def publish(self, data):
+        """
+        Publica un resultado de scraping: caché, cambios y persistencia
+        
+        Args:
+            data (dict): Resultado de ScraperService
+        
+        Returns:
+            bool: True si el contenido cambió y se persistió
+        """
+        # Un solo proceso publica a la vez, partiendo de la última versión compartida
+        with self.shared_snapshot.write_lock() if self.shared_snapshot else nullcontext():
+            self._sync_shared()
+            if self.diff_service:
+                self.diff_service.refresh()
+            return self._publish(data)
+    
+    def _publish(self, data):
+        changes = None
+        self.runs_total += 1
+        self.last_checked = datetime.now().isoformat()
+        
+        if data.get('status') == 'success':
+            # Sin cambios respecto a la última ejecución: no escribir nada (salvo que la caché
+            # tenga un error posterior, que el contenido igual debe reemplazar). La aparición
+            # en entidades, búsqueda e indicadores queda en memoria hasta el próximo cambio
+            if not self.has_changed(data) and self.cached_data.get('status') == 'success':
+                self.runs_unchanged += 1
+                self._unflushed = data
+                logger.info("Sin cambios, se omite la persistencia")
+                return False
             
-            print(f"[{datetime.now()}] [SchedulerService] Scraping programado completado")
+            # Cerrar el tramo sin cambios antes de registrar el contenido nuevo
+            self.flush_seen()
+            self.storage_service.save_entities(data)
+            self.storage_service.save_indicators(data)
+            self.storage_service.index_search(data)
             
+            # Guardar solo el delta respecto al último snapshot exitoso (no al error intermedio)
+            if self.diff_service:
+                changes = self.diff_service.record(self._last_success(), data)
+        
+        # Guardar en caché (y serializar una sola vez para /api/data), y avisar a /api/stream
+        self.set_cached_data(data, changes=changes)
+        
+        # Persistir datos
+        self.storage_service.save_json(data, Config.LATEST_JSON)
+        self.storage_service.save_json(data, Config.JSON_FILENAME)
+        self.storage_service.save_csv(data, Config.CSV_FILENAME)
+        if data.get('status') == 'success':
+            self.storage_service.append_snapshot(data)
+        
+        return True
+    
+    def flush_seen(self):
+        """
+        Persiste la última aparición del contenido que no cambió
+        
+        Extiende last_seen de las entidades, los rangos de búsqueda y agrega la
+        muestra final de cada indicador con el timestamp del último snapshot sin
+        cambios. Se llama al publicar un cambio y al detener el servicio.
+        """
+        data, self._unflushed = self._unflushed, None
+        if not data:
+            return
+        self.storage_service.touch_entities(data)
+        self.storage_service.index_search(data)
+        self.storage_service.save_indicators(data)
+    
+    def _last_success(self):
+        """Último snapshot exitoso: la caché, o el historial si la caché tiene un error"""
+        if self.cached_data.get('status') == 'success':
+            return self.cached_data
+        if self.last_success_data is None:
+            self.last_success_data = self.storage_service.get_snapshot_at(time.time()) or {}
+        return self.last_success_data
+    
+    def has_changed(self, data):
+        """
+        Compara la huella de los datos extraídos con la última persistida
+        
+        Args:
+            data (dict): Resultado de scraping exitoso
+        
+        Returns:
+            bool: True si el contenido cambió
+        """
+        if self.last_data_hash is None:
+            # Primera ejecución del proceso: comparar con el último snapshot en disco
+            previous = self.cached_data or self.storage_service.load_json(Config.LATEST_JSON)
+            if previous and previous.get('status') == 'success':
+                self.last_data_hash = data_fingerprint(previous)
+                if not self.cached_data:
+                    self.set_cached_data(previous)
+        
+        current_hash = data_fingerprint(data)
+        if current_hash == self.last_data_hash:
+            return False
+        
+        self.last_data_hash = current_hash
+        return True
+    
+    def crawl_now(self):
+        """
+        Crawl bajo demanda a partir de la caché (o de un scraping si la caché no es exitosa)
+        
+        Returns:
+            dict: Resultado agregado del crawl o None si no hay crawler
+        
+        Raises:
+            RuntimeError: Si no se pudo obtener la página principal
+        """
+        seed_data = self.get_cached_data()
+        if not seed_data or seed_data.get('status') != 'success':
+            seed_data, _ = self.run_scrape()
+        if seed_data.get('status') != 'success':
+            raise RuntimeError(f"Error obteniendo la página principal: {seed_data.get('error')}")
+        return self.run_crawl(seed_data)
+    
+    def run_crawl(self, seed_data=None):
+        """
+        Ejecuta el crawl multi-página a partir de un resultado de scraping
+        
+        Las llamadas concurrentes (programada y manual) comparten una sola ejecución.
+        
+        Args:
+            seed_data (dict): Resultado de la página principal (por defecto, la caché)
+        
+        Returns:
+            dict: Resultado agregado del crawl o None si no hay crawler
+        """
+        if not self.crawler_service:
+            return None
+        
+        with self._crawl_lock:
+            future = self._crawl_inflight
+            owner = future is None
+            if owner:
+                future = self._crawl_inflight = Future()
+        
+        if not owner:
+            return future.result(timeout=Config.CRAWL_COALESCE_TIMEOUT)
+        
+        try:
+            crawl = self.crawler_service.crawl(seed_data or self.cached_data)
+            self.crawl_data = crawl
+            self.storage_service.save_json(crawl, Config.CRAWL_JSON)
+            future.set_result(crawl)
+            return crawl
         except Exception as e:
-            print(f"[{datetime.now()}] [SchedulerService] Error en scraping programado: {e}")
+            future.set_exception(e)
+            raise
+        finally:
+            with self._crawl_lock:
+                self._crawl_inflight = None
+    
+    def get_crawl_data(self):
+        """
+        Obtiene el último resultado del crawl
+        
+        Returns:
+            dict: Resultado del crawl en caché
+        """
+        return self.crawl_data
     
     def get_cached_data(self):
         """
@@ -87,16 +609,96 @@ class SchedulerService:
         Returns:
             dict: Datos en caché
         """
+        self._sync_shared()
         return self.cached_data
     
-    def set_cached_data(self, data):
+    def get_cached_response(self):
         """
-        Actualiza los datos en caché
+        Obtiene la respuesta de /api/data ya serializada y comprimida
+        
+        Returns:
+            PrecompressedJSON: Respuesta preparada o None si no hay caché
+        """
+        self._sync_shared()
+        return self.cached_response
+    
+    def _sync_shared(self):
+        """Adopta la última versión publicada por otro proceso (si la hay)"""
+        if not self.shared_snapshot:
+            return
+        
+        prepared = self.shared_snapshot.current()
+        if prepared is None or prepared is self.cached_response:
+            return
+        
+        data = prepared.payload.get('data') or {}
+        self.cached_response = prepared
+        self.cached_data = data
+        self.last_data_hash = data_fingerprint(data) if data.get('status') == 'success' else None
+        self._announce(data)
+    
+    def set_cached_data(self, data, changes=None):
+        """
+        Actualiza los datos en caché y prepara su respuesta serializada
         
         Args:
             data (dict): Nuevos datos
+            changes (dict): Entrada de DiffService respecto al snapshot anterior (opcional)
+        """
+        self.load_cached_data(data)
+        
+        # Hacer visible la nueva versión a los demás procesos
+        if self.shared_snapshot and self.cached_response:
+            self.shared_snapshot.publish(self.cached_response)
+        self._announce(data, changes)
+    
+    def load_cached_data(self, data):
         """
+        Actualiza solo la caché de este proceso (sin publicar ni anunciar la versión)
+        
+        Para datos leídos de disco fuera de write_lock: si otro proceso publica,
+        _sync_shared() los reemplaza.
+        
+        Args:
+            data (dict): Datos a servir desde la caché
+        """
+        self.cached_response = PrecompressedJSON(
+            {'status': 'success', 'source': 'cache', 'data': data},
+            gzip_level=Config.RESPONSE_GZIP_LEVEL,
+            brotli_quality=Config.RESPONSE_BROTLI_QUALITY
+        ) if data else None
         self.cached_data = data
+        if data and data.get('status') == 'success':
+            self.last_success_data = data
+    
+    def _announce(self, data, changes=None):
+        """
+        Publica el evento 'snapshot' de /api/stream: ETag del nuevo /api/data y resumen de cambios
+        
+        El id del evento es la versión compartida, igual en todos los procesos,
+        para que Last-Event-ID siga valiendo si el cliente reconecta a otro.
+        """
+        if not self.event_broker or not self.cached_response:
+            return
+        if changes is None and self.diff_service:
+            # Snapshot publicado por otro proceso: su delta ya está en el log de cambios
+            self.diff_service.refresh()
+            recent = self.diff_service.recent
+            if recent and recent[-1]['timestamp'] == data.get('timestamp'):
+                changes = recent[-1]
+        
+        event = {
+            'timestamp': data.get('timestamp'),
+            'status': data.get('status'),
+            'etag': self.cached_response.etag()
+        }
+        if changes:
+            event['changes_version'] = changes['version']
+            event['changes'] = {
+                field: {kind: len(items) for kind, items in delta.items()} if field in LIST_FIELDS else {'modified': 1}
+                for field, delta in changes['changes'].items()
+            }
+        self.event_broker.publish('snapshot', event, self.shared_snapshot.version if self.shared_snapshot else None)
     
     def update_interval(self, interval_minutes):
         """
@@ -106,27 +708,29 @@ class SchedulerService:
             interval_minutes (int): Nuevo intervalo en minutos
         """
         try:
+            if self.is_running and not self.is_leader:
+                # La tarea vive en el proceso líder; este proceso no puede cambiarla
+                logger.warning("Este proceso no es el líder, intervalo no actualizado")
+                return False
+            
             if self.is_running:
-                # Eliminar tarea existente
-                self.scheduler.remove_job('scrape_job')
+                # En modo adaptativo, el valor manual es el nuevo punto de partida
+                if self.adaptive:
+                    self.adaptive.reset(interval_minutes)
+                    interval_minutes = self.adaptive.minutes
+                self.interval_minutes = interval_minutes
                 
-                # Agregar nueva tarea con nuevo intervalo
-                self.scheduler.add_job(
-                    self.scheduled_scrape,
-                    'interval',
-                    minutes=interval_minutes,
-                    id='scrape_job',
-                    name='INEGI Scheduled Scraping'
-                )
+                # Reemplazar la tarea existente con el nuevo intervalo
+                self._schedule_scrape_job(interval_minutes)
                 
-                print(f"[{datetime.now()}] [SchedulerService] Intervalo actualizado a {interval_minutes} minuto(s)")
+                logger.info("Intervalo actualizado a %s minuto(s)", interval_minutes)
                 return True
             else:
-                print(f"[{datetime.now()}] [SchedulerService] Scheduler no está ejecutándose")
+                logger.warning("Scheduler no está ejecutándose")
                 return False
-                
+        
         except Exception as e:
-            print(f"[{datetime.now()}] [SchedulerService] Error actualizando intervalo: {e}")
+            logger.error("Error actualizando intervalo: %s", e)
             return False
     
     def get_status(self):
@@ -140,7 +744,31 @@ class SchedulerService:
         
         return {
             'is_running': self.is_running,
+            'is_leader': self.is_leader,
+            'pid': os.getpid(),
+            'shared_version': self.shared_snapshot.version if self.shared_snapshot else 'N/A',
             'jobs_count': len(jobs),
             'has_cached_data': len(self.cached_data) > 0,
-            'last_update': self.cached_data.get('timestamp', 'N/A') if self.cached_data else 'N/A'
+            'crawl_enabled': Config.CRAWL_ENABLED,
+            'last_crawl': self.crawl_data.get('timestamp', 'N/A') if self.crawl_data else 'N/A',
+            'last_update': self.cached_data.get('timestamp', 'N/A') if self.cached_data else 'N/A',
+            'last_checked': self.last_checked or 'N/A',
+            'runs_total': self.runs_total,
+            'runs_unchanged': self.runs_unchanged,
+            'runs_coalesced': self.runs_coalesced,
+            'scrape_in_progress': self._inflight is not None,
+            'changes_version': self.diff_service.version if self.diff_service else 'N/A',
+            'interval_minutes': self.interval_minutes,
+            'next_run': self._next_run(),
+            'adaptive_interval': self.adaptive.status() if self.adaptive else None,
+            'boot': self.boot_status(),
+            'last_event_id': self.event_broker.last_id if self.event_broker else 'N/A',
+            'stream_server': self.stream_server.stats() if self.stream_server else None
         }
+    
+    def _next_run(self):
+        """Próxima ejecución programada del scraping (ISO 8601) o 'N/A'"""
+        job = self.scheduler.get_job('scrape_job') if self.is_running else None
+        if job and job.next_run_time:
+            return job.next_run_time.isoformat()
+        return 'N/A'
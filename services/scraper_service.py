@@ -1,10 +1,31 @@
 """
 Servicio de Web Scraping - Microservicio para extraer datos del INEGI
 """
+import hashlib
+import json
+import os
 import requests
-from bs4 import BeautifulSoup
+import threading
+import time
 from datetime import datetime
 from config import Config
+from utils import content_fingerprint, phase, METRICS, get_logger
+from utils.metrics import BYTES_BUCKETS
+from .http_client import HttpClient
+from .html_archive import HtmlArchive
+from .cassette import Cassette
+from .html_parser import PARSER_BACKENDS, resolve_backend, detect_encoding, parse_document
+from .extraction_engine import (
+    ExtractionEngine, TitleExtractor, SectionsExtractor, NewsExtractor,
+    IndicatorsExtractor, LinksExtractor
+)
+
+logger = get_logger('ScraperService')
+RESPONSE_BYTES = METRICS.histogram(
+    'inegi_response_bytes',
+    'Tamaño del cuerpo HTTP recibido (ya descomprimido)',
+    buckets=BYTES_BUCKETS
+)
 
 
 class ScraperService:
@@ -12,9 +33,24 @@ class ScraperService:
     
     def __init__(self):
         self.base_url = Config.INEGI_BASE_URL
-        self.headers = {'User-Agent': Config.USER_AGENT}
-        self.timeout = Config.REQUEST_TIMEOUT
-        
+        self.http_client = HttpClient()
+        self.timeout = self.http_client.timeout
+        self.conditional_requests = Config.CONDITIONAL_REQUESTS
+        self.parser_backend = resolve_backend(Config.HTML_PARSER)
+        self.html_archive = HtmlArchive() if Config.ARCHIVE_ENABLED else None
+        self.cassette = Cassette() if Config.CASSETTE_RECORD else None
+        self.http_cache_dir = os.path.join(Config.DATA_DIR, Config.HTTP_CACHE_DIR)
+        # Validadores HTTP y último resultado extraído por URL (cada URL se lee de disco al primer uso)
+        self.http_cache = {}
+        # Extractores registrados, en el orden de los campos de salida
+        self.extraction_engine = ExtractionEngine([
+            TitleExtractor(),
+            SectionsExtractor(self._normalize_url),
+            NewsExtractor(self._normalize_url),
+            IndicatorsExtractor(),
+            LinksExtractor(self._normalize_url)
+        ])
+    
     def scrape_homepage(self):
         """
         Extrae información de la página principal del INEGI
@@ -22,174 +58,308 @@ class ScraperService:
         Returns:
             dict: Datos extraídos del sitio
         """
+        return self.scrape_page(self.base_url)
+    
+    def scrape_page(self, url):
+        """
+        Extrae información de una página del sitio (validadores y caché propios por URL)
+        
+        Args:
+            url (str): URL absoluta de la página
+        
+        Returns:
+            dict: Datos extraídos de la página
+        """
         try:
-            print(f"[{datetime.now()}] [ScraperService] Iniciando scraping de {self.base_url}...")
+            logger.info("Iniciando scraping de %s...", url)
             
             # Realizar petición HTTP
-            response = self._make_request()
+            with phase('fetch'):
+                response = self._make_request(url)
             if not response:
-                return self._error_response('Error al conectar con el sitio')
+                return self._error_response('Error al conectar con el sitio', url)
+            
+            # Página sin cambios (304): reutilizar el último resultado extraído
+            if response.status_code == 304:
+                cached = self._cache_entry(url).get('result')
+                if cached:
+                    logger.info("Sin cambios (304), reutilizando resultado previo")
+                    return self._not_modified_response(cached)
+                
+                # Sin resultado previo: repetir la petición sin validadores
+                with phase('fetch'):
+                    response = self._make_request(url, conditional=False)
+                if not response:
+                    return self._error_response('Error al conectar con el sitio', url)
             
-            # Parsear HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Archivar el cuerpo crudo para poder re-extraerlo después (backfill)
+            encoding = self.detect_encoding(response)
+            with phase('archive'):
+                self.archive_response(response, url, encoding)
             
-            # Extraer datos
+            # Mismo contenido que la última vez (sin validadores HTTP): no re-parsear
+            content_hash = content_fingerprint(response.content)
+            cached_entry = self._cache_entry(url)
+            if cached_entry.get('content_hash') == content_hash and cached_entry.get('result'):
+                logger.info("Contenido idéntico (hash), reutilizando resultado previo")
+                self._store_validators(url, response, cached_entry['result'], content_hash)
+                return self._not_modified_response(cached_entry['result'])
+            
+            # Parsear HTML (bytes, codificación detectada una sola vez) y extraer datos
+            fields = self.extract_page(response.content, encoding)
             data = {
                 'timestamp': datetime.now().isoformat(),
-                'url': self.base_url,
-                'title': self._extract_title(soup),
-                'main_sections': self._extract_sections(soup),
-                'latest_news': self._extract_news(soup),
-                'featured_indicators': self._extract_indicators(soup),
-                'important_links': self._extract_links(soup),
-                'status': 'success'
+                'url': url,
+                **fields,
+                'status': 'success',
+                'content_hash': content_hash
             }
             
-            print(f"[{datetime.now()}] [ScraperService] Scraping completado exitosamente")
-            print(f"  - Secciones: {len(data['main_sections'])}")
-            print(f"  - Noticias: {len(data['latest_news'])}")
-            print(f"  - Indicadores: {len(data['featured_indicators'])}")
-            print(f"  - Links: {len(data['important_links'])}")
+            if Config.PARSER_PARITY_CHECK:
+                self.check_parser_parity(response.content, encoding)
             
-            return data
+            self._store_validators(url, response, data, content_hash)
+            
+            logger.info("Scraping completado - Secciones: %s, Noticias: %s, Indicadores: %s, Links: %s",
+                        len(data['main_sections']), len(data['latest_news']),
+                        len(data['featured_indicators']), len(data['important_links']))
             
+            return data
+        
         except Exception as e:
-            print(f"[{datetime.now()}] [ScraperService] Error: {e}")
-            return self._error_response(str(e))
+            logger.error("Error: %s", e)
+            return self._error_response(str(e), url)
     
-    def _make_request(self):
-        """Realizar petición HTTP al sitio"""
-        try:
-            response = requests.get(
-                self.base_url, 
-                headers=self.headers, 
-                timeout=self.timeout
+    def extract_page(self, content, encoding=None, backend=None):
+        """
+        Parsea un documento HTML y ejecuta todos los extractores
+        
+        Args:
+            content (bytes): Cuerpo HTML sin decodificar (también acepta str)
+            encoding (str): Codificación del documento (opcional)
+            backend (str): Backend de parseo (por defecto Config.HTML_PARSER)
+        
+        Returns:
+            dict: Campos extraídos (title, main_sections, latest_news, ...)
+        """
+        with phase('parse'):
+            document = parse_document(
+                content,
+                backend or self.parser_backend,
+                encoding or Config.DEFAULT_ENCODING
             )
+        
+        # Un solo recorrido del DOM para todos los extractores
+        with phase('extract'):
+            return self.extraction_engine.run(document, timed=Config.METRICS_ENABLED)
+    
+    def detect_encoding(self, response):
+        """
+        Detecta la codificación de una respuesta (header, <meta charset> o default)
+        
+        Args:
+            response (Response): Respuesta HTTP
+        
+        Returns:
+            str: Codificación a usar al parsear response.content
+        """
+        return detect_encoding(
+            response.content,
+            response.headers.get('Content-Type'),
+            Config.DEFAULT_ENCODING
+        )
+    
+    def archive_response(self, response, url, encoding=None):
+        """
+        Guarda el cuerpo de una respuesta en el archivo de HTML comprimido
+        
+        Args:
+            response (Response): Respuesta HTTP exitosa
+            url (str): URL descargada
+            encoding (str): Codificación detectada (opcional)
+        """
+        if not self.html_archive:
+            return
+        try:
+            self.html_archive.store(response.content, url, datetime.now().isoformat(), encoding)
+        except Exception as e:
+            logger.error("Error archivando HTML: %s", e)
+    
+    def record_response(self, url, response, elapsed=None):
+        """
+        Graba una respuesta exitosa en el cassette (solo con Config.CASSETTE_RECORD)
+        
+        Los 304 y los errores no se graban: el servidor de reproducción genera
+        los suyos (If-None-Match, error_rate).
+        
+        Args:
+            url (str): URL solicitada
+            response (Response): Respuesta con el cuerpo ya descargado
+            elapsed (float): Segundos hasta recibir el cuerpo (opcional)
+        """
+        if not self.cassette or response.status_code == 304 or not response.ok:
+            return
+        try:
+            self.cassette.record(url, response, elapsed)
+        except Exception as e:
+            logger.error("Error grabando respuesta: %s", e)
+    
+    def check_parser_parity(self, content, encoding=None, backends=PARSER_BACKENDS):
+        """
+        Compara la extracción entre backends de parseo
+        
+        Args:
+            content (bytes): Cuerpo HTML sin decodificar
+            encoding (str): Codificación del documento (opcional)
+            backends (iterable): Backends a comparar contra el configurado
+        
+        Returns:
+            dict: Backend de referencia y campos que difieren por backend
+        """
+        reference = self.extract_page(content, encoding)
+        differences = {}
+        
+        for backend in backends:
+            if backend == self.parser_backend or resolve_backend(backend) != backend:
+                continue
+            result = self.extract_page(content, encoding, backend)
+            fields = [field for field in reference if reference[field] != result.get(field)]
+            if fields:
+                differences[backend] = fields
+        
+        if differences:
+            logger.warning("Diferencias entre parsers (%s como referencia): %s", self.parser_backend, differences)
+        
+        return {
+            'reference': self.parser_backend,
+            'consistent': not differences,
+            'differences': differences
+        }
+    
+    def _make_request(self, url=None, conditional=True):
+        """
+        Realizar petición HTTP al sitio
+        
+        Args:
+            url (str): URL a descargar (por defecto, la página principal)
+            conditional (bool): Enviar If-None-Match/If-Modified-Since si hay validadores
+        
+        Returns:
+            Response: Respuesta HTTP (puede ser 304) o None si hay error
+        """
+        url = url or self.base_url
+        headers = {}
+        if conditional and self.conditional_requests:
+            headers.update(self._conditional_headers(url))
+        
+        try:
+            # stream=True separa la espera de la respuesta de la descarga del cuerpo
+            started = time.perf_counter()
+            with phase('request'):
+                response = self.http_client.get(url, headers=headers, stream=True)
+            with phase('download'):
+                body = response.content
+            RESPONSE_BYTES.observe(len(body))
+            self.record_response(url, response, time.perf_counter() - started)
             response.raise_for_status()
-            response.encoding = 'utf-8'
             return response
         except requests.RequestException as e:
-            print(f"[{datetime.now()}] [ScraperService] Error de conexión: {e}")
+            logger.error("Error de conexión: %s", e)
             return None
     
-    def _extract_title(self, soup):
-        """Extrae el título de la página"""
+    def _conditional_headers(self, url):
+        """Construye los headers de petición condicional para una URL"""
+        entry = self._cache_entry(url)
+        if not entry.get('result'):
+            return {}
+        
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def _store_validators(self, url, response, data, content_hash=None):
+        """
+        Guarda ETag/Last-Modified y la huella del cuerpo de la URL en su propio archivo
+        
+        El resultado extraído va en un archivo aparte que solo se reescribe cuando
+        cambia el contenido; se escribe antes que los validadores para que estos
+        nunca apunten a un resultado que no está en disco.
+        """
+        previous = self._cache_entry(url)
+        validators = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_hash': content_hash
+        }
+        
+        if content_hash != previous.get('content_hash') or not previous.get('result'):
+            self._write_cache_file(self._cache_path(url, 'result.json'), data)
+        if any(previous.get(key) != value for key, value in validators.items()):
+            self._write_cache_file(self._cache_path(url), validators)
+        self.http_cache[url] = {**validators, 'result': data}
+    
+    def _cache_entry(self, url):
+        """Validadores y último resultado de una URL (de memoria o de sus archivos)"""
+        entry = self.http_cache.get(url)
+        if entry is None:
+            entry = self.http_cache[url] = self._load_http_cache(url)
+        return entry
+    
+    def _cache_path(self, url, suffix='json'):
+        """Archivo de caché HTTP de una URL (nombre derivado de la URL)"""
+        name = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.http_cache_dir, f"{name}.{suffix}")
+    
+    def _load_http_cache(self, url):
+        """Carga los validadores persistidos de una URL y su resultado si corresponde a la misma huella"""
         try:
-            title = soup.find('title')
-            return title.text.strip() if title else "Sin título"
+            with open(self._cache_path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            with open(self._cache_path(url, 'result.json'), 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            if result.get('content_hash') == entry.get('content_hash'):
+                entry['result'] = result
+            return entry
+        except FileNotFoundError:
+            return {}
         except Exception as e:
-            print(f"[ScraperService] Error extrayendo título: {e}")
-            return "Error al extraer título"
+            logger.error("Error cargando caché HTTP de %s: %s", url, e)
+            return {}
     
-    def _extract_sections(self, soup):
-        """Extrae las secciones principales del sitio"""
-        sections = []
+    def _write_cache_file(self, path, payload):
+        """Reemplaza un archivo de caché HTTP de forma atómica (un temporal por hilo)"""
         try:
-            nav_items = soup.find_all(
-                ['nav', 'ul', 'div'], 
-                class_=lambda x: x and ('menu' in x.lower() or 'nav' in x.lower())
-            )
-            
-            for nav in nav_items[:3]:
-                links = nav.find_all('a', href=True)
-                for link in links[:10]:
-                    text = link.get_text(strip=True)
-                    if text and len(text) > 3:
-                        sections.append({
-                            'name': text,
-                            'url': self._normalize_url(link['href'])
-                        })
-            
-            # Eliminar duplicados
-            sections = list({s['name']: s for s in sections}.values())
-            
+            os.makedirs(self.http_cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
         except Exception as e:
-            print(f"[ScraperService] Error extrayendo secciones: {e}")
-        
-        return sections[:Config.MAX_SECTIONS]
+            logger.error("Error guardando caché HTTP: %s", e)
+    
+    def _extract_title(self, soup):
+        """Extrae el título de la página"""
+        return self.extraction_engine.run(soup, fields=('title',))['title']
+    
+    def _extract_sections(self, soup):
+        """Extrae las secciones principales del sitio"""
+        return self.extraction_engine.run(soup, fields=('main_sections',))['main_sections']
     
     def _extract_news(self, soup):
         """Extrae las últimas noticias o comunicados"""
-        news = []
-        try:
-            news_sections = soup.find_all(
-                ['article', 'div', 'section'], 
-                class_=lambda x: x and ('noticia' in x.lower() or 'comunicado' in x.lower() or 'news' in x.lower())
-            )
-            
-            for item in news_sections[:10]:
-                title_elem = item.find(['h1', 'h2', 'h3', 'h4'])
-                if title_elem:
-                    title = title_elem.get_text(strip=True)
-                    link = item.find('a', href=True)
-                    
-                    news.append({
-                        'title': title,
-                        'url': self._normalize_url(link['href'] if link else ''),
-                        'date': self._extract_date(item)
-                    })
-            
-        except Exception as e:
-            print(f"[ScraperService] Error extrayendo noticias: {e}")
-        
-        return news[:Config.MAX_NEWS]
+        return self.extraction_engine.run(soup, fields=('latest_news',))['latest_news']
     
     def _extract_indicators(self, soup):
         """Extrae indicadores destacados"""
-        indicators = []
-        try:
-            indicator_sections = soup.find_all(
-                ['div', 'section'], 
-                class_=lambda x: x and ('indicador' in x.lower() or 'indicator' in x.lower() or 'estadistica' in x.lower())
-            )
-            
-            for item in indicator_sections[:10]:
-                text = item.get_text(strip=True)
-                if text and len(text) < 500:
-                    indicators.append(text)
-            
-        except Exception as e:
-            print(f"[ScraperService] Error extrayendo indicadores: {e}")
-        
-        return indicators[:Config.MAX_INDICATORS]
+        return self.extraction_engine.run(soup, fields=('featured_indicators',))['featured_indicators']
     
     def _extract_links(self, soup):
         """Extrae links importantes del sitio"""
-        links = []
-        try:
-            all_links = soup.find_all('a', href=True)
-            important_keywords = ['banco', 'datos', 'estadistica', 'censo', 'informacion', 'consulta']
-            
-            for link in all_links:
-                text = link.get_text(strip=True)
-                href = link['href']
-                
-                if text and any(keyword in text.lower() for keyword in important_keywords):
-                    links.append({
-                        'text': text,
-                        'url': self._normalize_url(href)
-                    })
-            
-            # Eliminar duplicados
-            links = list({l['text']: l for l in links}.values())
-            
-        except Exception as e:
-            print(f"[ScraperService] Error extrayendo links: {e}")
-        
-        return links[:Config.MAX_LINKS]
-    
-    def _extract_date(self, element):
-        """Intenta extraer una fecha del elemento"""
-        try:
-            date_elem = element.find(
-                ['time', 'span'], 
-                class_=lambda x: x and 'fecha' in x.lower() if x else False
-            )
-            if date_elem:
-                return date_elem.get_text(strip=True)
-        except:
-            pass
-        return "N/A"
+        return self.extraction_engine.run(soup, fields=('important_links',))['important_links']
     
     def _normalize_url(self, url):
         """Normaliza URLs relativas a absolutas"""
@@ -197,11 +367,18 @@ class ScraperService:
             return 'N/A'
         return url if url.startswith('http') else f"{self.base_url}{url}"
     
-    def _error_response(self, error_message):
+    def _not_modified_response(self, cached):
+        """Genera respuesta a partir del último resultado cuando la página no cambió"""
+        data = dict(cached)
+        data['timestamp'] = datetime.now().isoformat()
+        data['not_modified'] = True
+        return data
+    
+    def _error_response(self, error_message, url=None):
         """Genera respuesta de error estandarizada"""
         return {
             'timestamp': datetime.now().isoformat(),
-            'url': self.base_url,
+            'url': url or self.base_url,
             'status': 'error',
             'error': error_message,
             'main_sections': [],
@@ -0,0 +1,368 @@
+"""
+Índice de búsqueda - Índice invertido incremental de noticias, secciones y links con rangos de aparición
+"""
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import unicodedata
+from datetime import datetime
+from urllib.parse import urlsplit
+from config import Config
+from utils import get_logger
+from .entity_store import ENTITY_TYPES, entity_key
+from .snapshot_log import parse_timestamp
+
+logger = get_logger('SearchIndex')
+
+# Tipos indexados (ENTITY_TYPES) y campo de texto de cada uno
+SEARCH_TYPES = {'news': 'title', 'sections': 'name', 'links': 'text'}
+
+_STOPWORDS = frozenset('''
+a al ante con de del desde el en entre es la las lo los o para por que se sin
+su sus un una y e u the of and
+pdf html htm php aspx
+'''.split())
+_TOKEN = re.compile(r'[a-z0-9]+')
+_VOWELS = frozenset('aeiou')
+
+# Parámetros de BM25 (títulos cortos: la longitud pesa poco)
+_K1 = 1.2
+_B = 0.5
+
+
+def normalize(text):
+    """Minúsculas y sin acentos ('Población' → 'poblacion', 'año' → 'ano')"""
+    text = unicodedata.normalize('NFKD', str(text))
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def _stem(token):
+    """Singular aproximado del español: 'indicadores' → 'indicador', 'encuestas' → 'encuesta'"""
+    if len(token) > 4 and not token.isdigit():
+        if token.endswith('es') and token[-3] not in _VOWELS:
+            return token[:-2]
+        if token.endswith('s') and token[-2] in _VOWELS:
+            return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """
+    Tokens de búsqueda de un texto
+    
+    Args:
+        text (str): Texto libre
+    
+    Returns:
+        list: Tokens normalizados (sin acentos ni palabras vacías, en singular), en orden
+    """
+    return [_stem(token) for token in _TOKEN.findall(normalize(text)) if token not in _STOPWORDS]
+
+
+def _url_tokens(url):
+    """Tokens de la ruta de una URL (nombres de datasets y comunicados; el host se omite)"""
+    if not url or url == 'N/A':
+        return []
+    return tokenize(urlsplit(url).path.replace('_', ' '))
+
+
+class SearchIndex:
+    """
+    Índice invertido token → documentos, actualizado por snapshot
+    
+    Un documento es una noticia, sección o link deduplicado (misma clave que
+    EntityStore) con los rangos de tiempo en que estuvo publicado: si aparece en
+    snapshots consecutivos su rango se extiende, y si desaparece y vuelve se abre
+    otro rango.
+    
+    Persistencia:
+        index.json    - estado compactado (documentos y posting lists), se carga sin re-tokenizar
+        journal.jsonl - una línea por snapshot indexado desde la última compactación
+    
+    Cada línea lleva un número de secuencia, de modo que repetir el journal
+    sobre un estado más nuevo no tiene efecto. Los demás procesos leen solo las
+    líneas nuevas del journal antes de cada búsqueda.
+    """
+    
+    STATE_FILENAME = 'index.json'
+    JOURNAL_FILENAME = 'journal.jsonl'
+    
+    def __init__(self, directory=None, compact_every=None):
+        """
+        Inicializa el índice (carga el estado y aplica el journal)
+        
+        Args:
+            directory (str): Directorio del índice (opcional)
+            compact_every (int): Líneas del journal antes de compactar (opcional)
+        """
+        self.directory = directory or os.path.join(Config.DATA_DIR, Config.SEARCH_DIR)
+        self.compact_every = compact_every or Config.SEARCH_COMPACT_EVERY
+        self.state_path = os.path.join(self.directory, self.STATE_FILENAME)
+        self.journal_path = os.path.join(self.directory, self.JOURNAL_FILENAME)
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        
+        with self._lock:
+            self._load()
+    
+    def index_snapshot(self, data):
+        """
+        Indexa un snapshot: documentos nuevos y extensión de rangos de los ya conocidos
+        
+        Args:
+            data (dict): Resultado de ScraperService
+        
+        Returns:
+            int: Documentos nuevos
+        """
+        ts = parse_timestamp(data['timestamp'])
+        with self._lock:
+            self._refresh()
+            if self.last_ts is not None and ts <= self.last_ts:
+                return 0  # Ya indexado (o más antiguo que el índice)
+            
+            new_docs, seen = [], {}
+            for entity_type, text_field in SEARCH_TYPES.items():
+                for item in data.get(ENTITY_TYPES[entity_type][1]) or []:
+                    if not isinstance(item, dict) or not item.get(text_field):
+                        continue
+                    key = entity_key(entity_type, item)
+                    doc_id = self.keys.get(key)
+                    if doc_id is None:
+                        doc_id = len(self.docs) + len(new_docs)
+                        self.keys[key] = doc_id
+                        new_docs.append({
+                            'key': key,
+                            'type': entity_type,
+                            'text': item[text_field],
+                            'url': item.get('url'),
+                            'date': item.get('date')
+                        })
+                    elif doc_id < len(self.docs):
+                        seen[doc_id] = None  # Conocido: se extiende su rango (una vez por snapshot)
+            
+            entry = {'seq': self.seq + 1, 'ts': ts, 'docs': new_docs, 'seen': list(seen)}
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+                self._journal_offset = f.tell()
+            self._apply(entry)
+            
+            self._journal_lines += 1
+            if self._journal_lines >= self.compact_every:
+                self._compact()
+        return len(new_docs)
+    
+    def search(self, query, start=None, end=None, types=None, limit=20):
+        """
+        Documentos que contienen todos los términos, ordenados por relevancia
+        
+        Args:
+            query (str): Texto a buscar (sin importar acentos ni mayúsculas)
+            start (str | float): Solo documentos publicados en algún momento desde aquí (opcional)
+            end (str | float): ... y hasta aquí (opcional)
+            types (iterable): Limitar a news, sections y/o links (opcional)
+            limit (int): Máximo de resultados
+        
+        Returns:
+            dict: total de coincidencias y resultados con score y rangos de aparición
+        
+        Raises:
+            ValueError: Si la consulta no tiene términos o el rango no es válido
+        """
+        terms = list(dict.fromkeys(tokenize(query or '')))
+        if not terms:
+            raise ValueError('La consulta no tiene términos buscables')
+        try:
+            low = parse_timestamp(start) if start is not None else float('-inf')
+            high = parse_timestamp(end) if end is not None else float('inf')
+        except ValueError:
+            raise ValueError('from/to deben ser ISO 8601 o epoch')
+        
+        with self._lock:
+            self._refresh()
+            postings = [self.postings.get(term) for term in terms]
+            if not all(postings):
+                return {'total': 0, 'terms': terms, 'results': []}
+            
+            # Intersección empezando por la lista más corta
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates.intersection_update(posting)
+                if not candidates:
+                    break
+            
+            if types:
+                candidates = [doc_id for doc_id in candidates if self.docs[doc_id]['type'] in types]
+            if start is not None or end is not None:
+                candidates = [doc_id for doc_id in candidates if _overlaps(self.docs[doc_id]['ranges'], low, high)]
+            
+            # Todos los candidatos contienen todos los términos (tf = 1), así que el orden
+            # BM25 depende solo de la longitud: se ordena por _rank y se puntúan los primeros
+            top = heapq.nlargest(limit, candidates, key=self._rank.__getitem__)
+            count = len(self.docs)
+            average = self.total_length / count if count else 1
+            weight = sum(math.log(1 + (count - len(p) + 0.5) / (len(p) + 0.5)) for p in postings) * (_K1 + 1)
+            results = []
+            for doc_id in top:
+                doc = self.docs[doc_id]
+                norm = _K1 * (1 - _B + _B * doc['length'] / average)
+                results.append(self._result(doc, weight / (1 + norm)))
+        return {'total': len(candidates), 'terms': terms, 'results': results}
+    
+    def stats(self):
+        """Tamaño del índice"""
+        with self._lock:
+            self._refresh()
+            return {
+                'documents': len(self.docs),
+                'terms': len(self.postings),
+                'snapshots': self.seq,
+                'last_indexed': _isoformat(self.last_ts) if self.last_ts is not None else None
+            }
+    
+    def _result(self, doc, score):
+        ranges = doc['ranges']
+        return {
+            'type': doc['type'],
+            'text': doc['text'],
+            'url': doc['url'],
+            'date': doc['date'],
+            'score': round(score, 4),
+            'first_seen': _isoformat(ranges[0][0]),
+            'last_seen': _isoformat(ranges[-1][1]),
+            'appearances': [{'from': _isoformat(first), 'to': _isoformat(last)} for first, last in ranges]
+        }
+    
+    def _reset(self):
+        self.seq = 0
+        self.last_ts = None
+        self.docs = []
+        self.keys = {}
+        self.postings = {}
+        self.total_length = 0
+        self._rank = []  # Por documento: más corto primero, a igual longitud el más reciente
+        self._journal_lines = 0
+        self._journal_offset = 0
+        self._state_inode = None
+    
+    def _load(self):
+        """Estado compactado + journal completo"""
+        self._reset()
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+                self._state_inode = os.fstat(f.fileno()).st_ino
+        except FileNotFoundError:
+            state = None
+        except ValueError as e:
+            logger.warning("Estado del índice ilegible, se reconstruye desde el journal: %s", e)
+            state = None
+        
+        if state:
+            self.seq = state['seq']
+            self.last_ts = state['last_ts']
+            self.docs = state['docs']
+            self.postings = state['postings']
+            for doc_id, doc in enumerate(self.docs):
+                self.keys[doc['key']] = doc_id
+                self.total_length += doc['length']
+                self._rank.append(_rank(doc))
+        self._read_journal()
+    
+    def _refresh(self):
+        """Adopta lo que otro proceso haya indexado o compactado desde la última lectura"""
+        try:
+            inode = os.stat(self.state_path).st_ino
+        except OSError:
+            inode = None
+        if inode != self._state_inode:
+            self._load()
+            return
+        self._read_journal()
+    
+    def _read_journal(self):
+        try:
+            with open(self.journal_path, 'rb') as f:
+                f.seek(self._journal_offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            return
+        if not chunk:
+            return
+        
+        end = chunk.rfind(b'\n') + 1  # Una línea incompleta se lee en la siguiente pasada
+        for line in chunk[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            self._journal_lines += 1
+            if entry['seq'] > self.seq:
+                self._apply(entry)
+        self._journal_offset += end
+    
+    def _apply(self, entry):
+        """Aplica una línea del journal (determinista: el mismo journal da el mismo índice)"""
+        previous, ts = self.last_ts, entry['ts']
+        for doc in entry['docs']:
+            doc_id = len(self.docs)
+            tokens = tokenize(doc['text']) + _url_tokens(doc['url'])
+            doc.update({'length': len(tokens), 'ranges': [[ts, ts]]})
+            self.docs.append(doc)
+            self.keys[doc['key']] = doc_id
+            self.total_length += len(tokens)
+            self._rank.append(_rank(doc))
+            for token in dict.fromkeys(tokens):
+                self.postings.setdefault(token, []).append(doc_id)
+        
+        for doc_id in entry['seen']:
+            ranges = self.docs[doc_id]['ranges']
+            if ranges[-1][1] == previous:
+                ranges[-1][1] = ts  # Siguió publicado desde el snapshot anterior
+            else:
+                ranges.append([ts, ts])  # Reapareció
+            self._rank[doc_id] = _rank(self.docs[doc_id])
+        
+        self.seq = entry['seq']
+        self.last_ts = ts
+    
+    def _compact(self):
+        """Escribe el estado completo y vacía el journal"""
+        state = {
+            'seq': self.seq,
+            'last_ts': self.last_ts,
+            'docs': self.docs,
+            'postings': self.postings
+        }
+        tmp_path = f'{self.state_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.state_path)
+        self._state_inode = os.stat(self.state_path).st_ino
+        
+        # Las líneas ya compactadas se ignoran por su seq aunque otro proceso las relea
+        with open(self.journal_path, 'w', encoding='utf-8'):
+            pass
+        self._journal_lines = 0
+        self._journal_offset = 0
+        logger.info("Índice compactado: %s documento(s), %s término(s)", len(self.docs), len(self.postings))
+
+
+def _rank(doc):
+    """Clave de orden en un solo float (los epoch caben holgados en 1e10)"""
+    return doc['ranges'][-1][1] - doc['length'] * 1e10
+
+
+def _overlaps(ranges, low, high):
+    """Si algún rango de aparición se cruza con [low, high]"""
+    if ranges[0][0] > high or ranges[-1][1] < low:
+        return False
+    return any(first <= high and last >= low for first, last in ranges)
+
+
+def _isoformat(ts):
+    return datetime.fromtimestamp(ts).isoformat()
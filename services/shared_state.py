@@ -0,0 +1,214 @@
+"""
+Estado compartido entre procesos - Elección de líder y snapshot publicado en memoria mapeada
+"""
+import glob
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from config import Config
+from utils import PrecompressedJSON, get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: un solo proceso, siempre líder
+    fcntl = None
+
+logger = get_logger('SharedSnapshot')
+
+
+class LeaderLock:
+    """
+    Candado de archivo no bloqueante: solo el proceso que lo obtiene ejecuta el scraping
+    
+    El candado lo libera el sistema operativo al terminar el proceso, por lo que
+    otro proceso puede tomar el liderazgo si el líder muere.
+    """
+    
+    def __init__(self, path=None):
+        """
+        Inicializa el candado
+        
+        Args:
+            path (str): Archivo de candado (opcional)
+        """
+        self.path = path or os.path.join(Config.DATA_DIR, Config.SCHEDULER_LOCK_FILENAME)
+        self._file = None
+        self._owner_pid = None
+    
+    @property
+    def is_leader(self):
+        """True solo en el proceso que obtuvo el candado (no en sus hijos tras fork)"""
+        return self._owner_pid == os.getpid()
+    
+    def acquire(self):
+        """
+        Intenta obtener el liderazgo sin bloquear
+        
+        Returns:
+            bool: True si este proceso es el líder
+        """
+        if self.is_leader:
+            return True
+        if fcntl is None:
+            self._owner_pid = os.getpid()
+            return True
+        
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        lock_file = open(self.path, 'a+b')
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()).encode('ascii'))
+        lock_file.flush()
+        self._file = lock_file
+        self._owner_pid = os.getpid()
+        return True
+    
+    def release(self):
+        """Libera el liderazgo"""
+        if self._file is not None and self.is_leader:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+        self._file = None
+        self._owner_pid = None
+
+
+class SharedSnapshot:
+    """
+    Última respuesta publicada, visible para todos los procesos
+    
+    Estructura:
+        current                      - contador de versión (uint64) mapeado en memoria
+        snapshot-000000000042.bin    - PrecompressedJSON.to_bytes() de la versión 42
+    
+    El escritor crea el archivo de datos completo antes de incrementar el
+    contador, así que un lector nunca ve una versión a medio escribir. Los
+    lectores mapean el archivo de datos y sirven las variantes sin copiarlas.
+    """
+    
+    VERSION = struct.Struct('<Q')
+    HEADER_FILENAME = 'current'
+    LOCK_FILENAME = 'publish.lock'
+    KEEP_VERSIONS = 3
+    
+    def __init__(self, directory=None):
+        """
+        Inicializa el snapshot compartido
+        
+        Args:
+            directory (str): Directorio compartido (opcional)
+        """
+        self.directory = directory or os.path.join(Config.DATA_DIR, Config.SHARED_CACHE_DIR)
+        self.header_path = os.path.join(self.directory, self.HEADER_FILENAME)
+        self.lock_path = os.path.join(self.directory, self.LOCK_FILENAME)
+        self._rlock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_file = None
+        self._version = 0
+        self._prepared = None
+        
+        os.makedirs(self.directory, exist_ok=True)
+        with self.write_lock():
+            with open(self.header_path, 'a+b') as f:
+                if os.fstat(f.fileno()).st_size < self.VERSION.size:
+                    f.truncate(self.VERSION.size)
+        with open(self.header_path, 'r+b') as f:
+            self._header = mmap.mmap(f.fileno(), self.VERSION.size)
+    
+    @property
+    def version(self):
+        """Versión publicada más reciente (leída del archivo compartido)"""
+        return self.VERSION.unpack_from(self._header)[0]
+    
+    @contextmanager
+    def write_lock(self):
+        """Exclusión entre procesos (y reentrante dentro del mismo hilo) para publicar"""
+        with self._rlock:
+            if self._lock_depth == 0 and fcntl is not None:
+                self._lock_file = open(self.lock_path, 'a+b')
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_file is not None:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+                    self._lock_file.close()
+                    self._lock_file = None
+    
+    def publish(self, prepared):
+        """
+        Publica una nueva versión para todos los procesos
+        
+        Args:
+            prepared (PrecompressedJSON): Respuesta ya serializada
+        
+        Returns:
+            int: Número de versión publicado
+        """
+        with self.write_lock():
+            version = self.version + 1
+            path = self._data_path(version)
+            tmp_path = f'{path}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(prepared.to_bytes())
+            os.replace(tmp_path, path)
+            
+            self.VERSION.pack_into(self._header, 0, version)
+            self._version = version
+            self._prepared = prepared
+            self._cleanup(version)
+        
+        return version
+    
+    def current(self):
+        """
+        Última versión publicada por cualquier proceso
+        
+        Returns:
+            PrecompressedJSON: Respuesta (variantes sobre el archivo mapeado) o None
+        """
+        version = self.version
+        if version == self._version:
+            return self._prepared
+        
+        with self._rlock:
+            if version == self._version:
+                return self._prepared
+            try:
+                with open(self._data_path(version), 'rb') as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                prepared = PrecompressedJSON.from_buffer(mapped)
+            except (OSError, ValueError) as e:
+                # Versión ya reemplazada o incompleta: se reintenta en la siguiente lectura
+                logger.warning("No se pudo leer la versión %s: %s", version, e)
+                return self._prepared
+            
+            # El mapeo anterior se libera cuando ninguna respuesta en curso lo usa
+            self._version = version
+            self._prepared = prepared
+            return prepared
+    
+    def _data_path(self, version):
+        return os.path.join(self.directory, f'snapshot-{version:012d}.bin')
+    
+    def _cleanup(self, version):
+        """Elimina versiones antiguas (los procesos que aún las mapean no se ven afectados)"""
+        for path in glob.glob(os.path.join(self.directory, 'snapshot-*.bin')):
+            try:
+                old = int(os.path.basename(path)[9:21])
+            except ValueError:
+                continue
+            if old <= version - self.KEEP_VERSIONS:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
@@ -0,0 +1,275 @@
+"""
+Log de snapshots - Historial append-only segmentado con índice binario memory-mapped
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+from datetime import datetime
+from config import Config
+from utils import get_logger
+
+logger = get_logger('SnapshotLog')
+
+
+def parse_timestamp(value):
+    """
+    Convierte un timestamp ISO 8601 o epoch (segundos) a epoch en segundos
+    
+    Args:
+        value (str | float): Timestamp
+    
+    Returns:
+        float: Segundos desde epoch
+    
+    Raises:
+        ValueError: Si el formato no es válido
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value).timestamp()
+
+
+class SnapshotLog:
+    """
+    Historial de snapshots en segmentos JSONL con índice (timestamp → segmento, offset)
+    
+    Cada registro del índice ocupa RECORD_SIZE bytes, por lo que el registro i
+    está en i * RECORD_SIZE y las búsquedas por tiempo son binarias sobre el
+    archivo mapeado en memoria, sin cargarlo.
+    """
+    
+    # timestamp (float64), segmento (uint32), offset (uint64), longitud (uint32)
+    RECORD = struct.Struct('<dIQI')
+    RECORD_SIZE = RECORD.size
+    INDEX_FILENAME = 'snapshots.idx'
+    
+    def __init__(self, directory=None, segment_max_bytes=None):
+        """
+        Inicializa el log
+        
+        Args:
+            directory (str): Directorio del log (opcional)
+            segment_max_bytes (int): Tamaño máximo de un segmento antes de rotar (opcional)
+        """
+        self.directory = directory or os.path.join(Config.DATA_DIR, Config.SNAPSHOT_DIR)
+        self.segment_max_bytes = segment_max_bytes or Config.SNAPSHOT_SEGMENT_MAX_BYTES
+        self.index_path = os.path.join(self.directory, self.INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self._mmap = None
+        self._mapped_size = 0
+        
+        os.makedirs(self.directory, exist_ok=True)
+        self._repair_index()
+    
+    def append(self, data):
+        """
+        Agrega un snapshot al final del log
+        
+        Args:
+            data (dict): Snapshot a guardar
+        
+        Returns:
+            float: Timestamp (epoch) con el que se indexó
+        """
+        line = (json.dumps(data, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+        
+        with self._lock:
+            timestamp = self._timestamp_of(data)
+            last = self._last_record()
+            if last:
+                # El índice debe permanecer ordenado aunque el reloj retroceda
+                timestamp = max(timestamp, last[0])
+            
+            segment = self._segment_for(timestamp, last)
+            segment_path = self._segment_path(segment)
+            
+            with open(segment_path, 'ab') as f:
+                offset = f.tell()
+                f.write(line)
+            
+            with open(self.index_path, 'ab') as f:
+                f.write(self.RECORD.pack(timestamp, segment, offset, len(line)))
+        
+        return timestamp
+    
+    def count(self):
+        """Número de snapshots en el log"""
+        return self._index_size() // self.RECORD_SIZE
+    
+    def get_at(self, timestamp):
+        """
+        Snapshot vigente en un instante (el último con timestamp <= instante)
+        
+        Args:
+            timestamp (str | float): Instante ISO 8601 o epoch
+        
+        Returns:
+            dict: Snapshot o None si no hay ninguno anterior
+        """
+        ts = parse_timestamp(timestamp)
+        with self._lock:
+            position = self._bisect_right(ts) - 1
+            if position < 0:
+                return None
+            return self._read(self._record(position))
+    
+    def history(self, start=None, end=None, limit=None, offset=0):
+        """
+        Snapshots en un rango de tiempo (inclusive), en orden cronológico
+        
+        Args:
+            start (str | float): Inicio del rango (opcional)
+            end (str | float): Fin del rango (opcional)
+            limit (int): Máximo de snapshots a devolver (opcional)
+            offset (int): Snapshots a saltar dentro del rango
+        
+        Returns:
+            dict: total en el rango y lista de snapshots
+        """
+        with self._lock:
+            low = self._bisect_left(parse_timestamp(start)) if start is not None else 0
+            high = self._bisect_right(parse_timestamp(end)) if end is not None else self._count_mapped()
+            total = max(high - low, 0)
+            
+            first = low + offset
+            last = high if limit is None else min(high, first + limit)
+            snapshots = [self._read(self._record(i)) for i in range(first, last)]
+        
+        return {
+            'total': total,
+            'snapshots': snapshots
+        }
+    
+    def close(self):
+        """Libera el mapeo del índice"""
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+                self._mapped_size = 0
+    
+    def _index_size(self):
+        try:
+            return os.path.getsize(self.index_path)
+        except OSError:
+            return 0
+    
+    def _remap(self):
+        """Vuelve a mapear el índice si creció desde el último acceso"""
+        size = self._index_size()
+        size -= size % self.RECORD_SIZE
+        if size == self._mapped_size and self._mmap is not None:
+            return
+        
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._mapped_size = 0
+        
+        if size == 0:
+            return
+        
+        with open(self.index_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+        self._mapped_size = size
+    
+    def _count_mapped(self):
+        self._remap()
+        return self._mapped_size // self.RECORD_SIZE
+    
+    def _record(self, position):
+        return self.RECORD.unpack_from(self._mmap, position * self.RECORD_SIZE)
+    
+    def _last_record(self):
+        count = self._count_mapped()
+        return self._record(count - 1) if count else None
+    
+    def _bisect_left(self, ts):
+        """Primera posición con timestamp >= ts"""
+        low, high = 0, self._count_mapped()
+        while low < high:
+            mid = (low + high) // 2
+            if self._record(mid)[0] < ts:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+    
+    def _bisect_right(self, ts):
+        """Primera posición con timestamp > ts"""
+        low, high = 0, self._count_mapped()
+        while low < high:
+            mid = (low + high) // 2
+            if self._record(mid)[0] <= ts:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+    
+    def _repair_index(self):
+        """Descarta registros finales incompletos o inválidos (escritura interrumpida)"""
+        size = self._index_size()
+        valid = size - size % self.RECORD_SIZE
+        
+        while valid:
+            with open(self.index_path, 'rb') as f:
+                f.seek(max(valid - 2 * self.RECORD_SIZE, 0))
+                tail = f.read(min(valid, 2 * self.RECORD_SIZE))
+            records = [
+                self.RECORD.unpack_from(tail, i)
+                for i in range(0, len(tail), self.RECORD_SIZE)
+            ]
+            timestamp, segment, offset, length = records[-1]
+            try:
+                segment_size = os.path.getsize(self._segment_path(segment))
+            except OSError:
+                segment_size = 0
+            
+            in_order = len(records) == 1 or records[0][0] <= timestamp
+            if length > 0 and offset + length <= segment_size and in_order:
+                break
+            valid -= self.RECORD_SIZE
+        
+        if valid != size:
+            logger.warning("Índice reparado: %s byte(s) descartado(s)", size - valid)
+            with open(self.index_path, 'r+b') as f:
+                f.truncate(valid)
+    
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, f'segment-{segment:06d}.jsonl')
+    
+    def _segment_for(self, timestamp, last):
+        """Segmento actual, o uno nuevo si cambió el día o se superó el tamaño máximo"""
+        if last is None:
+            return 0
+        
+        last_ts, segment, _, _ = last
+        same_day = datetime.fromtimestamp(last_ts).date() == datetime.fromtimestamp(timestamp).date()
+        try:
+            has_room = os.path.getsize(self._segment_path(segment)) < self.segment_max_bytes
+        except OSError:
+            has_room = False
+        return segment if same_day and has_room else segment + 1
+    
+    def _read(self, record):
+        _, segment, offset, length = record
+        with open(self._segment_path(segment), 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+    
+    def _timestamp_of(self, data):
+        try:
+            return parse_timestamp(data['timestamp'])
+        except (KeyError, TypeError, ValueError):
+            return datetime.now().timestamp()
@@ -4,8 +4,14 @@ Servicio de Almacenamiento - Microservicio para persistencia de datos
 import json
 import csv
 import os
-from datetime import datetime
 from config import Config
+from utils import phase, get_logger
+from .snapshot_log import SnapshotLog
+from .entity_store import EntityStore
+from .indicator_store import IndicatorStore
+from .search_index import SearchIndex
+
+logger = get_logger('StorageService')
 
 
 class StorageService:
@@ -14,7 +20,12 @@ class StorageService:
     def __init__(self):
         self.data_dir = Config.DATA_DIR
         Config.init_app()  # Asegurar que el directorio existe
+        self.snapshot_log = SnapshotLog(os.path.join(self.data_dir, Config.SNAPSHOT_DIR))
+        self.entity_store = EntityStore(os.path.join(self.data_dir, Config.ENTITY_DB))
+        self.indicator_store = IndicatorStore(os.path.join(self.data_dir, Config.INDICATOR_DIR))
+        self.search_index = SearchIndex(os.path.join(self.data_dir, Config.SEARCH_DIR))
     
+    @phase('save_json')
     def save_json(self, data, filename=None):
         """
         Guarda datos en formato JSON
@@ -22,7 +33,7 @@ class StorageService:
         Args:
             data (dict): Datos a guardar
             filename (str): Nombre del archivo (opcional)
-            
+        
         Returns:
             bool: True si se guardó exitosamente
         """
@@ -35,13 +46,14 @@ class StorageService:
             with open(filepath, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
             
-            print(f"[{datetime.now()}] [StorageService] JSON guardado: {filepath}")
+            logger.debug("JSON guardado: %s", filepath)
             return True
-            
+        
         except Exception as e:
-            print(f"[{datetime.now()}] [StorageService] Error guardando JSON: {e}")
+            logger.error("Error guardando JSON: %s", e)
             return False
     
+    @phase('save_csv')
     def save_csv(self, data, filename=None):
         """
         Guarda datos en formato CSV
@@ -49,7 +61,7 @@ class StorageService:
         Args:
             data (dict): Datos a guardar
             filename (str): Nombre del archivo (opcional)
-            
+        
         Returns:
             bool: True si se guardó exitosamente
         """
@@ -101,11 +113,11 @@ class StorageService:
                 for link in data.get('important_links', []):
                     writer.writerow([link.get('text', ''), link.get('url', '')])
             
-            print(f"[{datetime.now()}] [StorageService] CSV guardado: {filepath}")
+            logger.debug("CSV guardado: %s", filepath)
             return True
-            
+        
         except Exception as e:
-            print(f"[{datetime.now()}] [StorageService] Error guardando CSV: {e}")
+            logger.error("Error guardando CSV: %s", e)
             return False
     
     def load_json(self, filename=None):
@@ -114,7 +126,7 @@ class StorageService:
         
         Args:
             filename (str): Nombre del archivo (opcional)
-            
+        
         Returns:
             dict: Datos cargados o None si hay error
         """
@@ -127,23 +139,206 @@ class StorageService:
             if os.path.exists(filepath):
                 with open(filepath, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                print(f"[{datetime.now()}] [StorageService] JSON cargado: {filepath}")
+                logger.debug("JSON cargado: %s", filepath)
                 return data
             else:
-                print(f"[{datetime.now()}] [StorageService] Archivo no encontrado: {filepath}")
+                logger.debug("Archivo no encontrado: %s", filepath)
                 return None
-                
+        
         except Exception as e:
-            print(f"[{datetime.now()}] [StorageService] Error cargando JSON: {e}")
+            logger.error("Error cargando JSON: %s", e)
             return None
     
+    @phase('append_snapshot')
+    def append_snapshot(self, data):
+        """
+        Agrega un snapshot al historial append-only
+        
+        Args:
+            data (dict): Datos a guardar
+        
+        Returns:
+            bool: True si se guardó exitosamente
+        """
+        try:
+            self.snapshot_log.append(data)
+            logger.debug("Snapshot agregado al historial (%s en total)", self.snapshot_log.count())
+            return True
+        
+        except Exception as e:
+            logger.error("Error agregando snapshot: %s", e)
+            return False
+    
+    def get_snapshot_at(self, timestamp):
+        """
+        Obtiene el snapshot vigente en un instante
+        
+        Args:
+            timestamp (str): Instante ISO 8601 o epoch en segundos
+        
+        Returns:
+            dict: Snapshot o None si no existe uno anterior
+        """
+        return self.snapshot_log.get_at(timestamp)
+    
+    def get_snapshot_history(self, start=None, end=None, limit=None, offset=0):
+        """
+        Obtiene los snapshots de un rango de tiempo
+        
+        Args:
+            start (str): Inicio del rango (opcional)
+            end (str): Fin del rango (opcional)
+            limit (int): Máximo de snapshots (opcional)
+            offset (int): Snapshots a saltar
+        
+        Returns:
+            dict: Total en el rango y lista de snapshots
+        """
+        return self.snapshot_log.history(start, end, limit, offset)
+    
+    @phase('save_entities')
+    def save_entities(self, data):
+        """
+        Registra las entidades de un snapshot (una sola transacción)
+        
+        Args:
+            data (dict): Datos extraídos
+        
+        Returns:
+            bool: True si se guardó exitosamente
+        """
+        try:
+            counts = self.entity_store.upsert_snapshot(data)
+            logger.info("Entidades actualizadas: %s", counts)
+            return True
+        
+        except Exception as e:
+            logger.error("Error guardando entidades: %s", e)
+            return False
+    
+    def touch_entities(self, data):
+        """
+        Extiende last_seen de las entidades de un snapshot sin cambios
+        
+        Args:
+            data (dict): Datos extraídos
+        
+        Returns:
+            bool: True si se guardó exitosamente
+        """
+        try:
+            updated = self.entity_store.touch_snapshot(data)
+            logger.debug("last_seen extendido: %s entidades", updated)
+            return True
+        
+        except Exception as e:
+            logger.error("Error extendiendo entidades: %s", e)
+            return False
+    
+    def query_entities(self, entity_type, since=None, until=None, active_since=None, limit=100, offset=0):
+        """
+        Consulta entidades deduplicadas por ventana de aparición
+        
+        Args:
+            entity_type (str): news, links, sections o indicators
+            since (str): first_seen mínimo (opcional)
+            until (str): first_seen máximo (opcional)
+            active_since (str): last_seen mínimo (opcional)
+            limit (int): Máximo de resultados
+            offset (int): Resultados a saltar
+        
+        Returns:
+            list: Entidades encontradas
+        """
+        return self.entity_store.query(entity_type, since, until, active_since, limit, offset)
+    
+    @phase('save_indicators')
+    def save_indicators(self, data):
+        """
+        Agrega a las series una muestra por indicador numérico del snapshot
+        
+        Args:
+            data (dict): Datos extraídos
+        
+        Returns:
+            bool: True si se guardó exitosamente
+        """
+        try:
+            added = self.indicator_store.append_snapshot(data)
+            logger.debug("Muestras de indicadores agregadas: %s", added)
+            return True
+        
+        except Exception as e:
+            logger.error("Error guardando indicadores: %s", e)
+            return False
+    
+    def list_indicators(self):
+        """
+        Indicadores con serie registrada
+        
+        Returns:
+            list: Indicadores con su último valor
+        """
+        return self.indicator_store.list()
+    
+    def query_indicator_series(self, indicator_id, start=None, end=None, bucket='auto'):
+        """
+        Serie de un indicador, cruda o agregada por bucket
+        
+        Args:
+            indicator_id (str): ID del indicador
+            start (str): Inicio del rango (opcional)
+            end (str): Fin del rango (opcional)
+            bucket (str): 'auto', 'raw' o un nombre de Config.INDICATOR_BUCKETS
+        
+        Returns:
+            dict: Serie con resumen y puntos, o None si el indicador no existe
+        """
+        return self.indicator_store.series(indicator_id, start, end, bucket)
+    
+    @phase('index_search')
+    def index_search(self, data):
+        """
+        Actualiza el índice de búsqueda con un snapshot
+        
+        Args:
+            data (dict): Datos extraídos
+        
+        Returns:
+            bool: True si se indexó exitosamente
+        """
+        try:
+            added = self.search_index.index_snapshot(data)
+            logger.debug("Documentos nuevos en el índice de búsqueda: %s", added)
+            return True
+        
+        except Exception as e:
+            logger.error("Error actualizando índice de búsqueda: %s", e)
+            return False
+    
+    def search(self, query, start=None, end=None, types=None, limit=20):
+        """
+        Búsqueda de texto en noticias, secciones y links
+        
+        Args:
+            query (str): Texto a buscar
+            start (str): Publicados en algún momento desde aquí (opcional)
+            end (str): ... y hasta aquí (opcional)
+            types (list): Limitar a news, sections y/o links (opcional)
+            limit (int): Máximo de resultados
+        
+        Returns:
+            dict: Total de coincidencias y resultados ordenados por relevancia
+        """
+        return self.search_index.search(query, start, end, types, limit)
+    
     def file_exists(self, filename):
         """
         Verifica si un archivo existe
         
         Args:
             filename (str): Nombre del archivo
-            
+        
         Returns:
             bool: True si existe
         """
@@ -156,7 +351,7 @@ class StorageService:
         
         Args:
             filename (str): Nombre del archivo
-            
+        
         Returns:
             str: Ruta completa del archivo
         """
@@ -174,5 +369,5 @@ class StorageService:
                 return os.listdir(self.data_dir)
             return []
         except Exception as e:
-            print(f"[{datetime.now()}] [StorageService] Error listando archivos: {e}")
+            logger.error("Error listando archivos: %s", e)
             return []
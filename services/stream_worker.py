@@ -0,0 +1,37 @@
+"""
+Worker de gunicorn - gthread que entrega /api/stream al StreamServer del proceso
+"""
+import os
+import socket
+from urllib.parse import parse_qs
+from gunicorn.workers.gthread import ThreadWorker
+from .event_stream import StreamServer, parse_last_event_id
+
+
+class StreamThreadWorker(ThreadWorker):
+    """
+    Worker gthread que atiende /api/stream en el puerto principal sin un hilo por cliente
+    
+    Las peticiones normales pasan por Flask como en gthread. Un GET /api/stream
+    se entrega, ya leído, al StreamServer registrado en
+    app.extensions['stream_server'] (un loop asyncio por worker): el hilo
+    queda libre de inmediato y la conexión cuesta solo un socket.
+    
+    Uso: gunicorn app:app --worker-class services.stream_worker.StreamThreadWorker
+    """
+    
+    def handle_request(self, req, conn):
+        stream_server = getattr(self.wsgi, 'extensions', {}).get('stream_server')
+        if stream_server is None or req.method != 'GET' or req.path != StreamServer.PATH:
+            return super().handle_request(req, conn)
+        
+        headers = {name.lower(): value for name, value in req.headers}
+        last_id = parse_last_event_id(
+            headers.get('last-event-id') or (parse_qs(req.query).get('last_event_id') or [None])[0]
+        )
+        
+        # gunicorn cierra su descriptor al terminar; la conexión sigue viva en el duplicado
+        sock = socket.socket(fileno=os.dup(conn.sock.fileno()))
+        sock.setblocking(False)
+        stream_server.adopt(sock, last_id)
+        return False
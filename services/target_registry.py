@@ -0,0 +1,231 @@
+"""
+Registro de objetivos - Páginas del INEGI a vigilar con intervalo y prioridad propios
+"""
+import json
+import os
+import re
+import threading
+from config import Config
+from utils import get_logger
+
+logger = get_logger('TargetRegistry')
+
+_TARGET_ID = re.compile(r'^[a-z0-9][a-z0-9_-]{0,63}$')
+
+
+def validate_target(fields, partial=False):
+    """
+    Valida y normaliza la definición de un objetivo
+    
+    Args:
+        fields (dict): id, url, name, interval_minutes, priority, enabled
+        partial (bool): Permitir campos faltantes (actualización)
+    
+    Returns:
+        dict: Campos normalizados
+    
+    Raises:
+        ValueError: Si algún campo no es válido
+    """
+    if not isinstance(fields, dict):
+        raise ValueError('El objetivo debe ser un objeto JSON')
+    
+    target = {}
+    if 'id' in fields or not partial:
+        target_id = str(fields.get('id', '')).strip().lower()
+        if not _TARGET_ID.match(target_id):
+            raise ValueError('id debe tener 1-64 caracteres: minúsculas, dígitos, - o _')
+        target['id'] = target_id
+    
+    if 'url' in fields or not partial:
+        url = str(fields.get('url', '')).strip()
+        if not url.startswith(('http://', 'https://')):
+            raise ValueError('url debe ser una URL absoluta http(s)')
+        target['url'] = url
+    
+    if 'name' in fields or not partial:
+        target['name'] = str(fields.get('name') or target.get('id') or '').strip()
+    
+    if 'interval_minutes' in fields or not partial:
+        interval = fields.get('interval_minutes', Config.TARGET_DEFAULT_INTERVAL_MINUTES)
+        if isinstance(interval, bool) or not isinstance(interval, (int, float)) or interval <= 0:
+            raise ValueError('interval_minutes debe ser un número positivo')
+        target['interval_minutes'] = interval
+    
+    if 'priority' in fields or not partial:
+        priority = fields.get('priority', Config.TARGET_DEFAULT_PRIORITY)
+        if isinstance(priority, bool) or not isinstance(priority, int):
+            raise ValueError('priority debe ser un entero (menor = más urgente)')
+        target['priority'] = priority
+    
+    if 'enabled' in fields or not partial:
+        target['enabled'] = bool(fields.get('enabled', True))
+    
+    return target
+
+
+class TargetRegistry:
+    """
+    Objetivos persistidos en data/<TARGETS_JSON>
+    
+    La primera vez se siembra desde Config.TARGETS_FILE (si existe). Los cambios
+    hechos por la API se guardan en el archivo de datos, y otros procesos los
+    detectan por la fecha de modificación (reload_if_changed).
+    """
+    
+    def __init__(self, path=None, seed_path=None):
+        """
+        Inicializa el registro
+        
+        Args:
+            path (str): Archivo JSON del registro (opcional)
+            seed_path (str): Archivo de configuración inicial (opcional)
+        """
+        self.path = path or os.path.join(Config.DATA_DIR, Config.TARGETS_JSON)
+        self.seed_path = seed_path or Config.TARGETS_FILE
+        self.targets = {}
+        self.version = 0  # Aumenta con cada cambio (local o de otro proceso)
+        self._mtime = None
+        self._lock = threading.RLock()
+        self._load()
+    
+    def list(self):
+        """
+        Objetivos registrados
+        
+        Returns:
+            list: Objetivos ordenados por prioridad e id
+        """
+        with self._lock:
+            targets = [dict(target) for target in self.targets.values()]
+        return sorted(targets, key=lambda target: (target['priority'], target['id']))
+    
+    def get(self, target_id):
+        """
+        Obtiene un objetivo
+        
+        Args:
+            target_id (str): ID del objetivo
+        
+        Returns:
+            dict: Objetivo o None si no existe
+        """
+        with self._lock:
+            target = self.targets.get(target_id)
+            return dict(target) if target else None
+    
+    def add(self, fields):
+        """
+        Registra un objetivo nuevo
+        
+        Args:
+            fields (dict): Definición del objetivo
+        
+        Returns:
+            dict: Objetivo registrado
+        
+        Raises:
+            ValueError: Si la definición no es válida o el id ya existe
+        """
+        target = validate_target(fields)
+        with self._lock:
+            self.reload_if_changed()
+            if target['id'] in self.targets:
+                raise ValueError(f"Ya existe un objetivo con id {target['id']}")
+            self.targets[target['id']] = target
+            self._save()
+        return dict(target)
+    
+    def update(self, target_id, fields):
+        """
+        Modifica un objetivo existente
+        
+        Args:
+            target_id (str): ID del objetivo
+            fields (dict): Campos a cambiar (el id no se puede cambiar)
+        
+        Returns:
+            dict: Objetivo actualizado o None si no existe
+        
+        Raises:
+            ValueError: Si algún campo no es válido
+        """
+        changes = validate_target({k: v for k, v in fields.items() if k != 'id'}, partial=True)
+        with self._lock:
+            self.reload_if_changed()
+            if target_id not in self.targets:
+                return None
+            self.targets[target_id].update(changes)
+            self._save()
+            return dict(self.targets[target_id])
+    
+    def remove(self, target_id):
+        """
+        Elimina un objetivo
+        
+        Args:
+            target_id (str): ID del objetivo
+        
+        Returns:
+            bool: True si existía
+        """
+        with self._lock:
+            self.reload_if_changed()
+            if self.targets.pop(target_id, None) is None:
+                return False
+            self._save()
+            return True
+    
+    def reload_if_changed(self):
+        """
+        Recarga el registro si otro proceso lo modificó
+        
+        Returns:
+            bool: True si se recargó
+        """
+        with self._lock:
+            if self._file_mtime() == self._mtime:
+                return False
+            self._load()
+            return True
+    
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+    
+    def _load(self):
+        """Carga el registro (o lo siembra desde el archivo de configuración)"""
+        source = self.path if os.path.exists(self.path) else self.seed_path
+        targets = {}
+        
+        if source and os.path.exists(source):
+            try:
+                with open(source, 'r', encoding='utf-8') as f:
+                    raw = json.load(f)
+                for fields in raw.get('targets', []) if isinstance(raw, dict) else raw:
+                    try:
+                        target = validate_target(fields)
+                        targets[target['id']] = target
+                    except ValueError as e:
+                        logger.warning("Objetivo ignorado (%s): %s", fields, e)
+            except Exception as e:
+                logger.error("Error cargando %s: %s", source, e)
+        
+        self.targets = targets
+        self.version += 1
+        self._mtime = self._file_mtime()
+    
+    def _save(self):
+        """Guarda el registro de forma atómica"""
+        try:
+            Config.init_app()
+            tmp_path = f'{self.path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'targets': list(self.targets.values())}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            self.version += 1
+            self._mtime = self._file_mtime()
+        except Exception as e:
+            logger.error("Error guardando registro: %s", e)
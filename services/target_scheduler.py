@@ -0,0 +1,309 @@
+"""
+Programador de objetivos - Cola de prioridad con límite global de concurrencia
+"""
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from config import Config
+from utils import data_fingerprint, METRICS, get_logger, run_context
+
+logger = get_logger('TargetScheduler')
+TARGET_RUNS = METRICS.counter(
+    'inegi_target_runs_total',
+    'Ejecuciones por objetivo y resultado',
+    ('target', 'result')
+)
+
+
+class TargetScheduler:
+    """
+    Ejecuta los objetivos del registro con un solo hilo despachador y un pool acotado
+    
+    - Los objetivos vencidos pasan a una cola de listos ordenada por prioridad
+      (menor = más urgente), así un objetivo lento no retrasa a los urgentes.
+    - Nunca hay más de max_workers descargas simultáneas en total.
+    - Un objetivo no se ejecuta dos veces a la vez: la siguiente ejecución se
+      programa cuando termina la actual.
+    """
+    
+    def __init__(self, scraper_service, registry, max_workers=None, state_dir=None):
+        """
+        Inicializa el programador
+        
+        Args:
+            scraper_service: Servicio de scraping (scrape_page)
+            registry: TargetRegistry con los objetivos
+            max_workers (int): Descargas simultáneas permitidas (opcional)
+            state_dir (str): Directorio del estado y snapshot por objetivo (opcional)
+        """
+        self.scraper_service = scraper_service
+        self.registry = registry
+        self.max_workers = max_workers or Config.TARGET_WORKERS
+        self.state_dir = state_dir or os.path.join(Config.DATA_DIR, Config.TARGETS_DIR)
+        self.executor = None
+        self.states = {}
+        self.is_running = False
+        
+        self._targets = {}
+        self._timers = []  # (próxima ejecución, secuencia, id)
+        self._ready = []  # (prioridad, vencimiento, secuencia, id)
+        self._next_run = {}  # id → próxima ejecución vigente (descarta entradas obsoletas del heap)
+        self._queued = set()
+        self._running = set()
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._last_registry_check = 0.0
+        self._registry_version = None
+        
+        os.makedirs(self.state_dir, exist_ok=True)
+    
+    def start(self):
+        """Inicia el hilo despachador"""
+        if self.is_running:
+            return
+        
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='target')
+        self.is_running = True
+        with self._cond:
+            self._sync_targets(initial=True)
+        self._thread = threading.Thread(target=self._dispatch_loop, name='target-dispatcher', daemon=True)
+        self._thread.start()
+        logger.info("Iniciado - %s objetivo(s), %s descarga(s) simultánea(s)", len(self._targets), self.max_workers)
+    
+    def stop(self):
+        """Detiene el despachador (las descargas en curso terminan por su cuenta)"""
+        if not self.is_running:
+            return
+        
+        with self._cond:
+            self.is_running = False
+            self._cond.notify_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("Detenido")
+    
+    def run_now(self, target_id):
+        """
+        Adelanta la ejecución de un objetivo
+        
+        Args:
+            target_id (str): ID del objetivo
+        
+        Returns:
+            bool: True si se encoló; False si no existe, está deshabilitado o ya está en curso
+        """
+        with self._cond:
+            if not self.is_running:
+                return False
+            self._sync_targets()
+            target = self._targets.get(target_id)
+            if not target or not target['enabled'] or target_id in self._queued or target_id in self._running:
+                return False
+            
+            self._next_run.pop(target_id, None)
+            self._enqueue(target, time.time())
+            self._cond.notify()
+        return True
+    
+    def get_state(self, target_id):
+        """
+        Estado y último snapshot de un objetivo
+        
+        Args:
+            target_id (str): ID del objetivo
+        
+        Returns:
+            dict: Estado (de memoria si este proceso ejecuta los objetivos, si no de disco)
+        """
+        with self._cond:
+            state = self.states.get(target_id)
+            if state is not None:
+                state = dict(state)
+                state['next_run'] = self._next_run_iso(target_id)
+                return state
+        return self._load_state(target_id)
+    
+    def get_status(self):
+        """
+        Resumen del programador
+        
+        Returns:
+            dict: Objetivos, ejecuciones en curso y en cola
+        """
+        with self._cond:
+            return {
+                'is_running': self.is_running,
+                'targets': len(self._targets) if self.is_running else len(self.registry.list()),
+                'max_workers': self.max_workers,
+                'running': sorted(self._running),
+                'queued': len(self._ready)
+            }
+    
+    def _dispatch_loop(self):
+        """Mueve objetivos vencidos a la cola de listos y los despacha según capacidad"""
+        while True:
+            with self._cond:
+                if not self.is_running:
+                    return
+                
+                now = time.time()
+                if now - self._last_registry_check >= Config.TARGET_REGISTRY_CHECK_SECONDS:
+                    self._last_registry_check = now
+                    self._sync_targets()
+                
+                # Objetivos vencidos → cola de listos por prioridad
+                while self._timers and self._timers[0][0] <= now:
+                    due, _, target_id = heapq.heappop(self._timers)
+                    if self._next_run.get(target_id) != due:
+                        continue  # Entrada reemplazada (objetivo eliminado o reprogramado)
+                    del self._next_run[target_id]
+                    target = self._targets.get(target_id)
+                    if target and target['enabled']:
+                        self._enqueue(target, due)
+                
+                # Despachar mientras haya capacidad
+                while self._ready and len(self._running) < self.max_workers:
+                    _, _, _, target_id = heapq.heappop(self._ready)
+                    self._queued.discard(target_id)
+                    target = self._targets.get(target_id)
+                    if not target:
+                        continue
+                    self._running.add(target_id)
+                    self.executor.submit(self._run_target, target)
+                
+                timeout = Config.TARGET_REGISTRY_CHECK_SECONDS
+                if self._timers:
+                    timeout = min(timeout, max(self._timers[0][0] - now, 0.0))
+                self._cond.wait(timeout)
+    
+    def _run_target(self, target):
+        """Descarga y extrae un objetivo (en un hilo del pool)"""
+        target_id = target['id']
+        started = time.time()
+        self._update_state(target_id, status='running', last_started=datetime.fromtimestamp(started).isoformat())
+        
+        try:
+            with run_context():
+                data = self.scraper_service.scrape_page(target['url'])
+        except Exception as e:
+            data = {'status': 'error', 'error': str(e), 'url': target['url']}
+        
+        success = data.get('status') == 'success'
+        with self._cond:
+            state = self.states.setdefault(target_id, self._new_state(target))
+            fingerprint = data_fingerprint(data) if success else state.get('fingerprint')
+            changed = success and fingerprint != state.get('fingerprint')
+            state.update({
+                'status': 'idle',
+                'last_run': datetime.now().isoformat(),
+                'last_duration_seconds': round(time.time() - started, 3),
+                'last_result': 'success' if success else 'error',
+                'last_error': None if success else data.get('error'),
+                'runs': state['runs'] + 1,
+                'errors': state['errors'] + (0 if success else 1),
+                'changes': state['changes'] + (1 if changed else 0),
+                'fingerprint': fingerprint
+            })
+            if success:
+                state['data'] = data
+                if changed:
+                    state['last_change'] = state['last_run']
+            snapshot = dict(state)
+            
+            # Siguiente ejecución al terminar: nunca se superponen
+            self._running.discard(target_id)
+            current = self._targets.get(target_id)
+            if current and self.is_running:
+                self._schedule(current, time.time() + current['interval_minutes'] * 60)
+            self._cond.notify()
+        
+        self._save_state(target_id, snapshot)
+        TARGET_RUNS.inc(target=target_id, result=snapshot['last_result'])
+        logger.info("%s: %s%s en %ss", target_id, snapshot['last_result'], ' (cambió)' if changed else '', snapshot['last_duration_seconds'])
+    
+    def _sync_targets(self, initial=False):
+        """Aplica altas, bajas y cambios del registro (con el lock tomado)"""
+        self.registry.reload_if_changed()
+        if not initial and self.registry.version == self._registry_version:
+            return
+        self._registry_version = self.registry.version
+        
+        targets = {target['id']: target for target in self.registry.list()}
+        now = time.time()
+        
+        for target_id in set(self._targets) - set(targets):
+            self._next_run.pop(target_id, None)
+            self.states.pop(target_id, None)
+        
+        for target_id, target in targets.items():
+            previous = self._targets.get(target_id)
+            self.states.setdefault(target_id, self._load_state(target_id) or self._new_state(target))
+            self.states[target_id]['target'] = target
+            if target_id in self._running or target_id in self._queued:
+                continue
+            if previous is None or previous['interval_minutes'] != target['interval_minutes'] or not previous['enabled']:
+                # Repartir el primer arranque para no lanzar cientos de descargas a la vez
+                spread = min(target['interval_minutes'] * 60, Config.TARGET_START_SPREAD_SECONDS)
+                self._schedule(target, now + random.uniform(0, spread))
+        
+        self._targets = targets
+    
+    def _schedule(self, target, when):
+        self._next_run[target['id']] = when
+        heapq.heappush(self._timers, (when, next(self._seq), target['id']))
+    
+    def _enqueue(self, target, due):
+        self._queued.add(target['id'])
+        heapq.heappush(self._ready, (target['priority'], due, next(self._seq), target['id']))
+    
+    def _update_state(self, target_id, **fields):
+        with self._cond:
+            state = self.states.get(target_id)
+            if state is not None:
+                state.update(fields)
+    
+    def _new_state(self, target):
+        return {
+            'target': target,
+            'status': 'idle',
+            'runs': 0,
+            'errors': 0,
+            'changes': 0,
+            'last_run': None,
+            'last_change': None,
+            'last_result': None,
+            'last_error': None,
+            'last_duration_seconds': None,
+            'fingerprint': None,
+            'data': None
+        }
+    
+    def _next_run_iso(self, target_id):
+        when = self._next_run.get(target_id)
+        return datetime.fromtimestamp(when).isoformat() if when else None
+    
+    def _state_path(self, target_id):
+        return os.path.join(self.state_dir, f'{target_id}.json')
+    
+    def _save_state(self, target_id, state):
+        try:
+            path = self._state_path(target_id)
+            tmp_path = f'{path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error("Error guardando estado de %s: %s", target_id, e)
+    
+    def _load_state(self, target_id):
+        try:
+            with open(self._state_path(target_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
@@ -0,0 +1,44 @@
+"""
+Configuración común de las pruebas (sin red: fixture incluido y servidor de reproducción)
+"""
+import pytest
+from config import Config
+from benchmarks.fixtures import load_fixture
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """Cada prueba escribe en su propio DATA_DIR"""
+    monkeypatch.setattr(Config, 'DATA_DIR', str(tmp_path))
+    return str(tmp_path)
+
+
+@pytest.fixture(scope='session')
+def home_html():
+    """Página principal incluida en benchmarks/fixtures"""
+    return load_fixture()
+
+
+@pytest.fixture
+def scheduler(data_dir):
+    """SchedulerService de un solo proceso, sin scheduler en marcha ni red"""
+    from services import DiffService, SchedulerService, StorageService
+    return SchedulerService(None, StorageService(), diff_service=DiffService())
+
+
+@pytest.fixture
+def job_service(scheduler):
+    from services import JobService
+    jobs = JobService(scheduler)
+    yield jobs
+    jobs.shutdown(wait=True)
+
+
+@pytest.fixture
+def client(scheduler, job_service):
+    """Cliente de prueba de la API sobre servicios sin red"""
+    from flask import Flask
+    from api import create_routes
+    app = Flask(__name__)
+    create_routes(app, None, scheduler.storage_service, scheduler, job_service)
+    return app.test_client()
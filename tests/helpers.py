@@ -0,0 +1,43 @@
+"""
+Datos de prueba compartidos
+"""
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+def recorded_response(body, headers=None, status=200):
+    """Respuesta HTTP ya descargada, para grabarla en un Cassette sin red"""
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers = CaseInsensitiveDict(headers or {'Content-Type': 'text/html; charset=utf-8'})
+    return response
+
+
+def make_snapshot(timestamp, status='success', news=('Censo de Población y Vivienda',), title='INEGI'):
+    """Resultado de scraping mínimo (o de error, con status='error')"""
+    if status != 'success':
+        return {
+            'timestamp': timestamp,
+            'url': 'https://www.inegi.org.mx',
+            'status': status,
+            'error': 'sitio no disponible',
+            'main_sections': [],
+            'latest_news': [],
+            'featured_indicators': [],
+            'important_links': []
+        }
+    return {
+        'timestamp': timestamp,
+        'url': 'https://www.inegi.org.mx',
+        'title': title,
+        'status': 'success',
+        'main_sections': [{'name': 'Temas', 'url': 'https://www.inegi.org.mx/temas/'}],
+        'latest_news': [
+            {'title': text, 'url': f'https://www.inegi.org.mx/contenidos/saladeprensa/{i}.pdf', 'date': '09/10/2026'}
+            for i, text in enumerate(news)
+        ],
+        'featured_indicators': ['Inflación general4.5%septiembre 2026'],
+        'important_links': [{'text': 'Banco de indicadores', 'url': 'https://www.inegi.org.mx/app/indicadores/'}]
+    }
+
@@ -0,0 +1,19 @@
+"""
+App mínima para probar StreamThreadWorker con gunicorn real (sin scraping ni red)
+"""
+from flask import Flask, jsonify
+from services import EventBroker, StreamServer
+
+broker = EventBroker()
+app = Flask(__name__)
+app.extensions['stream_server'] = StreamServer(broker, listen=False)
+
+
+@app.route('/ping')
+def ping():
+    return jsonify({'status': 'success'})
+
+
+@app.route('/publish', methods=['POST'])
+def publish():
+    return jsonify(broker.publish('snapshot', {'n': broker.last_id + 1}))
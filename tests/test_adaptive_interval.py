@@ -0,0 +1,72 @@
+"""
+Intervalo adaptativo: límites, y solo las ejecuciones programadas lo ajustan
+"""
+import pytest
+from config import Config
+from services.adaptive_interval import AdaptiveInterval
+from helpers import make_snapshot
+
+
+def _interval(initial=5):
+    return AdaptiveInterval(initial, min_minutes=2, max_minutes=60, backoff_factor=2,
+                            tighten_factor=0.5, jitter_ratio=0.1, window_hours=24)
+
+
+def test_interval_stays_within_bounds():
+    adaptive = _interval()
+    for minute in range(10):
+        adaptive.observe(changed=False, now=minute * 60)
+    assert adaptive.minutes == 60
+    
+    for minute in range(10, 20):
+        adaptive.observe(changed=True, now=minute * 60)
+    assert adaptive.minutes == 2
+    assert _interval(initial=500).minutes == 60
+    assert _interval(initial=0.5).minutes == 2
+
+
+def test_errors_keep_the_interval():
+    adaptive = _interval()
+    assert adaptive.observe(changed=True, success=False) == 5
+    assert adaptive.quiet_runs == 0
+
+
+class StubScraper:
+    """Devuelve snapshots con un título distinto en cada llamada (contenido que cambia)"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def scrape_homepage(self):
+        self.calls += 1
+        return make_snapshot(f'2026-10-01T10:{self.calls:02d}:00', title=f'INEGI {self.calls}')
+
+
+@pytest.fixture
+def adaptive_scheduler(scheduler, monkeypatch):
+    monkeypatch.setattr(Config, 'ADAPTIVE_INTERVAL_ENABLED', True)
+    scheduler.scraper_service = StubScraper()
+    scheduler.start(interval_minutes=8)
+    yield scheduler
+    scheduler.stop()
+
+
+def test_manual_scrapes_do_not_adapt_or_reschedule(adaptive_scheduler):
+    next_run = adaptive_scheduler._next_run()
+    
+    adaptive_scheduler.scrape_now(max_age=0)
+    adaptive_scheduler.scrape_now(max_age=0)
+    
+    assert adaptive_scheduler.interval_minutes == 8
+    assert not adaptive_scheduler.adaptive.changes
+    assert adaptive_scheduler._next_run() == next_run
+
+
+def test_scheduled_scrape_adapts_and_keeps_next_run_when_unchanged(adaptive_scheduler):
+    adaptive_scheduler.scheduled_scrape()
+    assert adaptive_scheduler.interval_minutes == 4
+    next_run = adaptive_scheduler._next_run()
+    
+    # Mismo intervalo: la tarea no se reprograma
+    adaptive_scheduler._schedule_scrape_job(4)
+    assert adaptive_scheduler._next_run() == next_run
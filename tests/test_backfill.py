@@ -0,0 +1,49 @@
+"""
+Archivo de HTML y backfill: un objeto por contenido y re-extracción en paralelo
+"""
+import json
+from services import BackfillService, HtmlArchive, ScraperService, StorageService
+
+
+def test_archive_stores_each_body_once(tmp_path, home_html):
+    archive = HtmlArchive(str(tmp_path / 'archive'))
+    first = archive.store(home_html, 'https://www.inegi.org.mx/', '2026-10-01T10:00:00', 'utf-8')
+    second = archive.store(home_html, 'https://www.inegi.org.mx/', '2026-10-01T10:05:00', 'utf-8')
+    archive.store(b'<html></html>', 'https://www.inegi.org.mx/temas/', '2026-10-01T10:05:00')
+    
+    # Línea incompleta al final del manifiesto (escritura interrumpida)
+    with open(archive.manifest_path, 'a', encoding='utf-8') as f:
+        f.write('{"timestamp": "2026-10-01T10:1')
+    
+    assert first == second
+    assert archive.load(first) == home_html
+    assert archive.stats()['objects'] == 2
+    assert len(archive.entries()) == 3
+    assert [e['timestamp'] for e in archive.entries(start='2026-10-01T10:01:00')] == ['2026-10-01T10:05:00'] * 2
+    assert len(archive.entries(url='https://www.inegi.org.mx/temas/')) == 1
+
+
+def test_backfill_extracts_each_content_once(data_dir, tmp_path, home_html):
+    archive = HtmlArchive()
+    for minute in range(3):
+        archive.store(home_html, 'https://www.inegi.org.mx/', f'2026-10-01T10:0{minute}:00', 'utf-8')
+    storage = StorageService()
+    backfill = BackfillService(archive, storage)
+    output = str(tmp_path / 'backfill.jsonl')
+    
+    summary = backfill.run(workers=2, output=output, save_entities=True)
+    
+    assert summary['fetches'] == 3
+    assert summary['distinct_pages'] == 1
+    assert summary['errors'] == 0
+    with open(output, encoding='utf-8') as f:
+        results = [json.loads(line) for line in f]
+    assert [r['timestamp'] for r in results] == [f'2026-10-01T10:0{minute}:00' for minute in range(3)]
+    expected = ScraperService().extract_page(home_html, 'utf-8')
+    assert results[0]['latest_news'] == expected['latest_news']
+    
+    # Repetir el backfill no vuelve a contar las apariciones
+    backfill.run(workers=1, output=output, save_entities=True)
+    news = storage.query_entities('news', limit=1)[0]
+    assert news['seen_count'] == 3
+    assert news['last_seen'] == '2026-10-01T10:02:00'
@@ -0,0 +1,76 @@
+"""
+GET condicional de ScraperService contra ReplayServer (página de benchmarks/fixtures)
+"""
+import json
+import os
+import pytest
+from config import Config
+from services import Cassette, ReplayServer, ScraperService
+from helpers import recorded_response
+
+
+@pytest.fixture
+def replay(tmp_path, home_html):
+    cassette = Cassette(str(tmp_path / 'cassette'))
+    cassette.record('https://www.inegi.org.mx/', recorded_response(home_html))
+    cassette.record('https://www.inegi.org.mx/temas/', recorded_response(home_html))
+    server = ReplayServer(cassette, port=0, seed=1)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def scraper(replay, monkeypatch):
+    monkeypatch.setattr(Config, 'INEGI_BASE_URL', f'{replay.base_url}/')
+    scraper = ScraperService()
+    yield scraper
+    scraper.http_client.close()
+
+
+def test_unchanged_page_is_served_from_304(replay, scraper):
+    first = scraper.scrape_homepage()
+    second = scraper.scrape_homepage()
+    
+    assert first['status'] == 'success' and not first.get('not_modified')
+    assert second['not_modified'] is True
+    assert second['latest_news'] == first['latest_news']
+    assert replay.stats['not_modified'] == 1
+
+
+def test_changed_page_is_extracted_again(replay, scraper):
+    first = scraper.scrape_homepage()
+    replay.mutation_rate = 1.0
+    second = scraper.scrape_homepage()
+    
+    assert not second.get('not_modified')
+    assert second['content_hash'] != first['content_hash']
+    assert second['latest_news'][0]['title'] == 'Comunicado simulado 1'
+
+
+def test_validators_survive_restart(replay, scraper):
+    scraper.scrape_homepage()
+    
+    restarted = ScraperService()
+    assert restarted.scrape_homepage()['not_modified'] is True
+    restarted.http_client.close()
+
+
+def test_validators_are_stored_per_url(replay, scraper):
+    scraper.scrape_homepage()
+    url = scraper.base_url
+    result_path = scraper._cache_path(url, 'result.json')
+    result_mtime = os.stat(result_path).st_mtime_ns
+    
+    with open(scraper._cache_path(url), encoding='utf-8') as f:
+        validators = json.load(f)
+    assert validators['url'] == url
+    assert 'result' not in validators
+    
+    # Otra URL: archivos propios, el resultado de la primera no se reescribe
+    other = f'{replay.base_url}/temas/'
+    scraper.scrape_page(other)
+    scraper.scrape_homepage()
+    assert os.path.exists(scraper._cache_path(other))
+    assert len(os.listdir(scraper.http_cache_dir)) == 4
+    assert os.stat(result_path).st_mtime_ns == result_mtime
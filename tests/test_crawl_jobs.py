@@ -0,0 +1,63 @@
+"""
+Crawl manual encolado y una sola ejecución a la vez
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from helpers import make_snapshot
+
+
+class SlowCrawler:
+    """Crawler sin red que espera a que la prueba lo libere"""
+    
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+    
+    def crawl(self, seed_data):
+        self.calls += 1
+        self.release.wait(5)
+        return {'status': 'success', 'seed': seed_data['timestamp'], 'pages': []}
+
+
+def test_concurrent_crawls_share_one_run(scheduler):
+    scheduler.crawler_service = crawler = SlowCrawler()
+    seed = make_snapshot('2026-10-01T10:00:00')
+    
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first = pool.submit(scheduler.run_crawl, seed)
+        while not crawler.calls:
+            time.sleep(0.01)
+        second = pool.submit(scheduler.run_crawl, seed)
+        time.sleep(0.05)
+        crawler.release.set()
+        results = [first.result(), second.result()]
+    
+    assert crawler.calls == 1
+    assert results[0] is results[1]
+    assert scheduler.get_crawl_data() is results[0]
+
+
+def test_crawl_run_is_enqueued(scheduler, client, job_service):
+    scheduler.crawler_service = crawler = SlowCrawler()
+    scheduler.publish(make_snapshot('2026-10-01T10:00:00'))
+    
+    response = client.get('/api/crawl?run=true')
+    assert response.status_code == 202
+    job_id = response.get_json()['job_id']
+    assert response.headers['Location'] == f'/api/jobs/{job_id}'
+    
+    crawler.release.set()
+    for _ in range(500):
+        job = job_service.get_job(job_id)
+        if job['status'] not in ('queued', 'running'):
+            break
+        time.sleep(0.01)
+    assert job['type'] == 'crawl'
+    assert job['status'] == 'succeeded'
+    assert job['result']['seed'] == '2026-10-01T10:00:00'
+    assert client.get('/api/crawl').get_json()['data'] == job['result']
+
+
+def test_crawl_run_without_crawler_is_unavailable(client):
+    assert client.get('/api/crawl?run=true').status_code == 503
@@ -0,0 +1,74 @@
+"""
+Crawler: límite por nivel sin perder URLs y presupuesto de tiempo acotado
+"""
+import threading
+import time
+from config import Config
+from services.crawler_service import CrawlerService
+from helpers import recorded_response
+
+
+def _page(*paths):
+    return {'main_sections': [{'name': path, 'url': f'https://www.inegi.org.mx{path}'} for path in paths]}
+
+
+class FakeScraper:
+    """Scraper sin red: cada URL responde con los links de `site`; `block` retiene una URL"""
+    
+    def __init__(self, site, block=None):
+        self.site = site
+        self.block = block
+        self.released = threading.Event()
+        self.fetched = []
+        self.extracted = []
+        self.http_client = self
+    
+    def get(self, url):
+        self.fetched.append(url)
+        if url == self.block:
+            self.released.wait(5)
+        return recorded_response(url.encode())
+    
+    def record_response(self, url, response):
+        pass
+    
+    def detect_encoding(self, response):
+        return 'utf-8'
+    
+    def archive_response(self, response, url, encoding):
+        pass
+    
+    def extract_page(self, content, encoding):
+        url = content.decode()
+        self.extracted.append(url)
+        return self.site.get(url, {})
+
+
+def test_urls_over_the_depth_cap_move_to_next_level(monkeypatch):
+    monkeypatch.setattr(Config, 'CRAWL_MAX_PAGES_PER_DEPTH', 2)
+    scraper = FakeScraper({'https://www.inegi.org.mx/a': _page('/d')})
+    crawler = CrawlerService(scraper)
+    
+    result = crawler.crawl({'url': 'https://www.inegi.org.mx/', **_page('/a', '/b', '/c')}, max_depth=3)
+    
+    depths = {page['url'].rsplit('/', 1)[1]: page['depth'] for page in result['pages']}
+    assert depths == {'a': 1, 'b': 1, 'c': 2, 'd': 2}
+    assert sorted(scraper.fetched) == sorted(set(scraper.fetched))
+
+
+def test_time_budget_bounds_in_flight_fetches(monkeypatch):
+    monkeypatch.setattr(Config, 'CRAWL_TIME_BUDGET_SECONDS', 0.2)
+    monkeypatch.setattr(Config, 'HTTP_READ_TIMEOUT', 0.2)
+    slow = 'https://www.inegi.org.mx/lenta'
+    scraper = FakeScraper({}, block=slow)
+    crawler = CrawlerService(scraper)
+    
+    started = time.monotonic()
+    result = crawler.crawl({'url': 'https://www.inegi.org.mx/', **_page('/lenta', '/rapida')})
+    assert time.monotonic() - started < 1
+    assert [page['url'] for page in result['pages']] == ['https://www.inegi.org.mx/rapida']
+    
+    # La respuesta que llega después del presupuesto ya no se extrae
+    scraper.released.set()
+    time.sleep(0.1)
+    assert slow not in scraper.extracted
@@ -0,0 +1,21 @@
+"""
+/api/data servido desde el archivo cuando la caché está vacía
+"""
+from config import Config
+from services import EventBroker, SharedSnapshot
+from helpers import make_snapshot
+
+
+def test_file_fallback_does_not_publish_or_announce(scheduler, client):
+    scheduler.shared_snapshot = SharedSnapshot()
+    scheduler.event_broker = EventBroker()
+    scheduler.storage_service.save_json(make_snapshot('2026-10-01T10:00:00'), Config.LATEST_JSON)
+    
+    response = client.get('/api/data')
+    assert response.status_code == 200
+    assert response.get_json()['source'] == 'file'
+    assert scheduler.shared_snapshot.current() is None
+    assert scheduler.event_broker.replay(None)[0] == []
+    
+    # La siguiente petición sale de la caché local
+    assert client.get('/api/data').get_json()['source'] == 'cache'
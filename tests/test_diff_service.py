@@ -0,0 +1,91 @@
+"""
+Deltas entre snapshots y /api/changes
+"""
+import json
+from services import DiffService, SchedulerService
+from helpers import make_snapshot
+
+
+def test_change_after_error_is_recorded_against_last_success(scheduler):
+    scheduler.publish(make_snapshot('2026-10-01T10:00:00'))
+    scheduler.publish(make_snapshot('2026-10-01T10:05:00', status='error'))
+    scheduler.publish(make_snapshot('2026-10-01T10:10:00', news=('Censo de Población y Vivienda', 'ENOE')))
+    
+    entries = scheduler.diff_service.changes_since()
+    assert scheduler.diff_service.version == 1
+    assert entries[0]['previous_timestamp'] == '2026-10-01T10:00:00'
+    assert [item['title'] for item in entries[0]['changes']['latest_news']['added']] == ['ENOE']
+
+
+def test_last_success_comes_from_history_when_cache_holds_error(scheduler):
+    scheduler.publish(make_snapshot('2026-10-01T10:00:00'))
+    scheduler.publish(make_snapshot('2026-10-01T10:05:00', status='error'))
+    
+    # Otro proceso que solo conoce el error en caché
+    other = SchedulerService(None, scheduler.storage_service, diff_service=scheduler.diff_service)
+    other.set_cached_data(make_snapshot('2026-10-01T10:05:00', status='error'))
+    other.publish(make_snapshot('2026-10-01T10:10:00', title='INEGI México'))
+    
+    assert scheduler.diff_service.changes_since()[-1]['previous_timestamp'] == '2026-10-01T10:00:00'
+
+
+def test_changes_since_slices_whenever_limit_is_given(scheduler):
+    scheduler.publish(make_snapshot('2026-10-01T10:00:00'))
+    for minute, title in ((5, 'A'), (10, 'B'), (15, 'C')):
+        scheduler.publish(make_snapshot(f'2026-10-01T10:{minute:02d}:00', title=title))
+    
+    assert len(scheduler.diff_service.changes_since(limit=2)) == 2
+    assert scheduler.diff_service.changes_since(limit=0) == []
+    assert len(scheduler.diff_service.changes_since()) == 3
+
+
+def test_changes_route_clamps_limit(scheduler, client, monkeypatch):
+    from config import Config
+    monkeypatch.setattr(Config, 'CHANGES_MAX_RESULTS', 2)
+    scheduler.publish(make_snapshot('2026-10-01T10:00:00'))
+    for minute, title in ((5, 'A'), (10, 'B'), (15, 'C')):
+        scheduler.publish(make_snapshot(f'2026-10-01T10:{minute:02d}:00', title=title))
+    
+    assert client.get('/api/changes?limit=0').get_json()['count'] == 1
+    assert client.get('/api/changes?limit=-1').get_json()['count'] == 1
+    assert client.get('/api/changes?limit=100').get_json()['count'] == 2
+    assert client.get('/api/changes').get_json()['changes'][0]['version'] == 1
+
+
+def test_refresh_reads_only_appended_entries(scheduler):
+    reader = DiffService()
+    scheduler.publish(make_snapshot('2026-10-01T10:00:00'))
+    scheduler.publish(make_snapshot('2026-10-01T10:05:00', title='A'))
+    reader.refresh()
+    first = reader.recent[0]
+    
+    scheduler.publish(make_snapshot('2026-10-01T10:10:00', title='B'))
+    reader.refresh()
+    
+    assert reader.version == 2
+    assert reader.recent[0] is first
+    assert [entry['version'] for entry in reader.recent] == [1, 2]
+
+
+def test_refresh_waits_for_complete_lines(data_dir):
+    reader = DiffService()
+    line = json.dumps({'version': 1, 'timestamp': '2026-10-01T10:00:00', 'changes': {}}) + '\n'
+    with open(reader.changes_path, 'a', encoding='utf-8') as f:
+        f.write(line[:10])
+    reader.refresh()
+    assert reader.version == 0
+    
+    with open(reader.changes_path, 'a', encoding='utf-8') as f:
+        f.write(line[10:])
+    reader.refresh()
+    assert reader.version == 1
+
+
+def test_changes_route_sees_entries_from_other_processes(scheduler, client):
+    leader = SchedulerService(None, scheduler.storage_service, diff_service=DiffService())
+    leader.publish(make_snapshot('2026-10-01T10:00:00'))
+    leader.publish(make_snapshot('2026-10-01T10:05:00', title='A'))
+    
+    body = client.get('/api/changes').get_json()
+    assert body['current_version'] == 1
+    assert body['count'] == 1
@@ -0,0 +1,65 @@
+"""
+Entidades deduplicadas: seen_count idempotente y límites acotados
+"""
+from services.entity_store import EntityStore
+from helpers import make_snapshot
+
+
+def _news_titles(n):
+    return tuple(f'Noticia {i}' for i in range(n))
+
+
+def test_reupserting_snapshots_does_not_inflate_seen_count(tmp_path):
+    store = EntityStore(str(tmp_path / 'entities.db'))
+    snapshots = [make_snapshot(f'2026-10-01T10:0{minute}:00') for minute in range(3)]
+    
+    store.upsert_snapshots(snapshots)
+    store.upsert_snapshots(snapshots)  # backfill repetido
+    store.upsert_snapshot(snapshots[1])
+    
+    news, = store.query('news')
+    assert news['seen_count'] == 3
+    assert news['first_seen'] == '2026-10-01T10:00:00'
+    assert news['last_seen'] == '2026-10-01T10:02:00'
+    store.close()
+
+
+def test_backfill_skips_snapshots_up_to_last_seen(tmp_path):
+    store = EntityStore(str(tmp_path / 'entities.db'))
+    store.upsert_snapshot(make_snapshot('2026-10-01T10:05:00'))
+    
+    # Desordenados: el anterior y el repetido se omiten, el posterior se registra
+    counts = store.upsert_snapshots([
+        make_snapshot('2026-10-01T10:10:00'),
+        make_snapshot('2026-10-01T10:00:00'),
+        make_snapshot('2026-10-01T10:05:00')
+    ])
+    
+    assert counts['news'] == 1
+    news, = store.query('news')
+    assert news['seen_count'] == 2
+    assert news['first_seen'] == '2026-10-01T10:05:00'
+    assert news['last_seen'] == '2026-10-01T10:10:00'
+    assert store._conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name = 'snapshots'"
+    ).fetchone()[0] == 0
+    store.close()
+
+
+def test_query_limit_has_lower_bound(tmp_path):
+    store = EntityStore(str(tmp_path / 'entities.db'))
+    store.upsert_snapshot(make_snapshot('2026-10-01T10:00:00', news=_news_titles(5)))
+    
+    assert len(store.query('news', limit=-1)) == 1
+    assert len(store.query('news', limit=0)) == 1
+    assert len(store.query('news', limit=2, offset=-3)) == 2
+    store.close()
+
+
+def test_entities_and_history_routes_clamp_limit(scheduler, client):
+    scheduler.publish(make_snapshot('2026-10-01T10:00:00', news=_news_titles(5)))
+    scheduler.publish(make_snapshot('2026-10-01T10:05:00', news=_news_titles(6)))
+    
+    assert client.get('/api/entities/news?limit=-1').get_json()['count'] == 1
+    assert client.get('/api/history?limit=-1').get_json()['count'] == 1
+    assert client.get('/api/history?limit=0').get_json()['count'] == 1
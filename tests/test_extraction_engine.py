@@ -0,0 +1,128 @@
+"""
+Motor de extracción: un solo recorrido con el mismo resultado que las búsquedas find_all
+"""
+from bs4 import BeautifulSoup
+from services.extraction_engine import ExtractionEngine, Extractor, TitleExtractor
+from services.scraper_service import ScraperService
+
+NESTED_HTML = """
+<html><head><title> INEGI </title></head><body>
+<nav class="Main-Nav">
+  <a href="/temas/">Temas</a><a href="/programas/">Programas</a>
+  <ul class="submenu"><li><a href="/datos/">Banco de datos</a></li><li><a>Sin href</a></li></ul>
+</nav>
+<div class="menu-footer"><a href="/uno/">Uno</a><a href="/otro/">Otro menu</a></div>
+<div class="navegacion"><a href="/no/">Cuarto contenedor</a></div>
+<section class="noticias">
+  <a href="/comunicados/1.pdf">Ver</a>
+  <article class="noticia-destacada">
+    <h3>Encuesta Nacional de Ocupación</h3><span class="Fecha">09/10/2026</span>
+  </article>
+  <h2>Comunicados de prensa</h2>
+</section>
+<div class="indicador"><div class="indicador-valor">4.5%</div></div>
+<div class="estadistica">Censo 2020</div>
+<a href="/app/consulta/">Consulta interactiva</a>
+</body></html>
+""".encode()
+
+
+def _reference(scraper, soup):
+    """Extracción previa al motor: una búsqueda find_all por campo"""
+    def has(*keywords):
+        return lambda x: x and any(keyword in x.lower() for keyword in keywords)
+    
+    sections = []
+    for nav in soup.find_all(['nav', 'ul', 'div'], class_=has('menu', 'nav'))[:3]:
+        for link in nav.find_all('a', href=True)[:10]:
+            text = link.get_text(strip=True)
+            if text and len(text) > 3:
+                sections.append({'name': text, 'url': scraper._normalize_url(link['href'])})
+    
+    news = []
+    for item in soup.find_all(['article', 'div', 'section'], class_=has('noticia', 'comunicado', 'news'))[:10]:
+        heading = item.find(['h1', 'h2', 'h3', 'h4'])
+        if heading:
+            link = item.find('a', href=True)
+            date = item.find(['time', 'span'], class_=has('fecha'))
+            news.append({
+                'title': heading.get_text(strip=True),
+                'url': scraper._normalize_url(link['href'] if link else ''),
+                'date': date.get_text(strip=True) if date else 'N/A'
+            })
+    
+    indicators = [
+        text for text in (
+            item.get_text(strip=True)
+            for item in soup.find_all(['div', 'section'], class_=has('indicador', 'indicator', 'estadistica'))[:10]
+        ) if text and len(text) < 500
+    ]
+    
+    keywords = ('banco', 'datos', 'estadistica', 'censo', 'informacion', 'consulta')
+    links = [
+        {'text': link.get_text(strip=True), 'url': scraper._normalize_url(link['href'])}
+        for link in soup.find_all('a', href=True)
+        if any(keyword in link.get_text(strip=True).lower() for keyword in keywords)
+    ]
+    
+    return {
+        'title': soup.find('title').text.strip(),
+        'main_sections': list({s['name']: s for s in sections}.values()),
+        'latest_news': news,
+        'featured_indicators': indicators,
+        'important_links': list({l['text']: l for l in links}.values())
+    }
+
+
+def test_engine_matches_find_all_on_nested_containers():
+    scraper = ScraperService()
+    soup = BeautifulSoup(NESTED_HTML, 'html.parser')
+    
+    data = scraper.extraction_engine.run(soup)
+    
+    assert data == _reference(scraper, soup)
+    assert [s['name'] for s in data['main_sections']] == ['Temas', 'Programas', 'Banco de datos', 'Otro menu']
+    assert [n['title'] for n in data['latest_news']] == ['Encuesta Nacional de Ocupación', 'Encuesta Nacional de Ocupación']
+    assert data['latest_news'][0]['url'].endswith('/comunicados/1.pdf')
+    assert data['latest_news'][1]['date'] == '09/10/2026'
+
+
+def test_engine_matches_find_all_on_home_page(home_html):
+    scraper = ScraperService()
+    soup = BeautifulSoup(home_html, 'html.parser')
+    
+    assert scraper.extraction_engine.run(soup) == _reference(scraper, soup)
+
+
+class CountingExtractor(Extractor):
+    """Cuenta los nodos que recibe"""
+    
+    field = 'count'
+    tag_names = ('a',)
+    
+    def start(self):
+        self.seen = 0
+    
+    def enter(self, tag, class_text):
+        self.seen += 1
+        return False
+    
+    def result(self):
+        return self.seen
+
+
+class BrokenExtractor(CountingExtractor):
+    field = 'links'
+    
+    def result(self):
+        raise ValueError('roto')
+
+
+def test_extractors_only_receive_their_tags_and_fail_independently():
+    soup = BeautifulSoup(NESTED_HTML, 'html.parser')
+    engine = ExtractionEngine([TitleExtractor(), CountingExtractor(), BrokenExtractor()])
+    
+    data = engine.run(soup)
+    
+    assert data == {'title': 'INEGI', 'count': len(soup.find_all('a')), 'links': []}
+    assert engine.run(soup, fields=('title',)) == {'title': 'INEGI'}
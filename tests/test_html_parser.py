@@ -0,0 +1,50 @@
+"""
+Backends de parseo: todos deben producir la misma extracción
+"""
+import pytest
+from services.html_parser import PARSER_BACKENDS, is_lxml_tree, parse_document
+from services.scraper_service import ScraperService
+
+
+@pytest.fixture
+def scraper():
+    return ScraperService()
+
+
+@pytest.mark.parametrize('backend', PARSER_BACKENDS)
+def test_each_backend_extracts_home_page(scraper, home_html, backend):
+    data = scraper.extract_page(home_html, 'utf-8', backend)
+    
+    assert data['title'].startswith('Instituto Nacional de Estadística')
+    assert data['main_sections'] and data['latest_news'] and data['featured_indicators'] and data['important_links']
+
+
+def test_backends_agree(scraper, home_html):
+    reference = scraper.extract_page(home_html, 'utf-8', 'lxml.html')
+    for backend in ('html.parser', 'lxml'):
+        assert scraper.extract_page(home_html, 'utf-8', backend) == reference
+    
+    assert scraper.check_parser_parity(home_html)['consistent']
+
+
+@pytest.mark.parametrize('backend', PARSER_BACKENDS)
+def test_extract_helpers_accept_every_tree(scraper, home_html, backend):
+    soup = parse_document(home_html, backend, 'utf-8')
+    
+    assert scraper._extract_title(soup).startswith('Instituto')
+    assert scraper._extract_sections(soup)
+    assert scraper._extract_news(soup)
+    assert scraper._extract_indicators(soup)
+    assert scraper._extract_links(soup)
+
+
+def test_empty_body_falls_back_to_beautifulsoup(scraper):
+    document = parse_document(b'', 'lxml.html')
+    
+    assert not is_lxml_tree(document)
+    assert scraper.extraction_engine.run(document)['main_sections'] == []
+
+
+def test_is_lxml_tree():
+    assert is_lxml_tree(parse_document(b'<html><body></body></html>', 'lxml.html'))
+    assert not is_lxml_tree(parse_document(b'<html><body></body></html>', 'html.parser'))
@@ -0,0 +1,80 @@
+"""
+Política de reintentos del cliente HTTP (servidor local, sin red)
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from services import HttpClient
+
+
+@pytest.fixture
+def server():
+    """Servidor local que tarda en responder /slow, falla /down con 503 y corta /reset dos veces"""
+    hits = {'/slow': 0, '/down': 0, '/reset': 0}
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits[self.path] += 1
+            if self.path == '/reset' and hits['/reset'] <= 2:
+                # Respuesta cortada a la mitad, como un socket keep-alive que el servidor cerró
+                self.wfile.write(b'HTTP/1.1 2')
+                self.wfile.flush()
+                self.close_connection = True
+                return
+            if self.path == '/reset':
+                self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if self.path == '/slow':
+                time.sleep(0.5)
+            self.send_response(200 if self.path == '/slow' else 503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        
+        def log_message(self, *args):
+            pass
+    
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_port}', hits
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_read_timeout_is_not_retried(server):
+    base_url, hits = server
+    client = HttpClient()
+    
+    started = time.monotonic()
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        client.get(f'{base_url}/slow', timeout=(1, 0.1))
+    
+    assert hits['/slow'] == 1
+    assert time.monotonic() - started < 0.5
+    client.close()
+
+
+def test_server_errors_are_still_retried(server, monkeypatch):
+    from config import Config
+    monkeypatch.setattr(Config, 'HTTP_BACKOFF_FACTOR', 0)
+    base_url, hits = server
+    client = HttpClient()
+    
+    assert client.get(f'{base_url}/down').status_code == 503
+    assert hits['/down'] == Config.HTTP_MAX_RETRIES + 1
+    client.close()
+
+
+def test_connection_resets_are_retried(server, monkeypatch):
+    from config import Config
+    monkeypatch.setattr(Config, 'HTTP_BACKOFF_FACTOR', 0)
+    base_url, hits = server
+    client = HttpClient()
+    
+    assert client.get(f'{base_url}/reset').status_code == 200
+    assert hits['/reset'] == 3
+    client.close()
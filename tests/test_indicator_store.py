@@ -0,0 +1,93 @@
+"""
+Series de indicadores: parseo, rollups por bucket, elección automática y reparación
+"""
+import os
+import struct
+import pytest
+from services.indicator_store import IndicatorStore, parse_indicator
+
+BASE = 1_789_999_200  # Múltiplo de 3600: los buckets empiezan en BASE
+
+
+def _snapshot(ts, value):
+    return {'timestamp': ts, 'featured_indicators': [f'Tasa de desocupación{value}%agosto 2026', 'Sin número']}
+
+
+def _store(tmp_path, **kwargs):
+    return IndicatorStore(str(tmp_path / 'indicators'), buckets={'1h': 3600, '5m': 300}, **kwargs)
+
+
+def test_parse_indicator_variants():
+    assert parse_indicator('Tasa de desocupación2.7%agosto 2026') == {
+        'id': 'tasa-de-desocupacion', 'name': 'Tasa de desocupación', 'value': 2.7, 'unit': '%', 'period': 'agosto 2026'
+    }
+    assert parse_indicator('Exportaciones52,310millones de dólaresagosto 2026')['value'] == 52310
+    assert parse_indicator('PIB trimestral−0,4% anualII trim 2026')['value'] == -0.4
+    assert parse_indicator('Población total: 126,014,024 habitantes (Censo 2020)')['period'] == 'Censo 2020'
+    assert parse_indicator('Inflación 4.5% y desocupación 2.7%') is None
+
+
+def test_rollups_match_raw_samples(tmp_path):
+    store = _store(tmp_path)
+    values = [2.0, 5.0, 3.0, 4.0, 1.0, 6.0]
+    for i, value in enumerate(values):
+        assert store.append_snapshot(_snapshot(BASE + i * 240, value)) == 1
+    assert store.append_snapshot(_snapshot(BASE + 240, 9.0)) == 0  # Ya registrada
+    
+    raw = store.series('tasa-de-desocupacion', bucket='raw')
+    assert [p['value'] for p in raw['points']] == values
+    
+    five = store.series('tasa-de-desocupacion', bucket='5m')
+    buckets = {}
+    for i, value in enumerate(values):
+        buckets.setdefault((i * 240) // 300, []).append(value)
+    assert [(p['count'], p['min'], p['max'], p['last']) for p in five['points']] == [
+        (len(group), min(group), max(group), group[-1]) for group in buckets.values()
+    ]
+    
+    hour = store.series('tasa-de-desocupacion', bucket='1h')
+    assert hour['points'] == [{'t': raw['points'][0]['t'], 'count': 6, 'min': 1.0, 'max': 6.0, 'mean': 3.5, 'last': 6.0}]
+    assert hour['summary'] == five['summary'] == raw['summary']
+    
+    # Rango parcial: el inicio se alinea a su bucket (incluye la muestra de BASE + 480)
+    partial = store.series('tasa-de-desocupacion', start=BASE + 500, end=BASE + 900, bucket='5m')
+    assert [(p['count'], p['last']) for p in partial['points']] == [(1, 3.0), (1, 4.0), (1, 1.0)]
+    store.close()
+
+
+def test_auto_bucket_fits_max_points(tmp_path):
+    store = _store(tmp_path, max_points=3)
+    for i in range(6):
+        store.append_snapshot(_snapshot(BASE + i * 240, i))
+    
+    assert store.series('tasa-de-desocupacion', start=BASE, end=BASE + 480)['bucket'] == 'raw'
+    assert store.series('tasa-de-desocupacion')['bucket'] == '1h'
+    with pytest.raises(ValueError):
+        store.series('tasa-de-desocupacion', bucket='raw')
+    with pytest.raises(ValueError):
+        store.series('tasa-de-desocupacion', bucket='2h')
+    assert store.series('no-existe') is None
+    store.close()
+
+
+def test_torn_write_is_repaired_on_next_append(tmp_path):
+    store = _store(tmp_path)
+    for i in range(3):
+        store.append_snapshot(_snapshot(BASE + i * 60, i))
+    store.close()
+    
+    # Escritura interrumpida: timestamp escrito sin valor ni periodo, rollup 1h perdido
+    directory = tmp_path / 'indicators' / 'tasa-de-desocupacion'
+    with open(directory / 'ts.f64', 'ab') as f:
+        f.write(struct.pack('d', BASE + 180))
+    os.remove(directory / 'rollup_1h.f64')
+    
+    reopened = _store(tmp_path)
+    assert reopened.list()[0]['samples'] == 3
+    reopened.append_snapshot(_snapshot(BASE + 240, 10))
+    
+    series = reopened.series('tasa-de-desocupacion', bucket='1h')
+    assert series['summary']['samples'] == 4
+    assert series['summary']['max'] == 10
+    assert (directory / 'ts.f64').stat().st_size == 4 * 8
+    reopened.close()
@@ -0,0 +1,69 @@
+"""
+Logging estructurado: JSON por línea, ID de ejecución, muestreo y cola que nunca bloquea
+"""
+import io
+import json
+import logging
+import queue
+import pytest
+from utils import get_logger, run_context
+from utils import log
+
+
+@pytest.fixture
+def output():
+    """Redirige el logging a un buffer y restaura la configuración al terminar"""
+    previous = dict(log._state['options'])
+    buffer = io.StringIO()
+    log.configure_logging(level='INFO', fmt='json', sample_burst=2, sample_window=60, sample_every=3, stream=buffer)
+    
+    def lines():
+        log.shutdown_logging()  # Escribe lo pendiente
+        return [json.loads(line) for line in buffer.getvalue().splitlines()]
+    
+    yield lines
+    log.configure_logging(**previous)
+
+
+def test_records_are_json_with_run_id_and_extra(output):
+    logger = get_logger('Prueba')
+    items = ['a']
+    with run_context('abc123'):
+        logger.info("Elementos: %s", items, extra={'url': 'https://www.inegi.org.mx'})
+    items.append('b')  # El mensaje se resolvió al emitirlo
+    try:
+        raise ValueError('falla')
+    except ValueError:
+        logger.exception("Error")
+    
+    first, second = output()
+    assert first['service'] == 'Prueba'
+    assert first['msg'] == "Elementos: ['a']"
+    assert first['run_id'] == 'abc123'
+    assert first['url'] == 'https://www.inegi.org.mx'
+    assert 'run_id' not in second
+    assert 'ValueError: falla' in second['exc']
+
+
+def test_repeated_messages_are_sampled(output):
+    logger = get_logger('Prueba')
+    for i in range(8):
+        logger.info("Página %s descargada", i)
+    logger.warning("Sin respuesta")
+    logger.warning("Sin respuesta")
+    
+    records = output()
+    assert [r['msg'] for r in records] == [
+        'Página 0 descargada', 'Página 1 descargada', 'Página 4 descargada',
+        'Página 7 descargada', 'Sin respuesta', 'Sin respuesta'
+    ]
+    assert [r.get('sampled') for r in records[:4]] == [None, None, 2, 2]
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = log._NonBlockingQueueHandler(queue.Queue(1))
+    for i in range(3):
+        handler.emit(logging.makeLogRecord({'msg': f'registro {i}', 'levelno': logging.INFO}))
+    
+    assert handler.dropped == 2
+    assert handler.queue.get_nowait().msg == 'registro 0'
@@ -0,0 +1,80 @@
+"""
+Métricas: formato de exposición, combinación entre procesos y /api/metrics
+"""
+import json
+import os
+import subprocess
+import sys
+from config import Config
+from utils import collect_phases, phase, METRICS
+from utils.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('inegi_prueba_seconds', 'Prueba', ('phase',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, phase='parse "html"')
+    
+    lines = registry.render().splitlines()
+    
+    assert lines[:2] == ['# HELP inegi_prueba_seconds Prueba', '# TYPE inegi_prueba_seconds histogram']
+    assert lines[2:] == [
+        'inegi_prueba_seconds_bucket{phase="parse \\"html\\"",le="0.1"} 1',
+        'inegi_prueba_seconds_bucket{phase="parse \\"html\\"",le="1"} 3',
+        'inegi_prueba_seconds_bucket{phase="parse \\"html\\"",le="+Inf"} 4',
+        'inegi_prueba_seconds_sum{phase="parse \\"html\\""} 4.25',
+        'inegi_prueba_seconds_count{phase="parse \\"html\\""} 4'
+    ]
+
+
+def test_render_sums_other_processes():
+    local, other = MetricsRegistry(), MetricsRegistry()
+    local.counter('inegi_runs_total', 'Ejecuciones', ('result',)).inc(result='success')
+    other.counter('inegi_runs_total', 'Ejecuciones', ('result',)).inc(2, result='success')
+    other.counter('inegi_runs_total', 'Ejecuciones', ('result',)).inc(result='error')
+    
+    # Un histograma con otros buckets (otra versión del código) no se mezcla
+    local.histogram('inegi_fetch_seconds', 'Descarga', buckets=(1.0,)).observe(0.5)
+    other.histogram('inegi_fetch_seconds', 'Descarga', buckets=(1.0, 2.0)).observe(0.5)
+    
+    text = local.render([other.export()])
+    
+    assert 'inegi_runs_total{result="success"} 3' in text
+    assert 'inegi_runs_total{result="error"} 1' in text
+    assert 'inegi_fetch_seconds_count 1' in text
+
+
+def test_phases_are_collected_and_observed():
+    with collect_phases() as phases:
+        with phase('parse'):
+            pass
+        with phase('parse'):
+            pass
+    
+    assert set(phases) == {'parse'}
+    assert 'inegi_phase_duration_seconds_count{phase="parse"}' in METRICS.render()
+
+
+def test_metrics_route_combines_live_processes(client, data_dir):
+    metrics_dir = os.path.join(data_dir, Config.METRICS_DIR)
+    os.makedirs(metrics_dir, exist_ok=True)
+    
+    other = MetricsRegistry()
+    other.counter('inegi_otro_proceso_total', 'De otro worker').inc(5)
+    with open(os.path.join(metrics_dir, f'{os.getppid()}.json'), 'w', encoding='utf-8') as f:
+        json.dump(other.export(), f)
+    
+    finished = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'], capture_output=True, text=True)
+    dead_path = os.path.join(metrics_dir, f'{finished.stdout.strip()}.json')
+    with open(dead_path, 'w', encoding='utf-8') as f:
+        json.dump(other.export(), f)
+    
+    client.get('/api/data')
+    response = client.get('/api/metrics')
+    
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    assert 'inegi_otro_proceso_total 5' in response.text
+    assert 'inegi_http_requests_total{route="/api/data",method="GET",status="404"}' in response.text
+    assert not os.path.exists(dead_path)
@@ -0,0 +1,55 @@
+"""
+/api/data precomprimido: negociación de codificación, ETag por variante y 304
+"""
+import gzip
+import json
+import pytest
+from utils import PrecompressedJSON
+from helpers import make_snapshot
+
+
+def test_variants_round_trip_through_shared_buffer():
+    prepared = PrecompressedJSON({'status': 'success', 'data': make_snapshot('2026-10-01T10:00:00')})
+    
+    restored = PrecompressedJSON.from_buffer(prepared.to_bytes())
+    
+    assert restored.digest == prepared.digest
+    assert bytes(restored.variants['gzip']) == prepared.variants['gzip']
+    assert restored.payload == prepared.payload
+    with pytest.raises(ValueError):
+        PrecompressedJSON.from_buffer(prepared.to_bytes()[:40])
+
+
+def test_etag_of_any_variant_matches():
+    prepared = PrecompressedJSON({'a': 1})
+    
+    assert prepared.matches(prepared.etag('gzip'))
+    assert prepared.matches(f'"otro", W/{prepared.etag()}')
+    assert prepared.matches('*')
+    assert not prepared.matches('"otro"')
+    assert not prepared.matches(None)
+
+
+def test_data_route_serves_gzip_and_304(scheduler, client):
+    scheduler.publish(make_snapshot('2026-10-01T10:00:00'))
+    
+    response = client.get('/api/data', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert response.headers['ETag'].endswith('-gzip"')
+    assert json.loads(gzip.decompress(response.data))['data']['timestamp'] == '2026-10-01T10:00:00'
+    
+    # El ETag de la variante gzip también valida la respuesta sin comprimir
+    etag = response.headers['ETag']
+    not_modified = client.get('/api/data', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b''
+    
+    # Contenido nuevo: el ETag anterior ya no corresponde
+    scheduler.publish(make_snapshot('2026-10-01T10:05:00', title='INEGI 2026'))
+    changed = client.get('/api/data', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert 'Content-Encoding' not in changed.headers
+    assert changed.get_json()['data']['title'] == 'INEGI 2026'
@@ -0,0 +1,45 @@
+"""
+Proyección de /api/data: campos, filtros y parámetros ajenos
+"""
+from werkzeug.datastructures import MultiDict
+from services.projection import Projection, ProjectionCache
+from helpers import make_snapshot
+
+
+def test_params_that_are_not_filters_are_ignored():
+    projection = Projection.from_args(MultiDict([('_', '1760000000000'), ('callback', 'cb'), ('news.', 'x')]))
+    assert projection.is_identity
+
+
+def test_list_field_params_filter():
+    projection = Projection.from_args(MultiDict([('news.title~', 'censo'), ('_', '1')]))
+    data = make_snapshot('2026-10-01T10:00:00', news=('Censo de Población y Vivienda', 'ENOE'))
+    
+    projected, totals, _ = projection.apply(data)
+    assert [item['title'] for item in projected['latest_news']] == ['Censo de Población y Vivienda']
+    assert totals['latest_news'] == 1
+
+
+def test_data_route_accepts_cache_buster(scheduler, client):
+    scheduler.publish(make_snapshot('2026-10-01T10:00:00'))
+    
+    response = client.get('/api/data?_=1760000000000&news.title~=poblacion')
+    assert response.status_code == 200
+    assert len(response.get_json()['data']['latest_news']) == 1
+
+
+def test_cache_is_dropped_when_digest_changes():
+    cache = ProjectionCache(max_entries=2)
+    builds = []
+    
+    def build(value):
+        return lambda: builds.append(value) or value
+    
+    assert cache.get('v1', ('a',), build('a1')) == 'a1'
+    assert cache.get('v1', ('a',), build('otra')) == 'a1'
+    assert cache.get('v2', ('a',), build('a2')) == 'a2'  # Snapshot nuevo: no se sirve la versión anterior
+    assert cache.get('v2', ('b',), build('b2')) == 'b2'
+    assert cache.get('v2', ('c',), build('c2')) == 'c2'  # Desplaza a ('a',), el menos usado
+    assert cache.get('v2', ('a',), build('a2')) == 'a2'
+    assert builds == ['a1', 'a2', 'b2', 'c2', 'a2']
+    assert cache.stats() == {'entries': 2, 'hits': 1, 'misses': 5}
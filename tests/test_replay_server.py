@@ -0,0 +1,58 @@
+"""
+ReplayServer sobre la página de benchmarks/fixtures (sin red)
+"""
+import hashlib
+import http.client
+import json
+import pytest
+from services import Cassette, ReplayServer
+from helpers import recorded_response
+
+
+@pytest.fixture
+def legacy_cassette(tmp_path, home_html):
+    """Cassette grabado antes de omitir validadores, con la capitalización del sitio"""
+    cassette = Cassette(str(tmp_path / 'cassette'))
+    body = home_html
+    digest = hashlib.sha256(body).hexdigest()
+    cassette.record('https://www.inegi.org.mx/', recorded_response(body, {'Content-Type': 'text/html'}))
+    interaction = {
+        'url': 'https://www.inegi.org.mx/', 'key': '/', 'status': 200, 'sha256': digest,
+        'size': len(body), 'elapsed': 0.0,
+        'headers': {'Content-Type': 'text/html', 'Etag': '"grabado"', 'last-modified': 'Tue, 01 Sep 2026 10:00:00 GMT'}
+    }
+    with open(cassette.index_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(interaction) + '\n')
+    return cassette
+
+
+def _get(server, headers=None):
+    connection = http.client.HTTPConnection(server.host, server._httpd.server_address[1], timeout=5)
+    connection.request('GET', '/', headers=headers or {})
+    response = connection.getresponse()
+    response.read()
+    connection.close()
+    return response
+
+
+def test_recorded_validators_are_not_replayed(legacy_cassette):
+    server = ReplayServer(legacy_cassette, port=0)
+    server.start()
+    try:
+        response = _get(server)
+        names = [name.lower() for name, _ in response.getheaders()]
+        assert names.count('etag') == 1
+        assert 'last-modified' not in names
+        assert response.getheader('ETag') != '"grabado"'
+        
+        assert _get(server, {'If-None-Match': response.getheader('ETag')}).status == 304
+    finally:
+        server.stop()
+
+
+def test_cassette_skips_validators_regardless_of_case(tmp_path):
+    cassette = Cassette(str(tmp_path / 'cassette'))
+    interaction = cassette.record('https://www.inegi.org.mx/', recorded_response(b'<html></html>', {
+        'Content-Type': 'text/html', 'Etag': '"x"', 'LAST-MODIFIED': 'Tue, 01 Sep 2026 10:00:00 GMT'
+    }))
+    assert interaction['headers'] == {'Content-Type': 'text/html'}
@@ -0,0 +1,69 @@
+"""
+Publicación de resultados: caché, archivos y deltas
+"""
+from config import Config
+from helpers import make_snapshot
+
+
+def test_unchanged_success_after_error_replaces_cached_error(scheduler):
+    assert scheduler.publish(make_snapshot('2026-10-01T10:00:00'))
+    assert scheduler.publish(make_snapshot('2026-10-01T10:05:00', status='error'))
+    assert scheduler.get_cached_data()['status'] == 'error'
+    
+    # Mismo contenido que antes del error: debe volver a publicarse
+    scheduler.publish(make_snapshot('2026-10-01T10:10:00'))
+    
+    assert scheduler.get_cached_data()['status'] == 'success'
+    assert scheduler.get_cached_response().payload['data']['status'] == 'success'
+    assert scheduler.storage_service.load_json(Config.LATEST_JSON)['status'] == 'success'
+    assert scheduler.is_ready
+
+
+def test_unchanged_success_is_not_persisted_again(scheduler):
+    assert scheduler.publish(make_snapshot('2026-10-01T10:00:00'))
+    
+    assert not scheduler.publish(make_snapshot('2026-10-01T10:05:00'))
+    assert scheduler.runs_unchanged == 1
+    assert scheduler.get_cached_data()['timestamp'] == '2026-10-01T10:00:00'
+
+
+def _state(storage):
+    news, = storage.query_entities('news')
+    indicator, = storage.list_indicators()
+    doc, = storage.search('censo')['results']
+    return news['last_seen'], news['seen_count'], indicator['samples'], doc['appearances']
+
+
+def test_unchanged_runs_write_nothing_until_flushed(scheduler):
+    storage = scheduler.storage_service
+    scheduler.publish(make_snapshot('2026-10-01T10:00:00'))
+    before = _state(storage)
+    
+    assert not scheduler.publish(make_snapshot('2026-10-01T10:05:00'))
+    assert not scheduler.publish(make_snapshot('2026-10-01T10:10:00'))
+    assert _state(storage) == before
+    
+    # Al detenerse se escribe la última aparición, una sola vez
+    scheduler.stop()
+    last_seen, seen_count, samples, appearances = _state(storage)
+    assert last_seen == '2026-10-01T10:10:00'
+    assert seen_count == 1
+    assert samples == 2
+    assert appearances == [{'from': '2026-10-01T10:00:00', 'to': '2026-10-01T10:10:00'}]
+    
+    scheduler.stop()
+    assert _state(storage)[2] == 2
+
+
+def test_change_flushes_previous_unchanged_range(scheduler):
+    storage = scheduler.storage_service
+    scheduler.publish(make_snapshot('2026-10-01T10:00:00'))
+    scheduler.publish(make_snapshot('2026-10-01T10:05:00'))
+    
+    assert scheduler.publish(make_snapshot('2026-10-01T10:10:00', title='INEGI 2026'))
+    
+    last_seen, seen_count, samples, appearances = _state(storage)
+    assert last_seen == '2026-10-01T10:10:00'
+    assert seen_count == 2
+    assert samples == 3
+    assert appearances == [{'from': '2026-10-01T10:00:00', 'to': '2026-10-01T10:10:00'}]
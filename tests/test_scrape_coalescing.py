@@ -0,0 +1,74 @@
+"""
+Scraping manual: una sola ejecución compartida, ventana de frescura y límite por cliente
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.rate_limit import TokenBucketLimiter
+from helpers import make_snapshot
+
+
+class SlowScraper:
+    """Scraper sin red que espera a que la prueba lo libere"""
+    
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+    
+    def scrape_homepage(self):
+        self.calls += 1
+        self.release.wait(5)
+        return make_snapshot('2026-10-01T10:00:00', title=f'INEGI {self.calls}')
+
+
+def test_concurrent_manual_scrapes_share_one_run(scheduler):
+    scheduler.scraper_service = scraper = SlowScraper()
+    scraper.release.clear()
+    
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(scheduler.scrape_now, 0)]
+        while not scraper.calls:
+            time.sleep(0.01)
+        futures += [pool.submit(scheduler.scrape_now, 0) for _ in range(2)]
+        time.sleep(0.05)
+        scraper.release.set()
+        results = [future.result() for future in futures]
+    
+    assert scraper.calls == 1
+    assert sorted(source for _, source in results) == ['coalesced', 'coalesced', 'scrape']
+    assert results[1][0] is results[0][0]
+    assert scheduler.runs_coalesced == 2
+
+
+def test_recent_result_is_reused_within_freshness_window(scheduler):
+    scheduler.scraper_service = scraper = SlowScraper()
+    
+    data, source = scheduler.scrape_now(max_age=60)
+    assert source == 'scrape'
+    assert scheduler.scrape_now(max_age=60) == (data, 'fresh')
+    assert scheduler.scrape_now(max_age=0)[1] == 'scrape'
+    assert scraper.calls == 2
+
+
+def test_scrape_route_is_rate_limited_per_client(scheduler, client):
+    scheduler.scraper_service = SlowScraper()
+    
+    sources = [client.get('/api/scrape').get_json()['source'] for _ in range(3)]
+    limited = client.get('/api/scrape')
+    
+    assert sources == ['scrape', 'fresh', 'fresh']
+    assert limited.status_code == 429
+    assert int(limited.headers['Retry-After']) >= 1
+    other = client.get('/api/scrape', environ_base={'REMOTE_ADDR': '10.0.0.2'})
+    assert other.status_code == 200
+
+
+def test_idle_buckets_are_pruned():
+    limiter = TokenBucketLimiter(rate=1000, burst=1, max_clients=2)
+    for client in ('a', 'b', 'c'):
+        assert limiter.consume(client)[0]
+    time.sleep(0.01)
+    
+    limiter.consume('d')
+    assert set(limiter._buckets) == {'d'}
@@ -0,0 +1,85 @@
+"""
+Trabajos de scraping: 202 con ID, estado consultable desde otro proceso, cola acotada
+"""
+import threading
+import time
+from services import JobService
+from helpers import make_snapshot
+
+
+class StubScraper:
+    """Scraper sin red; `release` permite retenerlo y `fail` simula un error"""
+    
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.release = threading.Event()
+        self.release.set()
+    
+    def scrape_homepage(self):
+        self.release.wait(5)
+        if self.fail:
+            raise RuntimeError('sin red')
+        return make_snapshot('2026-10-01T10:00:00')
+
+
+def _wait(jobs, job_id):
+    for _ in range(500):
+        job = jobs.get_job(job_id)
+        if job['status'] not in ('queued', 'running'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f'Trabajo {job_id} sin terminar')
+
+
+def test_post_scrape_returns_job_that_completes(scheduler, client, job_service):
+    scheduler.scraper_service = StubScraper()
+    
+    response = client.post('/api/scrape')
+    assert response.status_code == 202
+    job_id = response.get_json()['job_id']
+    assert response.headers['Location'] == f'/api/jobs/{job_id}'
+    
+    job = _wait(job_service, job_id)
+    assert job['status'] == 'succeeded'
+    assert job['source'] == 'scrape'
+    assert job['result']['timestamp'] == '2026-10-01T10:00:00'
+    assert job['phases']['total'] > 0
+    assert client.get(f'/api/jobs/{job_id}').get_json()['job']['status'] == 'succeeded'
+    assert 'result' not in client.get('/api/jobs').get_json()['jobs'][0]
+    
+    # Otro proceso (otra instancia) lo lee del directorio de trabajos
+    other = JobService(scheduler)
+    assert other.get_job(job_id)['status'] == 'succeeded'
+    other.shutdown()
+
+
+def test_unknown_or_invalid_job_is_404(client):
+    assert client.get('/api/jobs/abc123').status_code == 404
+    assert client.get('/api/jobs/..%2Fjobs').status_code == 404
+
+
+def test_failed_scrape_is_reported(scheduler, job_service):
+    scheduler.scraper_service = StubScraper(fail=True)
+    
+    job = _wait(job_service, job_service.submit_scrape()['id'])
+    
+    assert job['status'] == 'failed'
+    assert job['error'] == 'sin red'
+
+
+def test_queue_is_bounded_and_history_evicted(scheduler):
+    scheduler.scraper_service = scraper = StubScraper()
+    scraper.release.clear()
+    jobs = JobService(scheduler, max_workers=1, max_pending=1, history_size=1)
+    
+    first = jobs.submit_scrape()
+    assert jobs.submit_scrape() is None
+    
+    scraper.release.set()
+    _wait(jobs, first['id'])
+    second = jobs.submit_scrape()
+    _wait(jobs, second['id'])
+    jobs.shutdown(wait=True)
+    
+    assert jobs.get_job(first['id']) is None
+    assert jobs.get_job(second['id'])['status'] == 'succeeded'
@@ -0,0 +1,101 @@
+"""
+Índice de búsqueda: normalización, rangos de aparición, compactación y journal compartido
+"""
+import os
+import pytest
+from services.search_index import SearchIndex, tokenize
+
+BASE = 1_790_000_000
+
+CENSO = {'title': 'Resultados del Censo de Población 2020', 'url': 'https://www.inegi.org.mx/censo', 'date': '2026-10-01'}
+ENOE = {'title': 'Encuesta Nacional de Ocupación y Empleo', 'url': 'https://www.inegi.org.mx/enoe', 'date': '2026-10-02'}
+
+
+def _snapshot(ts, *news):
+    return {
+        'timestamp': ts,
+        'latest_news': list(news),
+        'main_sections': [{'name': 'Estadísticas', 'url': 'https://www.inegi.org.mx/datos/'}],
+        'important_links': []
+    }
+
+
+def _titles(index, query, **kwargs):
+    return [r['text'] for r in index.search(query, **kwargs)['results']]
+
+
+def test_tokenize_strips_accents_stopwords_and_plurals():
+    assert tokenize('Población de los Indicadores') == ['poblacion', 'indicador']
+    assert tokenize('Encuestas.pdf') == ['encuesta']
+
+
+def test_search_ignores_accents_and_plurals(tmp_path):
+    index = SearchIndex(str(tmp_path / 'search'))
+    assert index.index_snapshot(_snapshot(BASE, CENSO, ENOE)) == 3
+    
+    assert _titles(index, 'POBLACION') == [CENSO['title']]
+    assert _titles(index, 'encuestas ocupación') == [ENOE['title']]
+    assert _titles(index, 'censo empleo') == []
+    assert _titles(index, 'estadisticas', types=['news']) == []
+    with pytest.raises(ValueError):
+        index.search('de la')
+
+
+def test_ranges_extend_and_reopen(tmp_path):
+    index = SearchIndex(str(tmp_path / 'search'))
+    index.index_snapshot(_snapshot(BASE, CENSO, ENOE))
+    assert index.index_snapshot(_snapshot(BASE + 300, CENSO, ENOE)) == 0
+    index.index_snapshot(_snapshot(BASE + 600, ENOE))
+    index.index_snapshot(_snapshot(BASE + 900, CENSO, ENOE))
+    assert index.index_snapshot(_snapshot(BASE + 900, CENSO)) == 0  # Ya indexado
+    
+    censo = index.search('censo')['results'][0]
+    assert len(censo['appearances']) == 2
+    enoe = index.search('ocupacion')['results'][0]
+    assert len(enoe['appearances']) == 1
+    assert enoe['first_seen'] == censo['first_seen']
+    assert enoe['last_seen'] == censo['last_seen']
+    
+    # El hueco de BASE + 600 queda fuera de ambos rangos de CENSO
+    assert index.search('censo', start=BASE + 500, end=BASE + 700)['total'] == 0
+    assert index.search('censo', start=BASE + 500, end=BASE + 900)['total'] == 1
+
+
+def test_compaction_keeps_results(tmp_path):
+    directory = str(tmp_path / 'search')
+    index = SearchIndex(directory, compact_every=2)
+    index.index_snapshot(_snapshot(BASE, CENSO))
+    index.index_snapshot(_snapshot(BASE + 300, CENSO, ENOE))
+    
+    assert os.path.exists(index.state_path)
+    assert os.path.getsize(index.journal_path) == 0
+    index.index_snapshot(_snapshot(BASE + 600, CENSO))
+    
+    reloaded = SearchIndex(directory, compact_every=2)
+    assert reloaded.stats() == index.stats()
+    assert reloaded.stats()['snapshots'] == 3
+    assert reloaded.search('censo')['results'] == index.search('censo')['results']
+    assert reloaded.search('censo')['results'][0]['appearances'][0]['to'] == reloaded.stats()['last_indexed']
+
+
+def test_other_instance_replays_journal_after_compaction(tmp_path):
+    directory = str(tmp_path / 'search')
+    writer = SearchIndex(directory, compact_every=2)
+    reader = SearchIndex(directory, compact_every=2)
+    
+    writer.index_snapshot(_snapshot(BASE, CENSO))
+    assert _titles(reader, 'censo') == [CENSO['title']]  # Línea nueva del journal
+    
+    inode = reader._state_inode
+    writer.index_snapshot(_snapshot(BASE + 300, CENSO, ENOE))  # Compacta: estado nuevo, journal vacío
+    writer.index_snapshot(_snapshot(BASE + 600, ENOE))
+    assert writer._state_inode != inode
+    
+    assert _titles(reader, 'empleo') == [ENOE['title']]
+    assert reader.stats() == writer.stats()
+    assert reader.search('ocupacion')['results'] == writer.search('ocupacion')['results']
+    
+    # El lector también puede indexar sin repetir secuencias
+    assert reader.index_snapshot(_snapshot(BASE + 900, CENSO, ENOE)) == 0
+    assert writer.stats()['snapshots'] == 4
+    assert len(writer.search('censo')['results'][0]['appearances']) == 2
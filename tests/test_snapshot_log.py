@@ -0,0 +1,77 @@
+"""
+Log de snapshots: lecturas por instante, rangos, rotación de segmentos y reparación del índice
+"""
+from services.snapshot_log import SnapshotLog
+from helpers import make_snapshot
+
+
+def _log(tmp_path, **kwargs):
+    return SnapshotLog(str(tmp_path / 'snapshots'), **kwargs)
+
+
+def test_time_travel_and_ranges(tmp_path):
+    log = _log(tmp_path)
+    for minute in range(0, 30, 5):
+        log.append(make_snapshot(f'2026-10-01T10:{minute:02d}:00', title=f'INEGI {minute}'))
+    
+    assert log.count() == 6
+    assert log.get_at('2026-10-01T09:59:59') is None
+    assert log.get_at('2026-10-01T10:07:00')['title'] == 'INEGI 5'
+    assert log.get_at('2026-10-01T10:10:00')['title'] == 'INEGI 10'
+    
+    page = log.history('2026-10-01T10:05:00', '2026-10-01T10:20:00', limit=2, offset=1)
+    assert page['total'] == 4
+    assert [s['title'] for s in page['snapshots']] == ['INEGI 10', 'INEGI 15']
+    log.close()
+
+
+def test_segments_rotate_by_size_and_day(tmp_path):
+    log = _log(tmp_path, segment_max_bytes=1)
+    log.append(make_snapshot('2026-10-01T10:00:00'))
+    log.append(make_snapshot('2026-10-01T10:05:00'))
+    log.append(make_snapshot('2026-10-02T00:00:00'))
+    
+    segments = sorted(p.name for p in (tmp_path / 'snapshots').glob('segment-*.jsonl'))
+    assert segments == ['segment-000000.jsonl', 'segment-000001.jsonl', 'segment-000002.jsonl']
+    assert log.get_at('2026-10-01T10:06:00')['timestamp'] == '2026-10-01T10:05:00'
+    log.close()
+
+
+def test_clock_going_back_keeps_index_sorted(tmp_path):
+    log = _log(tmp_path)
+    first = log.append(make_snapshot('2026-10-01T10:05:00'))
+    
+    # Un timestamp anterior se indexa con el último para que la búsqueda binaria siga siendo válida
+    assert log.append(make_snapshot('2026-10-01T10:00:00', title='INEGI tardío')) == first
+    assert log.get_at('2026-10-01T10:05:00')['title'] == 'INEGI tardío'
+    assert log.history(end='2026-10-01T10:05:00')['total'] == 2
+    log.close()
+
+
+def test_truncated_index_record_is_repaired(tmp_path):
+    log = _log(tmp_path)
+    log.append(make_snapshot('2026-10-01T10:00:00'))
+    log.append(make_snapshot('2026-10-01T10:05:00'))
+    log.close()
+    
+    # Escritura interrumpida: registro del índice a medias
+    with open(log.index_path, 'ab') as f:
+        f.write(b'\x00' * (SnapshotLog.RECORD_SIZE // 2))
+    
+    reopened = _log(tmp_path)
+    assert reopened.count() == 2
+    reopened.append(make_snapshot('2026-10-01T10:10:00'))
+    assert reopened.get_at('2026-10-01T10:10:00')['timestamp'] == '2026-10-01T10:10:00'
+    reopened.close()
+
+
+def test_index_record_past_segment_end_is_dropped(tmp_path):
+    log = _log(tmp_path)
+    log.append(make_snapshot('2026-10-01T10:00:00'))
+    log.close()
+    
+    # El registro del índice llegó al disco pero la línea del segmento no
+    with open(log.index_path, 'ab') as f:
+        f.write(SnapshotLog.RECORD.pack(2e9, 0, 10 ** 6, 100))
+    
+    assert _log(tmp_path).count() == 1
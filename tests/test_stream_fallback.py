@@ -0,0 +1,71 @@
+"""
+/api/stream servido desde Flask (sin STREAM_PORT)
+"""
+import time
+import pytest
+from config import Config
+from services import EventBroker
+from helpers import make_snapshot
+
+
+@pytest.fixture
+def no_stream_server(monkeypatch):
+    monkeypatch.setattr(Config, 'STREAM_PORT', None)
+    monkeypatch.setattr(Config, 'STREAM_FALLBACK_SECONDS', 0)
+
+
+def test_sync_worker_gets_polling_guidance(client, no_stream_server):
+    response = client.get('/api/stream')
+    assert response.status_code == 503
+    assert '/api/data' in response.get_json()['message']
+    assert 'Retry-After' in response.headers
+
+
+def test_threaded_worker_streams_and_closes(scheduler, client, no_stream_server):
+    scheduler.event_broker = EventBroker()
+    scheduler.publish(make_snapshot('2026-10-01T10:00:00'))
+    
+    response = client.get('/api/stream', environ_overrides={'wsgi.multithread': True})
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/event-stream')
+    body = response.get_data()
+    assert body.startswith(b'retry: ')
+    assert b'event: snapshot' in body
+
+
+def test_procfile_serves_stream_on_main_port():
+    with open('Procfile') as f:
+        procfile = f.read()
+    timeout = int(procfile.split('--timeout', 1)[1].split()[0])
+    assert '--worker-class services.stream_worker.StreamThreadWorker' in procfile
+    assert Config.STREAM_FALLBACK_SECONDS * 2 <= timeout
+
+
+@pytest.mark.parametrize('host, expected', [
+    ('example.com:5000', 'http://example.com:8081/api/stream'),
+    ('[::1]:5000', 'http://[::1]:8081/api/stream'),
+    ('[2001:db8::1]', 'http://[2001:db8::1]:8081/api/stream'),
+])
+def test_stream_port_redirect_keeps_host(client, monkeypatch, host, expected):
+    monkeypatch.setattr(Config, 'STREAM_PORT', 8081)
+    monkeypatch.setattr(Config, 'STREAM_PUBLIC_URL', None)
+    response = client.get('/api/stream', headers={'Host': host})
+    assert response.status_code == 307
+    assert response.headers['Location'] == expected
+
+
+def test_handoff_server_polls_shared_version(monkeypatch):
+    from services import StreamServer
+    monkeypatch.setattr(Config, 'STREAM_POLL_SECONDS', 0.01)
+    polled = []
+    server = StreamServer(EventBroker(), listen=False, poll=lambda: polled.append(1))
+    server.start()
+    try:
+        for _ in range(100):
+            if len(polled) >= 2:
+                break
+            time.sleep(0.01)
+        assert len(polled) >= 2
+        assert server.stats()['port'] is None
+    finally:
+        server.stop()
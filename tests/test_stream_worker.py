@@ -0,0 +1,79 @@
+"""
+/api/stream en el puerto principal con gunicorn y StreamThreadWorker
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+import pytest
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLIENTS = 20  # Más que hilos del worker: cada stream no puede ocupar uno
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def gunicorn():
+    pytest.importorskip('gunicorn')
+    port = _free_port()
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.path.join(ROOT, 'tests')]))
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'stream_app:app', '--workers', '1', '--threads', '2',
+         '--worker-class', 'services.stream_worker.StreamThreadWorker', '--bind', f'127.0.0.1:{port}'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        for _ in range(100):
+            try:
+                requests.get(f'{base_url}/ping', timeout=1)
+                break
+            except requests.ConnectionError:
+                time.sleep(0.1)
+        yield port, base_url
+    finally:
+        process.terminate()
+        process.wait(10)
+
+
+def _open_stream(port):
+    sock = socket.create_connection(('127.0.0.1', port), timeout=5)
+    sock.sendall(b'GET /api/stream HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n')
+    return sock
+
+
+def _read_until(sock, marker):
+    data = b''
+    while marker not in data:
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def test_streams_do_not_hold_worker_threads(gunicorn):
+    port, base_url = gunicorn
+    clients = [_open_stream(port) for _ in range(CLIENTS)]
+    try:
+        for sock in clients:
+            head = _read_until(sock, b'retry: ')
+            assert head.startswith(b'HTTP/1.1 200 OK')
+            assert b'text/event-stream' in head
+        
+        # Los 2 hilos siguen libres para las demás rutas
+        assert requests.get(f'{base_url}/ping', timeout=2).status_code == 200
+        
+        requests.post(f'{base_url}/publish', timeout=2)
+        for sock in clients:
+            assert b'event: snapshot' in _read_until(sock, b'event: snapshot')
+    finally:
+        for sock in clients:
+            sock.close()
@@ -0,0 +1,94 @@
+"""
+Objetivos: prioridad en la cola de listos, límite global de descargas y sin superposición
+"""
+import threading
+import time
+import pytest
+from config import Config
+from services import TargetRegistry, TargetScheduler
+from helpers import make_snapshot
+
+
+class RecordingScraper:
+    """scrape_page sin red: registra el orden y la concurrencia máxima; `gate` retiene una URL"""
+    
+    def __init__(self, delay=0.0, gate_url=None):
+        self.delay = delay
+        self.gate_url = gate_url
+        self.gate = threading.Event()
+        self.order = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+    
+    def scrape_page(self, url):
+        with self._lock:
+            self.order.append(url.rsplit('/', 1)[1])
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        if url == self.gate_url:
+            self.gate.wait(5)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return {**make_snapshot('2026-10-01T10:00:00'), 'url': url}
+
+
+def _target(target_id, priority):
+    return {'id': target_id, 'url': f'https://www.inegi.org.mx/{target_id}', 'interval_minutes': 60, 'priority': priority}
+
+
+def _wait_for(condition):
+    for _ in range(500):
+        if condition():
+            return
+        time.sleep(0.01)
+    raise AssertionError('condición no alcanzada')
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return TargetRegistry(str(tmp_path / 'targets.json'), seed_path=str(tmp_path / 'sin-semilla.json'))
+
+
+def test_ready_targets_run_by_priority(registry, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'TARGET_START_SPREAD_SECONDS', 0)
+    registry.add(_target('lenta', 5))
+    scraper = RecordingScraper(gate_url='https://www.inegi.org.mx/lenta')
+    targets = TargetScheduler(scraper, registry, max_workers=1, state_dir=str(tmp_path / 'state'))
+    targets.start()
+    _wait_for(lambda: scraper.order == ['lenta'])
+    
+    # Encolados mientras el único hilo está ocupado: primero el menos urgente
+    monkeypatch.setattr(Config, 'TARGET_START_SPREAD_SECONDS', 3600)
+    registry.add(_target('calendario', 9))
+    registry.add(_target('comunicados', 1))
+    assert targets.run_now('calendario') and targets.run_now('comunicados')
+    assert not targets.run_now('lenta')
+    assert targets.get_status()['queued'] == 2
+    
+    scraper.gate.set()
+    _wait_for(lambda: len(scraper.order) == 3)
+    targets.stop()
+    
+    assert scraper.order == ['lenta', 'comunicados', 'calendario']
+
+
+def test_global_worker_cap(registry, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'TARGET_START_SPREAD_SECONDS', 0)
+    for i in range(6):
+        registry.add(_target(f'objetivo-{i}', i % 3))
+    scraper = RecordingScraper(delay=0.05)
+    targets = TargetScheduler(scraper, registry, max_workers=2, state_dir=str(tmp_path / 'state'))
+    targets.start()
+    _wait_for(lambda: all((targets.get_state(f'objetivo-{i}') or {}).get('runs') == 1 for i in range(6)))
+    targets.stop()
+    
+    assert scraper.max_active == 2
+    assert sorted(scraper.order) == sorted(f'objetivo-{i}' for i in range(6))
+    
+    # El estado de cada objetivo queda en disco para los demás procesos
+    other = TargetScheduler(scraper, registry, state_dir=str(tmp_path / 'state'))
+    state = other.get_state('objetivo-0')
+    assert state['last_result'] == 'success' and state['changes'] == 1
+    assert state['data']['url'] == 'https://www.inegi.org.mx/objetivo-0'
@@ -1,3 +1,11 @@
 """
 Utilidades
 """
+from .fingerprint import content_fingerprint, data_fingerprint
+from .precompressed import PrecompressedJSON
+from .rate_limit import TokenBucketLimiter
+from .timing import collect_phases, phase, record_phase
+from .metrics import REGISTRY as METRICS
+from .log import get_logger, run_context, current_run_id, logging_stats
+
+__all__ = ['content_fingerprint', 'data_fingerprint', 'PrecompressedJSON', 'TokenBucketLimiter', 'collect_phases', 'phase', 'record_phase', 'METRICS', 'get_logger', 'run_context', 'current_run_id', 'logging_stats']
@@ -0,0 +1,41 @@
+"""
+Huellas de contenido para detectar cambios entre ejecuciones
+"""
+import hashlib
+import json
+import re
+
+_WHITESPACE = re.compile(rb'\s+')
+
+# Campos que cambian en cada ejecución aunque el contenido sea el mismo
+VOLATILE_FIELDS = ('timestamp', 'not_modified', 'content_hash', 'last_checked')
+
+
+def content_fingerprint(body):
+    """
+    Huella del cuerpo HTTP con espacios en blanco normalizados
+    
+    Args:
+        body (bytes): Cuerpo de la respuesta
+        
+    Returns:
+        str: SHA-256 hexadecimal
+    """
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return hashlib.sha256(_WHITESPACE.sub(b' ', body).strip()).hexdigest()
+
+
+def data_fingerprint(data):
+    """
+    Huella semántica de un resultado de scraping (ignora campos volátiles)
+    
+    Args:
+        data (dict): Resultado de ScraperService
+        
+    Returns:
+        str: SHA-256 hexadecimal
+    """
+    stable = {k: v for k, v in data.items() if k not in VOLATILE_FIELDS}
+    serialized = json.dumps(stable, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
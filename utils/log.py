@@ -0,0 +1,293 @@
+"""
+Logging estructurado sin bloqueo: cola en memoria, JSON por línea, ID de ejecución y muestreo
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+ROOT_LOGGER = 'inegi'
+
+# ID de la ejecución actual (scraping, trabajo, objetivo...) para correlacionar registros
+_current_run_id = ContextVar('current_run_id', default=None)
+
+# Atributos propios de LogRecord: el resto viene de extra={...} y se exporta como campo
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'run_id', 'sampled'}
+
+_state = {'handler': None, 'listener': None, 'options': None}
+_configure_lock = threading.Lock()
+
+
+def get_logger(name):
+    """
+    Logger de un servicio (configura el logging la primera vez)
+    
+    Args:
+        name (str): Nombre del servicio (ScraperService, API...)
+    
+    Returns:
+        logging.Logger: Logger 'inegi.<name>'
+    """
+    if _state['handler'] is None:
+        configure_logging()
+    return logging.getLogger(f'{ROOT_LOGGER}.{name}')
+
+
+def new_run_id():
+    """ID corto y único para una ejecución"""
+    return uuid.uuid4().hex[:12]
+
+
+def current_run_id():
+    """ID de la ejecución en curso o None"""
+    return _current_run_id.get()
+
+
+@contextmanager
+def run_context(run_id=None):
+    """
+    Asocia los registros emitidos dentro del bloque (en este hilo o tarea) a un ID
+    
+    Args:
+        run_id (str): ID a usar (por defecto, uno nuevo)
+    
+    Yields:
+        str: ID de la ejecución
+    """
+    run_id = run_id or new_run_id()
+    token = _current_run_id.set(run_id)
+    try:
+        yield run_id
+    finally:
+        _current_run_id.reset(token)
+
+
+class JsonFormatter(logging.Formatter):
+    """Un objeto JSON por línea: ts, level, service, msg, run_id y campos de extra"""
+    
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'service': record.name.rpartition('.')[2],
+            'msg': record.getMessage()
+        }
+        run_id = getattr(record, 'run_id', None)
+        if run_id:
+            entry['run_id'] = run_id
+        sampled = getattr(record, 'sampled', None)
+        if sampled:
+            entry['sampled'] = sampled
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Formato legible para desarrollo local: [fecha] [Servicio] mensaje (run_id)"""
+    
+    def format(self, record):
+        line = f"[{datetime.fromtimestamp(record.created)}] [{record.name.rpartition('.')[2]}] {record.getMessage()}"
+        run_id = getattr(record, 'run_id', None)
+        if run_id:
+            line += f' (run {run_id})'
+        sampled = getattr(record, 'sampled', None)
+        if sampled:
+            line += f' [+{sampled} similares omitidos]'
+        if record.exc_text:
+            line += '\n' + record.exc_text
+        return line
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Limita mensajes repetitivos: por plantilla de mensaje, los primeros `burst`
+    de cada ventana pasan y después solo 1 de cada `every`
+    
+    WARNING y superiores nunca se muestrean. El registro que pasa tras omitir
+    otros lleva `sampled` con el número de omitidos.
+    """
+    
+    def __init__(self, burst=20, window=60.0, every=100):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.every = every
+        self._counters = {}  # (logger, plantilla) → [inicio de ventana, vistos, omitidos]
+        self._lock = threading.Lock()
+    
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.burst:
+            return True
+        
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None or now - counter[0] >= self.window:
+                if len(self._counters) > 10000:
+                    self._counters.clear()
+                skipped = counter[2] if counter else 0
+                counter = self._counters[key] = [now, 0, 0]
+                if skipped:
+                    record.sampled = skipped
+            counter[1] += 1
+            seen = counter[1]
+            if seen <= self.burst or (seen - self.burst) % self.every == 0:
+                if counter[2]:
+                    record.sampled = counter[2]
+                    counter[2] = 0
+                return True
+            counter[2] += 1
+            return False
+
+
+class _ContextFilter(logging.Filter):
+    """Agrega el ID de ejecución en el hilo que emite (antes de pasar a la cola)"""
+    
+    def filter(self, record):
+        record.run_id = _current_run_id.get()
+        return True
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que descarta (y cuenta) registros si la cola está llena en vez de bloquear"""
+    
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+    
+    def prepare(self, record):
+        # Como QueueHandler.prepare, pero sin aplicar el formatter en este hilo: solo se
+        # resuelven los argumentos y la traza (el registro no cambia si los objetos cambian)
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(level=None, fmt=None, queue_size=None, sample_burst=None,
+                      sample_window=None, sample_every=None, stream=None):
+    """
+    Configura el logging de la aplicación (idempotente; los argumentos omitidos salen de Config)
+    
+    Los servicios solo encolan registros; un hilo aparte los formatea y escribe,
+    así un stdout lento (log drain de Heroku) nunca detiene un worker. Si la cola
+    se llena, los registros nuevos se descartan y se cuentan.
+    
+    Args:
+        level (str): Nivel mínimo (DEBUG, INFO, WARNING...)
+        fmt (str): 'json' o 'text'
+        queue_size (int): Registros pendientes antes de descartar
+        sample_burst (int): Mensajes iguales permitidos por ventana antes de muestrear (0 = sin muestreo)
+        sample_window (float): Segundos de la ventana de muestreo
+        sample_every (int): Tras el burst, dejar pasar 1 de cada N
+        stream: Destino (por defecto sys.stdout)
+    
+    Returns:
+        logging.Logger: Logger raíz de la aplicación
+    """
+    from config import Config
+    
+    options = {
+        'level': (level or Config.LOG_LEVEL).upper(),
+        'fmt': fmt or Config.LOG_FORMAT,
+        'queue_size': queue_size or Config.LOG_QUEUE_SIZE,
+        'sample_burst': Config.LOG_SAMPLE_BURST if sample_burst is None else sample_burst,
+        'sample_window': sample_window or Config.LOG_SAMPLE_WINDOW_SECONDS,
+        'sample_every': sample_every or Config.LOG_SAMPLE_EVERY,
+        'stream': stream or sys.stdout
+    }
+    
+    with _configure_lock:
+        _stop_listener()
+        root = logging.getLogger(ROOT_LOGGER)
+        if _state['handler'] is not None:
+            root.removeHandler(_state['handler'])
+        
+        handler = _NonBlockingQueueHandler(queue.Queue(options['queue_size']))
+        handler.addFilter(SamplingFilter(options['sample_burst'], options['sample_window'], options['sample_every']))
+        handler.addFilter(_ContextFilter())
+        
+        root.setLevel(options['level'])
+        root.addHandler(handler)
+        root.propagate = False
+        
+        _state['handler'] = handler
+        _state['options'] = options
+        _start_listener()
+    return root
+
+
+def logging_stats():
+    """
+    Estado de la cola de logging
+    
+    Returns:
+        dict: Registros pendientes y descartados por cola llena
+    """
+    handler = _state['handler']
+    if handler is None:
+        return {'pending': 0, 'dropped': 0}
+    return {'pending': handler.queue.qsize(), 'dropped': handler.dropped}
+
+
+def shutdown_logging():
+    """Escribe los registros pendientes y detiene el hilo escritor (al terminar el proceso)"""
+    with _configure_lock:
+        _stop_listener()
+
+
+def _start_listener():
+    options = _state['options']
+    output = logging.StreamHandler(options['stream'])
+    output.setFormatter(JsonFormatter() if options['fmt'] == 'json' else TextFormatter())
+    listener = logging.handlers.QueueListener(_state['handler'].queue, output)
+    listener.start()
+    _state['listener'] = listener
+
+
+def _stop_listener():
+    listener = _state['listener']
+    if listener is not None:
+        listener.stop()  # Procesa lo pendiente antes de terminar
+        _state['listener'] = None
+
+
+def _restart_after_fork():
+    """El hilo escritor no sobrevive a fork (gunicorn --preload): cola e hilo nuevos en el hijo"""
+    global _configure_lock
+    _configure_lock = threading.Lock()
+    handler = _state['handler']
+    if handler is None:
+        return
+    handler.queue = queue.Queue(_state['options']['queue_size'])
+    handler.dropped = 0
+    _state['listener'] = None
+    _start_listener()
+
+
+atexit.register(shutdown_logging)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_after_fork)
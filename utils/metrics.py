@@ -0,0 +1,283 @@
+"""
+Métricas en proceso (contadores e histogramas) con exportación en formato Prometheus
+"""
+import bisect
+import json
+import math
+import os
+import threading
+import time
+
+# Segundos: de 1 ms a 1 minuto
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Bytes: de 1 KB a 64 MB
+BYTES_BUCKETS = tuple(1024 * 4 ** i for i in range(9))
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Counter:
+    """Contador monótono con etiquetas"""
+    
+    kind = 'counter'
+    
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount=1, **labels):
+        """Incrementa el contador para una combinación de etiquetas"""
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def export(self):
+        with self._lock:
+            return {json.dumps(key): value for key, value in self._values.items()}
+    
+    def merge(self, exported):
+        with self._lock:
+            for key, value in exported.items():
+                key = tuple(json.loads(key))
+                self._values[key] = self._values.get(key, 0) + value
+    
+    def render(self):
+        lines = []
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}')
+        return lines
+
+
+class Histogram:
+    """Histograma acumulativo con buckets fijos (p50/p99 con histogram_quantile)"""
+    
+    kind = 'histogram'
+    
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # etiquetas → [conteo por bucket..., +Inf, suma]
+        self._lock = threading.Lock()
+    
+    def observe(self, value, **labels):
+        """Registra una observación"""
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+    
+    def export(self):
+        with self._lock:
+            return {json.dumps(key): list(series) for key, series in self._values.items()}
+    
+    def merge(self, exported):
+        with self._lock:
+            for key, series in exported.items():
+                key = tuple(json.loads(key))
+                if len(series) != len(self.buckets) + 2:
+                    continue  # Buckets distintos (otra versión del código)
+                current = self._values.setdefault(key, [0] * len(series))
+                for i, value in enumerate(series):
+                    current[i] += value
+    
+    def render(self):
+        lines = []
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series[:-1]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(bound)))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(series[-1])}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """Conjunto de métricas del proceso"""
+    
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._last_dump = None
+    
+    def _reset_after_fork(self):
+        """Vacía los valores en el proceso hijo (los candados se recrean: otro hilo del padre podía tenerlos)"""
+        self._lock = threading.Lock()
+        self._last_dump = None
+        for metric in self._metrics.values():
+            metric._lock = threading.Lock()
+            metric._values = {}
+    
+    def counter(self, name, documentation, labelnames=()):
+        """Obtiene (o crea) un contador"""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+    
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Obtiene (o crea) un histograma"""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+    
+    def export(self):
+        """
+        Estado serializable de todas las métricas (para combinar entre procesos)
+        
+        Returns:
+            dict: {nombre: {kind, documentation, labelnames, buckets, values}}
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: {
+                'kind': metric.kind,
+                'documentation': metric.documentation,
+                'labelnames': list(metric.labelnames),
+                'buckets': list(getattr(metric, 'buckets', ())),
+                'values': metric.export()
+            }
+            for metric in metrics
+        }
+    
+    def render(self, others=()):
+        """
+        Texto en formato de exposición de Prometheus
+        
+        Args:
+            others (iterable): Estados export() de otros procesos a sumar
+        
+        Returns:
+            str: Métricas en formato text/plain; version=0.0.4
+        """
+        combined = MetricsRegistry()
+        for state in (self.export(), *others):
+            for name, metric in state.items():
+                if metric['kind'] == 'histogram':
+                    target = combined.histogram(name, metric['documentation'], metric['labelnames'], metric['buckets'])
+                else:
+                    target = combined.counter(name, metric['documentation'], metric['labelnames'])
+                target.merge(metric['values'])
+        
+        lines = []
+        for name in sorted(combined._metrics):
+            metric = combined._metrics[name]
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+    
+    def dump(self, directory):
+        """Guarda el estado de este proceso en <directorio>/<pid>.json"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.export(), f)
+        os.replace(tmp_path, path)
+    
+    def dump_if_due(self, directory, interval):
+        """
+        Guarda el estado si pasaron al menos interval segundos desde la última vez
+        
+        Returns:
+            bool: True si se guardó
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._last_dump is not None and now - self._last_dump < interval:
+                return False
+            self._last_dump = now
+        self.dump(directory)
+        return True
+    
+    def load_others(self, directory):
+        """
+        Estados guardados por otros procesos vivos (los de procesos terminados se eliminan)
+        
+        Returns:
+            list: Estados export() de otros procesos
+        """
+        states = []
+        if not os.path.isdir(directory):
+            return states
+        
+        for name in os.listdir(directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                pid = int(name[:-5])
+            except ValueError:
+                continue
+            if pid == os.getpid():
+                continue
+            path = os.path.join(directory, name)
+            if not _pid_alive(pid):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    states.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return states
+    
+    def _get_or_create(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            return metric
+
+
+def _pid_alive(pid):
+    if os.name == 'nt':
+        return True  # os.kill(pid, 0) terminaría el proceso en Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+# Registro global del proceso
+REGISTRY = MetricsRegistry()
+
+# Los workers creados con fork (gunicorn --preload) no heredan los valores del
+# proceso padre; si no, se sumarían dos veces al combinar procesos
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=REGISTRY._reset_after_fork)
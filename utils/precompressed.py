@@ -0,0 +1,144 @@
+"""
+Respuestas JSON serializadas y comprimidas una sola vez
+"""
+import gzip
+import hashlib
+import json
+import struct
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+# Orden de preferencia cuando el cliente acepta varias codificaciones con igual calidad
+ENCODINGS = ('br', 'gzip', 'identity')
+
+# Formato binario: magia, hash (32 bytes ASCII) y longitud de cada variante
+_HEADER = struct.Struct('<4s32sQQQ')
+_MAGIC = b'PJS1'
+
+
+class PrecompressedJSON:
+    """
+    Cuerpo JSON listo para servir: bytes, variantes gzip/brotli y ETag fuerte
+    
+    Cada variante tiene su propio ETag ("<hash>", "<hash>-gzip", "<hash>-br")
+    porque los bytes transmitidos son distintos; If-None-Match acepta cualquiera.
+    """
+    
+    def __init__(self, payload, gzip_level=6, brotli_quality=5):
+        """
+        Serializa y comprime el payload
+        
+        Args:
+            payload (dict): Objeto a serializar
+            gzip_level (int): Nivel de compresión gzip
+            brotli_quality (int): Calidad de compresión brotli
+        """
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self._payload = payload
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        self.variants = {
+            'identity': body,
+            'gzip': gzip.compress(body, compresslevel=gzip_level, mtime=0)
+        }
+        if brotli is not None:
+            self.variants['br'] = brotli.compress(body, quality=brotli_quality)
+    
+    @classmethod
+    def from_buffer(cls, buffer):
+        """
+        Reconstruye una respuesta desde to_bytes() sin copiar las variantes
+        
+        Args:
+            buffer: bytes, mmap o memoryview con el formato de to_bytes()
+        
+        Returns:
+            PrecompressedJSON: Variantes como memoryview sobre el buffer
+        
+        Raises:
+            ValueError: Si el buffer no tiene el formato esperado
+        """
+        view = memoryview(buffer)
+        if len(view) < _HEADER.size:
+            raise ValueError('Buffer demasiado corto')
+        magic, digest, identity_len, gzip_len, br_len = _HEADER.unpack_from(view)
+        if magic != _MAGIC or _HEADER.size + identity_len + gzip_len + br_len > len(view):
+            raise ValueError('Formato de respuesta precomprimida inválido')
+        
+        prepared = cls.__new__(cls)
+        prepared._payload = None
+        prepared.digest = digest.decode('ascii')
+        offset = _HEADER.size
+        prepared.variants = {}
+        for encoding, length in (('identity', identity_len), ('gzip', gzip_len), ('br', br_len)):
+            if length:
+                prepared.variants[encoding] = view[offset:offset + length]
+            offset += length
+        return prepared
+    
+    def to_bytes(self):
+        """Serializa todas las variantes en un solo bloque (ver from_buffer)"""
+        identity = self.variants['identity']
+        compressed = self.variants['gzip']
+        br = self.variants.get('br', b'')
+        header = _HEADER.pack(_MAGIC, self.digest.encode('ascii'), len(identity), len(compressed), len(br))
+        return b''.join((header, identity, compressed, br))
+    
+    @property
+    def payload(self):
+        """Objeto original (se decodifica una sola vez si viene de un buffer)"""
+        if self._payload is None:
+            self._payload = json.loads(bytes(self.variants['identity']))
+        return self._payload
+    
+    def etag(self, encoding='identity'):
+        """ETag (con comillas) de una variante"""
+        if encoding == 'identity':
+            return f'"{self.digest}"'
+        return f'"{self.digest}-{encoding}"'
+    
+    def matches(self, if_none_match):
+        """
+        Indica si el cliente ya tiene este contenido
+        
+        Args:
+            if_none_match (str): Valor del header If-None-Match
+        
+        Returns:
+            bool: True si algún ETag corresponde a cualquier variante
+        """
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == '*':
+            return True
+        for tag in if_none_match.split(','):
+            tag = tag.strip()
+            if tag.startswith('W/'):
+                tag = tag[2:]
+            if tag.strip('"').split('-', 1)[0] == self.digest:
+                return True
+        return False
+    
+    def negotiate(self, accept_encodings):
+        """
+        Elige la mejor variante disponible según Accept-Encoding
+        
+        Args:
+            accept_encodings: request.accept_encodings de Werkzeug
+        
+        Returns:
+            str: 'br', 'gzip' o 'identity'
+        """
+        best, best_quality = 'identity', 0
+        for encoding in ENCODINGS:
+            if encoding not in self.variants or encoding == 'identity':
+                continue
+            quality = accept_encodings[encoding]
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
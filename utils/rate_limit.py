@@ -0,0 +1,66 @@
+"""
+Limitador de peticiones por cliente (token bucket)
+"""
+import threading
+import time
+
+
+class TokenBucketLimiter:
+    """
+    Un bucket por cliente: se recarga a `rate` tokens por segundo hasta `burst`
+    
+    Los buckets llenos (clientes inactivos) se descartan cuando se supera
+    max_clients, así que la memoria no crece con clientes que no vuelven.
+    """
+    
+    def __init__(self, rate, burst, max_clients=10000):
+        """
+        Inicializa el limitador
+        
+        Args:
+            rate (float): Tokens recargados por segundo
+            burst (int): Capacidad máxima del bucket
+            max_clients (int): Buckets en memoria antes de limpiar inactivos
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = {}
+        self._lock = threading.Lock()
+    
+    def consume(self, client, tokens=1):
+        """
+        Intenta consumir tokens del bucket de un cliente
+        
+        Args:
+            client (str): Identificador del cliente (p. ej. IP)
+            tokens (int): Tokens a consumir
+        
+        Returns:
+            tuple: (permitido, segundos hasta poder reintentar)
+        """
+        now = time.monotonic()
+        with self._lock:
+            available, updated = self._buckets.get(client, (self.burst, now))
+            available = min(self.burst, available + (now - updated) * self.rate)
+            
+            if available >= tokens:
+                self._buckets[client] = (available - tokens, now)
+                allowed, retry_after = True, 0.0
+            else:
+                self._buckets[client] = (available, now)
+                allowed, retry_after = False, (tokens - available) / self.rate
+            
+            if len(self._buckets) > self.max_clients:
+                self._prune(now)
+        
+        return allowed, retry_after
+    
+    def _prune(self, now):
+        """Descarta los buckets que ya se recargaron por completo"""
+        idle = [
+            client for client, (available, updated) in self._buckets.items()
+            if available + (now - updated) * self.rate >= self.burst
+        ]
+        for client in idle:
+            del self._buckets[client]
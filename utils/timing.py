@@ -0,0 +1,62 @@
+"""
+Medición de fases (fetch, parse, persist...) de una ejecución
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from .metrics import REGISTRY
+
+# Diccionario {fase: segundos} de la ejecución actual (None si nadie está midiendo)
+_current_timings = ContextVar('current_timings', default=None)
+
+# Todas las fases alimentan también el histograma de /api/metrics
+PHASE_SECONDS = REGISTRY.histogram(
+    'inegi_phase_duration_seconds',
+    'Duración de cada fase del pipeline de scraping',
+    ('phase',)
+)
+
+
+@contextmanager
+def collect_phases():
+    """
+    Recolecta las fases medidas con phase() dentro del bloque
+    
+    Yields:
+        dict: {fase: segundos acumulados}
+    """
+    timings = {}
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+@contextmanager
+def phase(name):
+    """
+    Mide la duración de una fase y la acumula en la recolección activa
+    
+    Args:
+        name (str): Nombre de la fase
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - start)
+
+
+def record_phase(name, seconds):
+    """
+    Registra una duración medida por otros medios (p. ej. acumulada por extractor)
+    
+    Args:
+        name (str): Nombre de la fase
+        seconds (float): Duración en segundos
+    """
+    PHASE_SECONDS.observe(seconds, phase=name)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings[name] = round(timings.get(name, 0.0) + seconds, 6)